@@ -0,0 +1,171 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from api.booking_client import DEFAULT_BASE_URL, JSON_HEADERS, BookingClient, datetime_serializer
+
+
+@dataclass
+class BulkResult:
+    """
+    Outcome of one item of a bulk operation.
+
+    :param index: Position of the item in the submitted sequence.
+    :param status: HTTP status code, None if no response was received.
+    :param data: Decoded JSON body of a successful response.
+    :param error: Description of the failure, None on success.
+    """
+
+    index: int
+    status: Optional[int] = field(default=None)
+    data: Any = field(default=None)
+    error: Optional[str] = field(default=None)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncBookingClient:
+    """
+    Asyncio counterpart of :class:`api.booking_client.BookingClient` with bounded-concurrency bulk operations.
+
+    Bulk methods return one BulkResult per item, in submission order; a failed
+    item never cancels the others. As in BookingClient, non idempotent calls
+    are only retried when the connection could not be established, so a bulk
+    create never creates a booking twice.
+
+    :param base_url: Root URL of the booking service.
+    :param timeout: Total timeout of a single call in seconds.
+    :param retries: Number of retries of a call after a connection error, a timeout or a 502/503/504 answer.
+    :param backoff_factor: Backoff factor between retries, in seconds.
+    :param limit: Maximum number of open connections.
+    """
+
+    retry_statuses: Tuple[int, ...] = (502, 503, 504)
+    idempotent_methods = BookingClient.idempotent_methods
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, timeout: float = 30, retries: int = 3,
+                 backoff_factor: float = 0.3, limit: int = 100):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.limit = limit
+        self.token: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncBookingClient':
+        self._session = aiohttp.ClientSession(headers=JSON_HEADERS, timeout=self.timeout,
+                                              connector=aiohttp.TCPConnector(limit=self.limit))
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method: str, path: str, payload=None,
+                      headers: Optional[dict] = None) -> Tuple[int, Any]:
+        """
+        Send a request to the service, retrying transient failures with backoff.
+
+        :return: A (status, body) tuple; the body is decoded JSON when possible, text otherwise.
+        """
+        assert self._session is not None, 'AsyncBookingClient must be used as an async context manager'
+        data = None if payload is None else json.dumps(payload, default=datetime_serializer)
+        idempotent = method in self.idempotent_methods
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._session.request(method, self.base_url + path, data=data,
+                                                 headers=headers) as response:
+                    text = await response.text()
+                    if idempotent and response.status in self.retry_statuses and attempt < self.retries:
+                        raise aiohttp.ClientResponseError(response.request_info, (), status=response.status)
+                    try:
+                        return response.status, json.loads(text)
+                    except ValueError:
+                        return response.status, text
+            except aiohttp.ClientConnectorError:
+                # The request was never sent, so any method can be retried
+                if attempt >= self.retries:
+                    raise
+            except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError, asyncio.TimeoutError):
+                if not idempotent or attempt >= self.retries:
+                    raise
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def authenticate(self, username: str = 'admin', password: str = 'password123') -> str:
+        status, body = await self.request('POST', '/auth', {"username": username, "password": password})
+        token = body.get('token') if status == 200 and isinstance(body, dict) else None
+        if not token:
+            raise Exception(f"Failed to get auth token. Status code: {status}, Response: {body}")
+        self.token = token
+        return token
+
+    async def create_booking(self, booking_payload: dict) -> Tuple[int, Any]:
+        return await self.request('POST', '/booking', booking_payload)
+
+    async def get_booking(self, booking_id) -> Tuple[int, Any]:
+        return await self.request('GET', f'/booking/{booking_id}')
+
+    async def update_booking(self, booking_id, booking_payload: dict,
+                             token: Optional[str] = None) -> Tuple[int, Any]:
+        token = token or self.token
+        return await self.request('PUT', f'/booking/{booking_id}', booking_payload,
+                                  headers={'Cookie': f'token={token}'})
+
+    async def _run_bulk(self, calls: Iterable[Callable[[], Awaitable[Tuple[int, Any]]]],
+                        concurrency: int) -> List[BulkResult]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, call) -> BulkResult:
+            async with semaphore:
+                try:
+                    status, body = await call()
+                except Exception as e:
+                    return BulkResult(index, error=f'{type(e).__name__}: {e}')
+            if status != 200:
+                return BulkResult(index, status=status, error=f'HTTP {status}: {body}')
+            return BulkResult(index, status=status, data=body)
+
+        return list(await asyncio.gather(*(run(index, call) for index, call in enumerate(calls))))
+
+    async def create_many(self, payloads: Sequence[dict], concurrency: int = 20) -> List[BulkResult]:
+        """
+        Create bookings concurrently.
+
+        :param payloads: Booking payloads to create.
+        :param concurrency: Maximum number of requests in flight.
+        :return: One BulkResult per payload, in the same order.
+        """
+        return await self._run_bulk((lambda p=p: self.create_booking(p) for p in payloads), concurrency)
+
+    async def get_many(self, booking_ids: Sequence, concurrency: int = 20) -> List[BulkResult]:
+        """
+        Fetch bookings concurrently.
+
+        :param booking_ids: IDs of the bookings to fetch.
+        :param concurrency: Maximum number of requests in flight.
+        :return: One BulkResult per ID, in the same order.
+        """
+        return await self._run_bulk((lambda i=i: self.get_booking(i) for i in booking_ids), concurrency)
+
+    async def update_many(self, updates: Sequence[Tuple[Any, dict]], token: Optional[str] = None,
+                          concurrency: int = 20) -> List[BulkResult]:
+        """
+        Update bookings concurrently.
+
+        :param updates: (booking ID, payload) pairs.
+        :param token: Auth token, defaults to the token from :meth:`authenticate`.
+        :param concurrency: Maximum number of requests in flight.
+        :return: One BulkResult per update, in the same order.
+        """
+        return await self._run_bulk((lambda i=i, p=p: self.update_booking(i, p, token) for i, p in updates),
+                                    concurrency)
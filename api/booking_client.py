@@ -0,0 +1,304 @@
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from api.latency import LatencyTracker
+
+DEFAULT_BASE_URL: str = 'https://restful-booker.herokuapp.com'
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+
+def datetime_serializer(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+class _TimeoutCountingRetry(Retry):
+    """
+    Retry policy reporting every timed-out attempt, including the ones it retries.
+
+    Exhausted retries surface as ``requests.ConnectionError`` and retried
+    attempts do not surface at all, so timeouts can only be counted here.
+    ``on_timeout`` gets the urllib3 timeout error; ``on_retry`` is called
+    after the backoff, right before the next attempt is sent.
+    """
+
+    on_timeout: Optional[Callable[[Exception], None]] = None
+    on_retry: Optional[Callable[[], None]] = None
+
+    def new(self, **kw) -> '_TimeoutCountingRetry':
+        retry = super().new(**kw)
+        retry.on_timeout = self.on_timeout
+        retry.on_retry = self.on_retry
+        return retry
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        if self.on_retry is not None:
+            self.on_retry()
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # NewConnectionError subclasses ConnectTimeoutError but is a refused connection, not a timeout
+        timed_out = isinstance(error, ReadTimeoutError) or \
+            (isinstance(error, ConnectTimeoutError) and not isinstance(error, NewConnectionError))
+        if timed_out and self.on_timeout is not None:
+            self.on_timeout(error)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class BookingClient:
+    """
+    HTTP client for the restful-booker API.
+
+    All calls share one keep-alive connection pool. The auth token is kept on
+    the instance, so clients used by different tests or threads never share
+    headers. Connection errors and 502/503/504 answers are retried with
+    exponential backoff; non idempotent calls are only retried when the
+    connection could not be established.
+
+    Idempotent calls get an adaptive read timeout of ``timeout_factor`` times
+    the p99 latency observed for the operation, bounded by ``min_timeout`` and
+    the configured read timeout, so a hung call is retried early instead of
+    blocking for the full timeout. A timed-out attempt is recorded at its
+    timeout, so the observed latency rises when the service degrades instead
+    of leaving its slowest calls out. ``get_booking`` is hedged: when it has not
+    answered after the observed p95 latency, a duplicate is sent and the first
+    answer wins. Errors are only raised once every attempt has failed; HTTP
+    error statuses are returned as usual.
+
+    :param base_url: Root URL of the booking service.
+    :param timeout: Timeout in seconds, or a (connect, read) tuple.
+    :param retries: Number of retries per call.
+    :param backoff_factor: Backoff factor between retries, in seconds.
+    :param pool_maxsize: Maximum number of connections kept alive.
+    :param adaptive_timeouts: Derive read timeouts of idempotent calls from observed latency.
+    :param hedge: Send a duplicate of slow idempotent reads.
+    :param min_timeout: Lower bound of an adaptive read timeout, in seconds.
+    :param timeout_factor: Multiplier applied to the observed p99 latency.
+    """
+
+    idempotent_methods = frozenset({'GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS'})
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, timeout: Union[float, Tuple[float, float]] = (5, 30),
+                 retries: int = 3, backoff_factor: float = 0.3, pool_maxsize: int = 10,
+                 adaptive_timeouts: bool = True, hedge: bool = True, min_timeout: float = 1.0,
+                 timeout_factor: float = 4.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.adaptive_timeouts = adaptive_timeouts
+        self.hedge = hedge
+        self.min_timeout = min_timeout
+        self.timeout_factor = timeout_factor
+        self.latency = LatencyTracker()
+        self.stats: Dict[str, int] = {'hedges': 0, 'hedge_wins': 0, 'timeouts': 0}
+        self._stats_lock = threading.Lock()
+        # Operation, timeout and start of the attempt in flight on each thread, for the retry callbacks
+        self._attempt = threading.local()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_maxsize = pool_maxsize
+        self.token: Optional[str] = None
+        # Optional api.token_provider.TokenProvider used when no token is given to a call
+        self.token_provider = None
+        self.session = requests.Session()
+        self.session.headers.update(JSON_HEADERS)
+        retry = _TimeoutCountingRetry(total=retries, backoff_factor=backoff_factor,
+                                      status_forcelist=(502, 503, 504), allowed_methods=self.idempotent_methods,
+                                      raise_on_status=False)
+        retry.on_timeout = self._timed_out
+        retry.on_retry = self._retrying
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @property
+    def booking_url(self) -> str:
+        return self.base_url + '/booking'
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _timed_out(self, error: Exception) -> None:
+        """
+        Count a timed-out attempt and record it at the timeout it ran into.
+        """
+        self._count('timeouts')
+        operation = getattr(self._attempt, 'operation', None)
+        if operation is not None:
+            timeout = self._attempt.timeout
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            self.latency.record(operation, read if isinstance(error, ReadTimeoutError) else connect)
+
+    def _retrying(self) -> None:
+        self._attempt.started = time.perf_counter()
+
+    def timeout_for(self, method: str, operation: str) -> Union[float, Tuple[float, float]]:
+        """
+        Get the timeout of the next call of an operation.
+
+        :return: The configured timeout, or for idempotent calls with enough
+            latency samples a (connect, read) tuple with an adaptive read timeout.
+        """
+        connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        p99 = self.latency.percentile(operation, 0.99) if self.adaptive_timeouts else None
+        if p99 is None or method not in self.idempotent_methods:
+            return self.timeout
+        return connect, min(read, max(self.min_timeout, p99 * self.timeout_factor))
+
+    def request(self, method: str, path: str, payload=None, headers: Optional[dict] = None,
+                operation: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Send a request to the service.
+
+        :param method: HTTP method.
+        :param path: Path relative to the base URL.
+        :param payload: Optional body, serialized to JSON.
+        :param headers: Extra headers for this request only.
+        :param operation: Name the latency is tracked under, defaults to the method and path.
+        :return: The response.
+        """
+        operation = operation or f'{method} {path}'
+        data = None if payload is None else json.dumps(payload, default=datetime_serializer)
+        kwargs.setdefault('timeout', self.timeout_for(method, operation))
+        attempt = self._attempt
+        attempt.operation, attempt.timeout, attempt.started = operation, kwargs['timeout'], time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, data=data, headers=headers, **kwargs)
+        finally:
+            attempt.operation = None
+        # Timed-out attempts were recorded by the retry policy; this records the answered one
+        self.latency.record(operation, time.perf_counter() - attempt.started)
+        return response
+
+    def _hedged(self, operation: str, call: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Run an idempotent call, sending a duplicate if it is slower than the operation's p95.
+        """
+        delay = self.latency.percentile(operation, 0.95) if self.hedge else None
+        if delay is None:
+            return call()
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=self._pool_maxsize, thread_name_prefix='booking-hedge')
+        primary = self._hedge_pool.submit(call)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        self._count('hedges')
+        hedge = self._hedge_pool.submit(call)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count('hedge_wins')
+                    return future.result()
+        # Both attempts failed: surface the primary's error
+        return primary.result()
+
+    def latency_report(self) -> Dict[str, dict]:
+        """
+        Recent p50/p95/p99 latency (ms), current timeout and latency samples (s)
+        of every operation, plus the hedge and timeout counts.
+        """
+        report: Dict[str, dict] = {}
+        for operation, samples in self.latency.samples().items():
+            report[operation] = self.latency.summary(operation)
+            report[operation]['timeout'] = self.timeout_for(operation.split(' ')[0], operation)
+            report[operation]['samples'] = samples
+        report['stats'] = dict(self.stats)
+        return report
+
+    @staticmethod
+    def merge_latency_reports(reports: Iterable[Dict[str, dict]]) -> Dict[str, dict]:
+        """
+        Combine the latency reports of several clients, such as those of the xdist workers.
+
+        Percentiles are computed over the samples of every report, counts are
+        added up and the longest timeout of each operation is kept.
+        """
+        reports = list(reports)
+        latency = LatencyTracker(window=None)
+        timeouts: Dict[str, Union[float, Tuple[float, float]]] = {}
+        stats: Dict[str, int] = {}
+        for report in reports:
+            for operation, entry in report.items():
+                if operation == 'stats':
+                    for key, value in entry.items():
+                        stats[key] = stats.get(key, 0) + value
+                    continue
+                for seconds in entry['samples']:
+                    latency.record(operation, seconds)
+                timeouts[operation] = max(timeouts.get(operation, entry['timeout']), entry['timeout'],
+                                          key=lambda timeout: timeout[-1] if isinstance(timeout, tuple) else timeout)
+        merged: Dict[str, dict] = {}
+        for operation, samples in latency.samples().items():
+            merged[operation] = latency.summary(operation)
+            merged[operation]['timeout'] = timeouts[operation]
+            merged[operation]['samples'] = samples
+        merged['stats'] = stats
+        return merged
+
+    def authenticate(self, username: str = 'admin', password: str = 'password123') -> str:
+        """
+        Get an auth token and keep it on this client.
+
+        :return: The token.
+        """
+        response = self.request('POST', '/auth', {"username": username, "password": password}, operation='POST /auth')
+        token = response.json().get('token') if response.status_code == 200 else None
+        if not token:
+            raise Exception(f"Failed to get auth token. Status code: {response.status_code}, "
+                            f"Response: {response.text}")
+        self.token = token
+        return token
+
+    def create_booking(self, booking_payload: dict) -> requests.Response:
+        return self.request('POST', '/booking', booking_payload, operation='POST /booking')
+
+    def list_bookings(self, **filters) -> requests.Response:
+        """
+        List booking IDs, optionally filtered by firstname, lastname, checkin or checkout.
+        """
+        return self.request('GET', '/booking', params=filters or None, operation='GET /booking')
+
+    def get_booking(self, booking_id) -> requests.Response:
+        operation = 'GET /booking/{id}'
+        return self._hedged(operation, lambda: self.request('GET', f'/booking/{booking_id}', operation=operation))
+
+    def update_booking(self, booking_id, booking_payload: dict, token: Optional[str] = None) -> requests.Response:
+        """
+        Update a booking. With a token provider, a rejected token is renewed and the call retried once.
+        """
+        token = token or (self.token_provider.token() if self.token_provider else self.token)
+        operation = 'PUT /booking/{id}'
+        response = self.request('PUT', f'/booking/{booking_id}', booking_payload,
+                                headers={'Cookie': f'token={token}'}, operation=operation)
+        if response.status_code == 403 and self.token_provider is not None:
+            self.token_provider.invalidate(token)
+            response = self.request('PUT', f'/booking/{booking_id}', booking_payload,
+                                    headers={'Cookie': f'token={self.token_provider.token()}'}, operation=operation)
+        return response
+
+    def close(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self) -> 'BookingClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,82 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Set, Tuple
+
+from api.booking_client import BookingClient
+
+
+class BookingIndex:
+    """
+    Local set of the booking IDs listed by ``GET /booking``.
+
+    The full list is downloaded once. Bookings created afterwards are tracked
+    and confirmed with filtered list queries, one per guest name, so
+    membership checks are set lookups and never download the full list again.
+
+    :param client: The BookingClient used for the list queries.
+    """
+
+    def __init__(self, client: BookingClient):
+        self.client = client
+        self._ids: Set[int] = set()
+        self._pending: Dict[int, Tuple[str, str]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {'full_loads': 0, 'filtered_queries': 0}
+
+    def _list(self, **filters) -> Set[int]:
+        response = self.client.list_bookings(**filters)
+        assert response.status_code == 200, f"Failed to list bookings: {response.status_code} - {response.text}"
+        return {item['bookingid'] for item in response.json()}
+
+    def load(self) -> None:
+        """
+        Download the full booking list. Only needed once per index.
+        """
+        with self._lock:
+            self._ids = self._list()
+            self._loaded = True
+            self.stats['full_loads'] += 1
+
+    def track(self, booking_id: int, booking: dict) -> None:
+        """
+        Record a booking created after the index was loaded.
+
+        :param booking_id: The ID returned by the create call.
+        :param booking: The booking payload, used to build a filtered query.
+        """
+        with self._lock:
+            if booking_id not in self._ids:
+                self._pending[booking_id] = (booking['firstname'], booking['lastname'])
+
+    def refresh(self) -> None:
+        """
+        Confirm the tracked bookings with one filtered query per guest name.
+        """
+        if not self._loaded:
+            self.load()
+        with self._lock:
+            by_name: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+            for booking_id, name in self._pending.items():
+                by_name[name].add(booking_id)
+            for (firstname, lastname), wanted in by_name.items():
+                listed = self._list(firstname=firstname, lastname=lastname)
+                self.stats['filtered_queries'] += 1
+                self._ids |= listed
+                for booking_id in wanted & listed:
+                    del self._pending[booking_id]
+
+    def __contains__(self, booking_id: int) -> bool:
+        """
+        Check whether the booking is listed, refreshing only for tracked bookings not confirmed yet.
+        """
+        if not self._loaded:
+            self.load()
+        if booking_id in self._ids:
+            return True
+        if booking_id in self._pending:
+            self.refresh()
+        return booking_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
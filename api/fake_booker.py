@@ -0,0 +1,257 @@
+import json
+import secrets
+import threading
+from collections import defaultdict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+ADMIN_CREDENTIALS: Tuple[str, str] = ('admin', 'password123')
+# Basic auth header accepted by restful-booker for admin:password123
+ADMIN_BASIC_AUTH: str = 'Basic YWRtaW46cGFzc3dvcmQxMjM='
+
+
+def _as_date(value) -> str:
+    """
+    Normalize a date or ISO datetime string to YYYY-MM-DD, as restful-booker does.
+    """
+    return date.fromisoformat(str(value)[:10]).isoformat()
+
+
+def _normalize_booking(payload: dict) -> dict:
+    """
+    Validate a booking payload and convert it to the shape restful-booker returns.
+
+    :raises ValueError: If a field is missing or has the wrong type.
+    """
+    return {
+        'firstname': str(payload['firstname']),
+        'lastname': str(payload['lastname']),
+        'totalprice': int(payload['totalprice']),
+        'depositpaid': bool(payload['depositpaid']),
+        'bookingdates': {
+            'checkin': _as_date(payload['bookingdates']['checkin']),
+            'checkout': _as_date(payload['bookingdates']['checkout']),
+        },
+        **({'additionalneeds': str(payload['additionalneeds'])} if 'additionalneeds' in payload else {}),
+    }
+
+
+class BookingStore:
+    """
+    Thread-safe in-memory booking storage indexed by ID and by guest name.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._bookings: Dict[int, dict] = {}
+        self._by_name: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        self.tokens: Set[str] = set()
+
+    def create(self, booking: dict) -> int:
+        with self._lock:
+            booking_id = self._next_id
+            self._next_id += 1
+            self._bookings[booking_id] = booking
+            self._by_name[(booking['firstname'], booking['lastname'])].add(booking_id)
+            return booking_id
+
+    def get(self, booking_id: int) -> Optional[dict]:
+        return self._bookings.get(booking_id)
+
+    def replace(self, booking_id: int, booking: dict) -> bool:
+        with self._lock:
+            old = self._bookings.get(booking_id)
+            if old is None:
+                return False
+            self._by_name[(old['firstname'], old['lastname'])].discard(booking_id)
+            self._bookings[booking_id] = booking
+            self._by_name[(booking['firstname'], booking['lastname'])].add(booking_id)
+            return True
+
+    def delete(self, booking_id: int) -> bool:
+        with self._lock:
+            old = self._bookings.pop(booking_id, None)
+            if old is None:
+                return False
+            self._by_name[(old['firstname'], old['lastname'])].discard(booking_id)
+            return True
+
+    def search(self, firstname: Optional[str] = None, lastname: Optional[str] = None,
+               checkin: Optional[str] = None, checkout: Optional[str] = None) -> List[int]:
+        """
+        Get the IDs of the bookings matching every given filter, in creation order.
+        Name filters use the name index; date filters keep bookings checking in on
+        or after ``checkin`` and checking out on or before ``checkout``.
+        """
+        with self._lock:
+            if firstname is not None and lastname is not None:
+                ids = set(self._by_name.get((firstname, lastname), ()))
+            else:
+                ids = set(self._bookings)
+            matches = []
+            for booking_id in sorted(ids):
+                booking = self._bookings[booking_id]
+                if firstname is not None and booking['firstname'] != firstname:
+                    continue
+                if lastname is not None and booking['lastname'] != lastname:
+                    continue
+                if checkin is not None and booking['bookingdates']['checkin'] < checkin:
+                    continue
+                if checkout is not None and booking['bookingdates']['checkout'] > checkout:
+                    continue
+                matches.append(booking_id)
+            return matches
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: '_Server'
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send(self, status: int, body) -> None:
+        if isinstance(body, str):
+            data, content_type = body.encode(), 'text/plain; charset=utf-8'
+        else:
+            data, content_type = json.dumps(body).encode(), 'application/json; charset=utf-8'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> bytes:
+        # Always drain the body so the keep-alive connection stays usable
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _booking_id(self) -> Optional[int]:
+        parts = urlsplit(self.path).path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'booking' and parts[1].isdigit():
+            return int(parts[1])
+        return None
+
+    def _authorized(self) -> bool:
+        if self.headers.get('Authorization') == ADMIN_BASIC_AUTH:
+            return True
+        for item in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = item.partition('=')
+            if name.strip() == 'token' and value.strip() in self.server.store.tokens:
+                return True
+        return False
+
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path.rstrip('/')
+        try:
+            payload = json.loads(self._read_body() or b'null')
+        except ValueError:
+            return self._send(400, 'Bad Request')
+        if path == '/auth':
+            if isinstance(payload, dict) and (payload.get('username'), payload.get('password')) == ADMIN_CREDENTIALS:
+                token = secrets.token_hex(8)
+                self.server.store.tokens.add(token)
+                return self._send(200, {'token': token})
+            return self._send(200, {'reason': 'Bad credentials'})
+        if path == '/booking':
+            try:
+                booking = _normalize_booking(payload)
+            except (KeyError, TypeError, ValueError):
+                return self._send(500, 'Internal Server Error')
+            return self._send(200, {'bookingid': self.server.store.create(booking), 'booking': booking})
+        self._send(404, 'Not Found')
+
+    def do_GET(self) -> None:
+        self._read_body()
+        parts = urlsplit(self.path)
+        if parts.path.rstrip('/') == '/booking':
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            try:
+                ids = self.server.store.search(
+                    firstname=query.get('firstname'), lastname=query.get('lastname'),
+                    checkin=_as_date(query['checkin']) if 'checkin' in query else None,
+                    checkout=_as_date(query['checkout']) if 'checkout' in query else None)
+            except ValueError:
+                return self._send(500, 'Internal Server Error')
+            return self._send(200, [{'bookingid': booking_id} for booking_id in ids])
+        booking_id = self._booking_id()
+        booking = self.server.store.get(booking_id) if booking_id is not None else None
+        if booking is None:
+            return self._send(404, 'Not Found')
+        self._send(200, booking)
+
+    def do_PUT(self) -> None:
+        body = self._read_body()
+        booking_id = self._booking_id()
+        if booking_id is None:
+            return self._send(404, 'Not Found')
+        if not self._authorized():
+            return self._send(403, 'Forbidden')
+        try:
+            booking = _normalize_booking(json.loads(body or b'null'))
+        except (KeyError, TypeError, ValueError):
+            return self._send(400, 'Bad Request')
+        if not self.server.store.replace(booking_id, booking):
+            return self._send(405, 'Method Not Allowed')
+        self._send(200, booking)
+
+    def do_DELETE(self) -> None:
+        self._read_body()
+        booking_id = self._booking_id()
+        if booking_id is None:
+            return self._send(404, 'Not Found')
+        if not self._authorized():
+            return self._send(403, 'Forbidden')
+        if not self.server.store.delete(booking_id):
+            return self._send(405, 'Method Not Allowed')
+        self._send(201, 'Created')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    store: BookingStore
+
+
+class FakeBooker:
+    """
+    In-process stand-in for the restful-booker service.
+
+    Implements ``/auth`` and ``/booking`` with the same JSON shapes, status
+    codes and token-cookie authorization as the real service, on a local
+    port and with in-memory storage.
+
+    :param host: Interface to listen on.
+    :param port: Port to listen on, 0 picks a free port.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.store = BookingStore()
+        self._server = _Server((host, port), _Handler)
+        self._server.store = self.store
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeBooker':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-booker', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'FakeBooker':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
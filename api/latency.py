@@ -0,0 +1,60 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent call latencies per operation.
+
+    :param window: Number of latencies kept per operation, unlimited when None.
+    :param min_samples: Number of samples needed before percentiles are reported.
+    """
+
+    def __init__(self, window: Optional[int] = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(operation, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, operation: str, fraction: float) -> Optional[float]:
+        """
+        Nearest-rank percentile of the recent latencies of an operation, in seconds.
+
+        :return: The percentile, or None while there are fewer than ``min_samples`` samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(operation, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[max(1, math.ceil(fraction * len(samples))) - 1]
+
+    def summary(self, operation: str) -> Dict[str, Optional[float]]:
+        """
+        The p50/p95/p99 latency of an operation in milliseconds, and its number of samples.
+        """
+        percentiles = {f'p{int(q * 100)}_ms': self.percentile(operation, q) for q in (0.5, 0.95, 0.99)}
+        summary: Dict[str, Optional[float]] = {key: round(value * 1000, 1) if value is not None else None
+                                               for key, value in percentiles.items()}
+        summary['calls'] = self.count(operation)
+        return summary
+
+    def samples(self) -> Dict[str, List[float]]:
+        """
+        The recent latencies of every operation, in seconds.
+        """
+        with self._lock:
+            return {operation: list(samples) for operation, samples in self._samples.items()}
+
+    def count(self, operation: str) -> int:
+        with self._lock:
+            return len(self._samples.get(operation, ()))
+
+    def operations(self):
+        with self._lock:
+            return list(self._samples)
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from support.file_lock import FileLock
+from support.session_cache import DEFAULT_CACHE_DIR
+
+
+class TokenProvider:
+    """
+    Auth token shared by every thread and process of a run.
+
+    The token is stored with its expiry in a file guarded by a FileLock, so
+    pytest-xdist workers sign in once in total instead of once each. It is
+    renewed ``refresh_margin`` seconds before it expires, or immediately when
+    the service rejects it.
+
+    :param client: BookingClient used to request new tokens.
+    :param ttl: Lifetime assumed for a token, in seconds.
+    :param refresh_margin: How long before expiry a token is renewed, in seconds.
+    :param cache_dir: Directory of the token file.
+    """
+
+    def __init__(self, client, ttl: float = 600, refresh_margin: float = 60, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.client = client
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        os.makedirs(cache_dir, exist_ok=True)
+        key = hashlib.sha1(client.base_url.encode()).hexdigest()[:12]
+        self.path = os.path.join(cache_dir, f'booking_token_{key}.json')
+        self.file_lock = FileLock(self.path + '.lock')
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self.stats = {'logins': 0, 'file_hits': 0}
+
+    def _fresh(self, expires_at: float) -> bool:
+        return time.time() < expires_at - self.refresh_margin
+
+    def _read_file(self) -> bool:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not self._fresh(data.get('expires_at', 0)):
+            return False
+        self._token, self._expires_at = data['token'], data['expires_at']
+        return True
+
+    def _write_file(self) -> None:
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'token': self._token, 'expires_at': self._expires_at}, f)
+        os.replace(tmp_path, self.path)
+
+    def token(self) -> str:
+        """
+        Get a valid token, signing in only if no process holds a fresh one.
+        """
+        with self._lock:
+            if self._token and self._fresh(self._expires_at):
+                return self._token
+            if self._read_file():
+                self.stats['file_hits'] += 1
+                return self._token
+            with self.file_lock:
+                if self._read_file():
+                    self.stats['file_hits'] += 1
+                    return self._token
+                self._token = self.client.authenticate()
+                self._expires_at = time.time() + self.ttl
+                self.stats['logins'] += 1
+                self._write_file()
+                return self._token
+
+    def invalidate(self, token: str) -> None:
+        """
+        Drop a token the service rejected, so the next call to :meth:`token` signs in again.
+
+        :param token: The rejected token; a token renewed meanwhile by another caller is kept.
+        """
+        with self._lock, self.file_lock:
+            if self._token == token:
+                self._token, self._expires_at = None, 0.0
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    stale = json.load(f).get('token') == token
+            except (OSError, ValueError):
+                stale = False
+            if stale:
+                os.remove(self.path)
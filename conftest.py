@@ -0,0 +1,561 @@
+import json
+import os
+import sys
+import time
+import zlib
+from typing import TYPE_CHECKING, List
+
+# Imported first: its import marks the start of the conftest imports
+from support import startup_phases
+
+import pytest
+
+from api.booking_client import DEFAULT_BASE_URL, BookingClient
+from api.fake_booker import FakeBooker
+from selenium_interface import BROWSER_PROFILE_ENV, PROFILES, SeleniumInterface
+from support.cleanup_registry import CleanupRegistry
+from support.data_factory import BookingFactory, ClientFactory
+from support.data_namespace import DataNamespace, worker_index
+from support.session_cache import DEFAULT_CACHE_DIR, SessionCache
+from support.startup_phases import phase
+from support.test_timings import TimingDatabase, TimingScheduler
+
+if TYPE_CHECKING:
+    from support.client_seeder import ClientSeeder
+    from support.driver_pool import DriverPool
+
+# Selenium, Allure and the page objects are imported by the fixtures that need a browser,
+# so sessions that only run API tests never load them
+startup_phases.record('conftest imports', time.perf_counter() - startup_phases.IMPORTED_AT)
+
+RUN_ID_ENV = 'CLIENT_TESTS_RUN_ID'
+SESSION_CACHE_ENV = 'CLIENT_TESTS_SESSION_CACHE'
+BOOKING_TARGET_ENV = 'BOOKING_TARGET'
+PAGE_TRANSPORT_ENV = 'PAGE_TRANSPORT'
+
+# Startup times of the browsers launched outside the driver pool; on the xdist controller, those of every worker
+STARTUP_TIMES: List[float] = []
+# Fields of the page metrics records the profile summary needs, sent by xdist workers to the controller
+PAGE_LOAD_FIELDS = ('action', 'duration_ms', 'load_event_ms', 'transfer_kb')
+
+
+def pytest_addoption(parser):
+    parser.addoption('--client-seeding', choices=('api', 'ui'), default='api',
+                     help='How the seeded_client fixture creates clients: replay the learned '
+                          'backend call (api) or always fill the form (ui)')
+    parser.addoption('--booking-target', default=os.environ.get(BOOKING_TARGET_ENV, 'remote'),
+                     help='Booking service the API tests run against: remote (restful-booker.herokuapp.com), '
+                          'local (in-process fake server) or a base URL')
+    parser.addoption('--browser-profile', choices=tuple(PROFILES),
+                     default=os.environ.get(BROWSER_PROFILE_ENV, 'default'),
+                     help='Chrome profile for the UI tests; lean runs headless and blocks images and trackers')
+    parser.addoption('--page-transport', choices=('webdriver', 'cdp'),
+                     default=os.environ.get(PAGE_TRANSPORT_ENV, 'webdriver'),
+                     help='How page objects drive the browser: classic WebDriver commands, or a persistent '
+                          'DevTools connection with mutation-based waits (cdp)')
+    parser.addoption('--driver-pool-size', type=int, default=1,
+                     help='Browsers kept pre-started and recycled between modules; 0 launches one per module')
+    parser.addoption('--driver-max-uses', type=int, default=20,
+                     help='Number of modules a pooled browser serves before it is replaced')
+    parser.addoption('--perf-budgets', default='perf_budgets.json',
+                     help='JSON file with the performance budget of every page-object action; empty to disable')
+    parser.addoption('--artifact-max-kb', type=int, default=5120,
+                     help='Size cap of the screenshots, page sources and browser logs attached to one failed test; '
+                          '0 disables them')
+    parser.addoption('--timing-db', default=os.path.join(DEFAULT_CACHE_DIR, 'test_timings.json'),
+                     help='Database of test and fixture durations used to run the costliest modules first; '
+                          'empty to disable')
+    parser.addoption('--data-seed', type=int, default=None,
+                     help='Seed of the generated clients and bookings, defaults to one derived from the run id')
+    parser.addoption('--har-dir', default=None, help='Directory where the HAR trace of every UI test is written')
+    group = parser.getgroup('benchmark', 'booking API benchmarks')
+    group.addoption('--benchmark', action='store_true', help='Run the tests marked as benchmark')
+    group.addoption('--benchmark-concurrency', type=int, default=4, help='Concurrent workers per operation')
+    group.addoption('--benchmark-duration', type=float, default=5.0, help='Seconds to drive each operation')
+    group.addoption('--benchmark-json', default='benchmark-results.json', help='Where to write the results')
+    group.addoption('--benchmark-baseline', default=None,
+                    help='Results JSON to compare with; the run fails on regressions beyond the threshold')
+    group.addoption('--benchmark-threshold', type=float, default=0.2,
+                    help='Allowed regression against the baseline, as a fraction')
+
+
+def pytest_configure(config):
+    """
+    Create the run id once on the controller; xdist workers receive it through workerinput.
+    """
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is not None:
+        config.run_id = workerinput['run_id']
+    else:
+        config.run_id = os.environ.get(RUN_ID_ENV) or DataNamespace.new_run_id()
+    seed = config.getoption('--data-seed')
+    # Run ids are free-form strings (CLIENT_TESTS_RUN_ID), so the seed is a stable hash of the id
+    config.data_seed = zlib.crc32(config.run_id.encode('utf-8')) if seed is None else seed
+    if config.getoption('--timing-db'):
+        config.pluginmanager.register(TimingScheduler(config, TimingDatabase(config.getoption('--timing-db'))),
+                                      'timing-scheduler')
+
+
+def _browser_stack(config) -> None:
+    """
+    Set up the UI test support the first time a browser is needed: the
+    performance budgets of the page actions and the failure artifacts.
+    """
+    if getattr(config, 'browser_stack', False):
+        return
+    config.browser_stack = True
+    with phase('browser stack import'):
+        import allure_commons
+        from support.failure_artifacts import FailureArtifacts
+        from support.page_metrics import load_budgets
+    budgets = config.getoption('--perf-budgets')
+    if budgets and os.path.exists(os.path.join(str(config.rootpath), budgets)):
+        load_budgets(os.path.join(str(config.rootpath), budgets))
+    if config.getoption('--artifact-max-kb') > 0:
+        config.failure_artifacts = FailureArtifacts(getattr(config.option, 'allure_report_dir', None),
+                                                    max_bytes_per_test=config.getoption('--artifact-max-kb') * 1024)
+        allure_commons.plugin_manager.register(config.failure_artifacts)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection(session):
+    with phase('collection'):
+        yield
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """
+    Report the startup phases, client cleanup, failure artifacts, booking call latency, and the
+    browser startup time and page-load cost of the selected profile.
+    """
+    terminalreporter.write_sep('-', 'startup phases')
+    terminalreporter.write_line(', '.join(
+        f'{name} {seconds:.2f} s' + (f' ({startup_phases.COUNTS[name]}x)' if startup_phases.COUNTS[name] > 1 else '')
+        for name, seconds in startup_phases.PHASES.items()) + f"; selenium imported: {'selenium' in sys.modules}")
+    registry = getattr(config, 'cleanup_registry', None)
+    if registry is not None:
+        terminalreporter.write_sep('-', 'client cleanup')
+        terminalreporter.write_line(f'deleted {len(registry.deleted)} clients')
+        for client_id, error in registry.failed.items():
+            terminalreporter.write_line(f'could not delete client {client_id}: {error}', red=True)
+    artifacts = getattr(config, 'failure_artifacts', None)
+    if artifacts is not None and artifacts.stats['captures']:
+        stats = artifacts.stats
+        terminalreporter.write_sep('-', 'failure artifacts')
+        terminalreporter.write_line(f"{stats['captures']} captures, {stats['written']} files "
+                                    f"({stats['written_kb']:.0f} KB), {stats['deduplicated']} duplicates linked, "
+                                    f"{stats['dropped']} dropped over the cap; "
+                                    f"{stats['capture_s'] * 1000 / stats['captures']:.0f} ms per capture in the "
+                                    f"test thread, {stats['process_s']:.2f} s in the background")
+    latency = getattr(config, 'booking_latency', None)
+    if latency is not None:
+        terminalreporter.write_sep('-', 'booking calls')
+        terminalreporter.write_line(', '.join(f'{key}: {value}' for key, value in latency.pop('stats').items()))
+        for operation, entry in latency.items():
+            terminalreporter.write_line(f"{operation}: {entry['calls']} calls, p50 {entry['p50_ms']} ms, "
+                                        f"p95 {entry['p95_ms']} ms, p99 {entry['p99_ms']} ms, "
+                                        f"timeout {entry['timeout']}")
+    pool = getattr(config, 'driver_pool', None)
+    if pool is not None:
+        terminalreporter.write_sep('-', 'driver pool')
+        terminalreporter.write_line(', '.join(f'{key}: {value}' for key, value in pool.report().items()))
+    startup_times = _browser_startup_times(config)
+    if not startup_times:
+        return
+    from support.page_metrics import RECORDS, summarize_page_loads
+
+    terminalreporter.write_sep('-', f"browser profile: {config.getoption('--browser-profile')}")
+    terminalreporter.write_line(f'browsers started: {len(startup_times)}, '
+                                f'mean startup: {sum(startup_times) / len(startup_times):.2f} s')
+    for action, entry in summarize_page_loads(RECORDS).items():
+        terminalreporter.write_line(f"{action}: {entry['calls']} calls, mean {entry['duration_ms']} ms, "
+                                    f"load event {entry['load_event_ms']} ms, {entry['transfer_kb']} KB per page load")
+
+
+def _browser_startup_times(config) -> List[float]:
+    """
+    Get the startup times of every browser launched by this process, pooled or not.
+    """
+    pool = getattr(config, 'driver_pool', None)
+    return STARTUP_TIMES + ([interface.startup_s for interface in pool.launched] if pool is not None else [])
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    Merge the browser startup times, page loads and booking call latency of a finished xdist worker
+    into the controller's summary.
+    """
+    output = getattr(node, 'workeroutput', {})
+    if output.get('booking_latency'):
+        reports = [getattr(node.config, 'booking_latency', None), output['booking_latency']]
+        node.config.booking_latency = BookingClient.merge_latency_reports(report for report in reports if report)
+    STARTUP_TIMES.extend(output.get('browser_startup_times', ()))
+    if output.get('page_loads'):
+        from support.page_metrics import RECORDS
+
+        RECORDS.extend(output['page_loads'])
+
+
+def _driver_pool(config) -> 'DriverPool':
+    """
+    Get the run's driver pool, creating it on first use.
+    """
+    pool = getattr(config, 'driver_pool', None)
+    if pool is None:
+        from support.driver_pool import DriverPool
+
+        _browser_stack(config)
+        profile = config.getoption('--browser-profile')
+        pool = config.driver_pool = DriverPool(lambda: SeleniumInterface(profile),
+                                               size=config.getoption('--driver-pool-size'),
+                                               max_uses=config.getoption('--driver-max-uses'))
+    return pool
+
+
+def _uses_browser(item) -> bool:
+    return 'selenium_interface' in getattr(item, 'fixturenames', ())
+
+
+def pytest_collection_finish(session):
+    """
+    Start pre-warming browsers as soon as the selected tests are known to need one.
+
+    Tests marked skip or skipif do not count. xdist workers collect the whole
+    suite whatever they are handed, so they pre-warm on the setup of their
+    first browser test instead (see :func:`pytest_runtest_setup`).
+    """
+    config = session.config
+    if config.getoption('--driver-pool-size') <= 0 or hasattr(config, 'workerinput'):
+        return
+    if any(_uses_browser(item) and item.get_closest_marker('skip') is None
+           and item.get_closest_marker('skipif') is None for item in session.items):
+        _driver_pool(config)
+
+
+def pytest_unconfigure(config):
+    pool = getattr(config, 'driver_pool', None)
+    if pool is not None:
+        pool.close()
+    artifacts = getattr(config, 'failure_artifacts', None)
+    if artifacts is not None:
+        import allure_commons
+
+        artifacts.close()
+        allure_commons.plugin_manager.unregister(artifacts)
+
+
+def pytest_runtest_setup(item):
+    """
+    On an xdist worker, start the driver pool with the first browser test it runs.
+    Skipped tests do not get here: the skip marks are evaluated first.
+    """
+    if hasattr(item.config, 'workerinput') and _uses_browser(item) and \
+            item.config.getoption('--driver-pool-size') > 0:
+        _driver_pool(item.config)
+    artifacts = getattr(item.config, 'failure_artifacts', None)
+    if artifacts is not None:
+        artifacts.start_test(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Attach the browser's screenshot, page source and log to a failed test, unless a failing step already did.
+    """
+    outcome = yield
+    artifacts = getattr(item.config, 'failure_artifacts', None)
+    if artifacts is not None and outcome.get_result().failed and call.excinfo is not None:
+        artifacts.capture(f'{call.when} failure', call.excinfo.value)
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Skip the benchmarks unless --benchmark is given.
+    """
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='benchmarks run only with --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """
+    Share the controller's run id with every xdist worker.
+    """
+    node.workerinput['run_id'] = node.config.run_id
+
+
+@pytest.fixture(scope="session")
+def data_namespace(request):
+    """
+    Fixture providing unique client data for the current run and worker, with the
+    other client fields taken from the seeded client factory.
+    """
+    return DataNamespace(request.config.run_id, worker_index(), int(os.environ.get('PYTEST_XDIST_WORKER_COUNT', 1)),
+                         factory=ClientFactory(request.config.data_seed))
+
+
+def pytest_report_header(config):
+    return f'data seed: {config.data_seed} (reproduce the generated data with --data-seed={config.data_seed})'
+
+
+@pytest.fixture(scope="session")
+def booking_factory(request):
+    """
+    Fixture providing the seeded factory of valid bookings.
+    """
+    return BookingFactory(request.config.data_seed)
+
+
+@pytest.fixture(scope="session")
+def booking_stream(booking_factory):
+    """
+    Fixture providing this worker's endless share of the seeded bookings; xdist workers never get the same one.
+    """
+    workers = int(os.environ.get('PYTEST_XDIST_WORKER_COUNT', 1))
+    return booking_factory.stream(start=worker_index(), step=workers)
+
+
+@pytest.fixture(scope="session")
+def booking_base_url(request):
+    """
+    Fixture resolving the booking service URL, starting the in-process fake server for the local target.
+    """
+    target = request.config.getoption('--booking-target')
+    if target == 'local':
+        with FakeBooker() as server:
+            yield server.url
+    elif target == 'remote':
+        yield DEFAULT_BASE_URL
+    else:
+        yield target
+
+
+@pytest.fixture(scope="module")
+def selenium_interface(request):
+    """
+    Fixture to initialize Selenium interface.
+    This fixture takes a pre-started browser from the driver pool and hands it back, reset, after
+    the tests are done; with --driver-pool-size=0 it launches a browser and quits it instead.
+    Each xdist worker is a separate process, so every worker owns its browser.
+    The startup time and page-load cost of the module are attached to the Allure report, and
+    failed steps and tests of the module get the browser's screenshot, page source and log.
+    With --page-transport=cdp the page objects of the module run over a DevTools connection.
+    """
+    import allure
+    from support.page_metrics import RECORDS, summarize_page_loads
+
+    _browser_stack(request.config)
+    first_record = len(RECORDS)
+    pooled = request.config.getoption('--driver-pool-size') > 0
+    if pooled:
+        interface = _driver_pool(request.config).acquire()
+    else:
+        interface = SeleniumInterface(request.config.getoption('--browser-profile'))
+        STARTUP_TIMES.append(interface.startup_s)
+    artifacts = getattr(request.config, 'failure_artifacts', None)
+    if artifacts is not None:
+        artifacts.watch(interface.driver)
+    if request.config.getoption('--page-transport') == 'cdp':
+        from pages.cdp_transport import enable_cdp_transport
+
+        enable_cdp_transport(interface.driver)
+    yield interface
+    if artifacts is not None:
+        artifacts.unwatch()
+    if request.config.getoption('--page-transport') == 'cdp':
+        from pages.cdp_transport import disable_cdp_transport
+
+        disable_cdp_transport(interface.driver)
+    if pooled:
+        _driver_pool(request.config).release(interface)
+    else:
+        interface.driver.quit()
+    allure.attach(json.dumps({'profile': interface.profile.name, 'startup_s': interface.startup_s,
+                              'actions': summarize_page_loads(RECORDS[first_record:])}, indent=2),
+                  name='browser profile cost', attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="module")
+def clients_page(selenium_interface):
+    """
+    Fixture to initialize the Advisor Clients Page.
+    """
+    from pages.advisor_clients_page import AdvisorClientsPage
+
+    clients = AdvisorClientsPage(selenium_interface.driver)
+    return clients
+
+
+@pytest.fixture(scope="module")
+def new_clients_page(selenium_interface, cleanup_registry):
+    """
+    Fixture to initialize the New Client Page.
+    Every client it adds is registered for deletion at the end of the session.
+    """
+    from pages.new_client_page import NewClientPage
+
+    return NewClientPage(selenium_interface.driver, on_client_created=cleanup_registry.register)
+
+
+@pytest.fixture
+def network_recorder(request, selenium_interface):
+    """
+    Fixture recording the network traffic of a UI test as a HAR trace.
+    The trace is attached to the Allure report, and also written to --har-dir when given.
+    """
+    import allure
+    from support.network_recorder import NetworkRecorder
+
+    recorder = NetworkRecorder(selenium_interface.driver, request.node.name)
+    yield recorder
+    har = recorder.to_json()
+    allure.attach(har, name='network.har', attachment_type=allure.attachment_type.JSON)
+    har_dir = request.config.getoption('--har-dir')
+    if har_dir:
+        os.makedirs(har_dir, exist_ok=True)
+        safe_name = ''.join(ch if ch.isalnum() or ch in '-_.' else '_' for ch in request.node.nodeid)
+        with open(os.path.join(har_dir, f'{safe_name}.har'), 'w', encoding='utf-8') as f:
+            f.write(har)
+
+
+@pytest.fixture(scope="session")
+def session_cache():
+    """
+    Fixture providing the authenticated-session cache shared by all modules and workers.
+    Set CLIENT_TESTS_SESSION_CACHE=off to always run the full sign-in flow.
+    """
+    from pages.login_page import LoginPage
+
+    if os.environ.get(SESSION_CACHE_ENV, '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+    return SessionCache(LoginPage.user_name)
+
+
+@pytest.fixture(scope="module")
+def login(selenium_interface, session_cache):
+    """
+    Fixture to log in to the application, reusing a cached session when it is still valid.
+    """
+    from pages.login_page import LoginPage
+
+    login_page = LoginPage(selenium_interface.driver)
+    login_page.login(session_cache)
+
+
+@pytest.fixture(scope="session")
+def client_seeder():
+    """
+    Fixture providing the create- and delete-client calls learned from the performance log.
+    """
+    from support.client_seeder import ClientSeeder
+
+    return ClientSeeder()
+
+
+@pytest.fixture
+def seeded_client(request, selenium_interface, login, clients_page, new_clients_page, data_namespace,
+                  client_seeder, cleanup_registry):
+    """
+    Fixture creating a client for tests that do not exercise the new-client form.
+
+    In api mode the client is created by replaying the backend call learned from
+    the first client added through the form. The clients grid is not reloaded.
+    The client is deleted with the rest of the session's clients at the end of the run.
+    """
+    client = data_namespace.client()
+    if request.config.getoption('--client-seeding') == 'api' and client_seeder.can_seed(client):
+        client.clientId = client_seeder.create(selenium_interface.driver, client)
+        cleanup_registry.register(client.clientId)
+    else:
+        client.clientId = client_seeder.create_through_ui(selenium_interface.driver, clients_page,
+                                                          new_clients_page, client)
+    return client
+
+
+def _delete_clients(config, registry: CleanupRegistry, seeder: 'ClientSeeder', session_cache) -> None:
+    """
+    Delete the session's clients, through the learned API call when possible.
+
+    A browser is only started when a client has to be deleted through the UI
+    or no cached session provides the cookies for the API call.
+    """
+    from pages.advisor_clients_page import AdvisorClientsPage
+    from pages.login_page import LoginPage
+
+    browser = {}
+
+    def driver():
+        if 'interface' not in browser:
+            _browser_stack(config)
+            pooled = config.getoption('--driver-pool-size') > 0
+            interface = _driver_pool(config).acquire() if pooled \
+                else SeleniumInterface(config.getoption('--browser-profile'))
+            LoginPage(interface.driver).login(session_cache)
+            browser.update(interface=interface, pooled=pooled, home=interface.driver.current_url,
+                           clients_page=AdvisorClientsPage(interface.driver))
+        return browser['interface'].driver
+
+    def cookies():
+        if 'cookies' not in browser:
+            session = session_cache.load() if session_cache else None
+            browser['cookies'] = {cookie['name']: cookie['value'] for cookie in
+                                  (session['cookies'] if session else driver().get_cookies())}
+        return browser['cookies']
+
+    def delete_through_ui(client_id):
+        driver().get(browser['home'])
+        seeder.delete_through_ui(driver(), browser['clients_page'], client_id)
+
+    try:
+        failed = registry.flush(delete_through_ui, lambda client_id: seeder.delete(cookies(), client_id),
+                                lambda: seeder.delete_recipe is not None)
+        if failed and seeder.delete_recipe is not None:
+            # The API path may fail on an expired session; give the failures one UI attempt
+            for client_id in list(failed):
+                registry.failed.pop(client_id)
+                registry.register(client_id)
+            registry.flush(delete_through_ui)
+    finally:
+        if 'interface' in browser:
+            if browser['pooled']:
+                _driver_pool(config).release(browser['interface'])
+            else:
+                browser['interface'].driver.quit()
+
+
+@pytest.fixture(scope="session")
+def cleanup_registry(request, client_seeder, session_cache):
+    """
+    Fixture recording every client created by the tests.
+    At the end of the session they are deleted in one batch, and the clients that could not be
+    deleted are reported and retried by the next run.
+    """
+    # The first xdist worker retries the leftovers of previous runs
+    registry = CleanupRegistry(os.path.join(DEFAULT_CACHE_DIR, 'undeleted_clients.json'),
+                               retry_leftovers=worker_index() == 0)
+    yield registry
+    if registry.pending():
+        request.config.cleanup_registry = registry
+        _delete_clients(request.config, registry, client_seeder, session_cache)
+
+
+def pytest_sessionfinish(session):
+    """
+    Wait for the failure artifacts before the run ends, and on an xdist worker hand the browser
+    startup times, page loads and booking call latency to the controller.
+    """
+    artifacts = getattr(session.config, 'failure_artifacts', None)
+    if artifacts is not None:
+        artifacts.flush()
+    workeroutput = getattr(session.config, 'workeroutput', None)
+    if workeroutput is not None:
+        page_metrics = sys.modules.get('support.page_metrics')
+        workeroutput['browser_startup_times'] = _browser_startup_times(session.config)
+        workeroutput['booking_latency'] = getattr(session.config, 'booking_latency', None)
+        workeroutput['page_loads'] = [{name: record[name] for name in PAGE_LOAD_FIELDS if name in record}
+                                      for record in (page_metrics.RECORDS if page_metrics else [])]
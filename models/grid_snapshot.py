@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class GridSnapshot:
+    """
+    Immutable, in-memory copy of the text of every cell in the clients grid.
+
+    Rows are indexed by the client ID found in their first cell, so
+    existence and data checks are dictionary lookups instead of
+    WebDriver round-trips.
+    """
+
+    version: str
+    rows: Tuple[Tuple[str, ...], ...]
+    _index: Mapping[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        index = {cells[0]: position for position, cells in enumerate(self.rows) if cells}
+        object.__setattr__(self, '_index', MappingProxyType(index))
+
+    def __contains__(self, client_id: str) -> bool:
+        return client_id in self._index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def position(self, client_id: str) -> Optional[int]:
+        """
+        Get the zero-based position of the row for the given client ID.
+
+        :param client_id: The ID of the client to look up.
+        :return: The row position, or None if the client is not in the grid.
+        """
+        return self._index.get(client_id)
+
+    def row(self, client_id: str) -> Optional[Tuple[str, ...]]:
+        """
+        Get the cell texts of the row for the given client ID.
+
+        :param client_id: The ID of the client to look up.
+        :return: A tuple of cell texts, or None if the client is not in the grid.
+        """
+        position = self._index.get(client_id)
+        return None if position is None else self.rows[position]
@@ -1,10 +1,51 @@
-from typing import Tuple, List, Optional
+from typing import Iterator, Tuple, List, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
 from models.client_model import Client
+from models.grid_snapshot import GridSnapshot
 from pages.base_page import BasePage
 from pages.single_client_page import SingleClientPage
+from pages.waits import Condition, xhr_quiet
+from support.page_metrics import measured
+
+
+# Reads every cell of the grid in one script call. A MutationObserver tags the
+# tbody with a version so an unchanged grid is answered without re-reading it;
+# navigation or a re-rendered tbody yields a fresh version.
+GRID_SNAPSHOT_SCRIPT = """
+var tbody = document.querySelector(arguments[0]);
+if (!tbody) { return null; }
+if (!tbody.__gridToken) {
+    tbody.__gridToken = Date.now().toString(36) + Math.random().toString(36).slice(2);
+    tbody.__gridCounter = 0;
+    new MutationObserver(function () { tbody.__gridCounter++; })
+        .observe(tbody, {childList: true, subtree: true, characterData: true});
+}
+var version = tbody.__gridToken + ':' + tbody.__gridCounter;
+if (version === arguments[1]) { return {version: version, rows: null}; }
+var rows = [];
+for (var i = 0; i < tbody.rows.length; i++) {
+    var cells = [];
+    var tds = tbody.rows[i].getElementsByTagName('td');
+    for (var j = 0; j < tds.length; j++) { cells.push(tds[j].innerText.trim()); }
+    rows.push(cells);
+}
+return {version: version, rows: rows};
+"""
+
+# Scrolls the grid's scroll container (or the window) to the bottom so a
+# virtual-scroll grid renders its next window; returns whether it moved.
+GRID_SCROLL_SCRIPT = """
+var tbody = document.querySelector(arguments[0]);
+if (!tbody) { return false; }
+var box = tbody.parentElement;
+while (box && box !== document.body && box.scrollHeight <= box.clientHeight) { box = box.parentElement; }
+if (!box || box === document.body) { box = document.scrollingElement; }
+var before = box.scrollTop;
+box.scrollTop = box.scrollHeight;
+return box.scrollTop !== before;
+"""
 
 
 class AdvisorClientsPage(BasePage):
@@ -28,7 +69,11 @@ class AdvisorClientsPage(BasePage):
         self.firm_field: Tuple[str, str] = (By.ID, 'orgId')
         self.firm_options: Tuple[str, str] = (By.CSS_SELECTOR, '#orgId option')
         self.clients_table: Tuple[str, str] = (By.CSS_SELECTOR, '.my-clients-table tbody')
+        self.search_field: Tuple[str, str] = (By.CSS_SELECTOR, '.my-clients-search input')
+        self.next_page_button: Tuple[str, str] = (By.CSS_SELECTOR,
+                                                  '.pagination li:not(.disabled) > a[aria-label="Next"]')
         self.single_client_page = SingleClientPage(driver)
+        self._snapshot: Optional[GridSnapshot] = None
 
     def add_client_button(self) -> None:
         """
@@ -45,6 +90,146 @@ class AdvisorClientsPage(BasePage):
         table = self.driver.find_element(*self.clients_table)
         return table.find_elements(By.TAG_NAME, "tr")
 
+    def grid_snapshot(self) -> GridSnapshot:
+        """
+        Get an immutable snapshot of the clients table.
+
+        The cached snapshot is reused until the grid changes in the browser,
+        so repeated lookups cost a single cheap script call.
+
+        :return: A GridSnapshot of the cell texts, indexed by client ID.
+        """
+        self.wait_for_presence(self.clients_table)
+        snapshot = self._read_grid()
+        assert snapshot, 'Clients table was not found'
+        return snapshot
+
+    def _read_grid(self) -> Optional[GridSnapshot]:
+        """
+        Refresh the cached snapshot from the browser without waiting for the table.
+
+        :return: The current GridSnapshot, or None if the table is not rendered.
+        """
+        known = self._snapshot.version if self._snapshot else None
+        result = self.driver.execute_script(GRID_SNAPSHOT_SCRIPT, self.clients_table[1], known)
+        if not result:
+            return None
+        if result['rows'] is not None:
+            self._snapshot = GridSnapshot(result['version'], tuple(tuple(cells) for cells in result['rows']))
+        return self._snapshot
+
+    def invalidate_snapshot(self) -> None:
+        """
+        Drop the cached grid snapshot so the next lookup reads the table again.
+        """
+        self._snapshot = None
+
+    def grid_contains_row(self, client_id: str) -> Condition:
+        """
+        Build a wait condition satisfied once the client's row is in the clients table.
+
+        :param client_id: The ID of the client expected in the table.
+        :return: A condition for :meth:`BasePage.wait_until`.
+        """
+        def check(driver) -> bool:
+            snapshot = self._read_grid()
+            return bool(snapshot) and client_id in snapshot
+
+        return Condition(check, f'client {client_id} in grid')
+
+    def _grid_changed(self, version: str) -> Condition:
+        def check(driver) -> bool:
+            snapshot = self._read_grid()
+            return bool(snapshot) and snapshot.version != version
+
+        return Condition(check, f'grid changed from version {version}')
+
+    def _advance(self, snapshot: GridSnapshot) -> bool:
+        """
+        Move the grid to its next page, or scroll a virtual-scroll grid to its next window.
+
+        A grid that is taller than the viewport but renders all its rows
+        scrolls without loading anything; it is at its end as soon as the
+        network is quiet, instead of after the full timeout.
+
+        :param snapshot: The snapshot of the currently rendered rows.
+        :return: True if new rows were rendered, False at the end of the grid.
+        :raises TimeoutException: If the grid is still loading after 10 seconds.
+        """
+        next_buttons = self.driver.find_elements(*self.next_page_button)
+        if next_buttons:
+            next_buttons[0].click()
+        elif not self.driver.execute_script(GRID_SCROLL_SCRIPT, self.clients_table[1]):
+            return False
+        self.wait_until((self._grid_changed(snapshot.version) & xhr_quiet(200)) | xhr_quiet(500), timeout=10)
+        current = self._read_grid()
+        return bool(current) and current.version != snapshot.version
+
+    def iter_grid_pages(self, max_pages: int = 1000) -> Iterator[GridSnapshot]:
+        """
+        Lazily walk the clients grid one page (or virtual-scroll window) at a time.
+
+        Each page is read with a single script call; the next page is only
+        requested when the consumer asks for it.
+
+        :param max_pages: Safety limit on the number of pages visited.
+        :return: An iterator of GridSnapshot objects, one per page.
+        """
+        snapshot = self.grid_snapshot()
+        for _ in range(max_pages):
+            yield snapshot
+            if not self._advance(snapshot):
+                return
+            snapshot = self.grid_snapshot()
+
+    def iter_rows(self) -> Iterator[Tuple[str, ...]]:
+        """
+        Lazily yield the cell texts of every row of the full clients grid.
+        Rows repeated by overlapping virtual-scroll windows are yielded once.
+        """
+        seen = set()
+        for snapshot in self.iter_grid_pages():
+            for cells in snapshot.rows:
+                key = cells[0] if cells else None
+                if key not in seen:
+                    seen.add(key)
+                    yield cells
+
+    def search_grid(self, text: str) -> GridSnapshot:
+        """
+        Filter the clients grid with its search box and wait for the filtered rows.
+
+        :param text: The text to search for, usually a client ID.
+        :return: A snapshot of the filtered grid, unchanged if the search did not change the rendered rows.
+        :raises TimeoutException: If the grid is still loading after 10 seconds.
+        """
+        snapshot = self.grid_snapshot()
+        if self.driver.find_element(*self.search_field).get_attribute('value') == text:
+            return snapshot  # already filtered by this text
+        self.fill_form({self.search_field: text})
+        # A search whose rows equal the rendered ones (no match on an empty grid) leaves the grid unchanged;
+        # it is done as soon as the network is quiet
+        self.wait_until((self._grid_changed(snapshot.version) & xhr_quiet(300)) | xhr_quiet(500), timeout=10)
+        return self.grid_snapshot()
+
+    def find_client_row(self, client_id: str) -> Optional[Tuple[str, ...]]:
+        """
+        Find the row of a client anywhere in the clients grid and leave it rendered.
+
+        The rendered page is checked first. Otherwise the grid's search box is
+        used when the page has one, which costs one filtered page load; without
+        it the pages are walked until the row is found.
+
+        :param client_id: The ID of the client to look up.
+        :return: The cell texts of the client's row, or None if it is not in the grid.
+        """
+        cells = self.grid_snapshot().row(client_id)
+        if cells is not None:
+            return cells
+        if self.driver.find_elements(*self.search_field):
+            return self.search_grid(client_id).row(client_id)
+        return next((cells for cells in self.iter_rows() if cells and cells[0] == client_id), None)
+
     def verify_client_exists_at_grid(self, client_id: str) -> bool:
         """
         Verify that a client with the given ID exists in the clients table.
@@ -54,7 +239,7 @@ class AdvisorClientsPage(BasePage):
         :return: True if the client exists in the table, False otherwise.
         :rtype: bool
         """
-        return self.get_row(client_id) is not None
+        return self.find_client_row(client_id) is not None
 
     def verify_client_data_at_grid(self, client_id: str, client: Client) -> bool:
         """
@@ -67,31 +252,33 @@ class AdvisorClientsPage(BasePage):
         :return: True if the client data matches, False otherwise.
         :rtype: bool
         """
-        row = self.get_row(client_id)
-        if row:
-            cells = row.find_elements(By.TAG_NAME, "td")
-            if cells and cells[0].text == client_id:
-                if (cells[1].text == client.first_name + ' ' + client.last_name and
-                        cells[2].text == client.email and
-                        cells[6].text == client.repId):
-                    return True
+        cells = self.find_client_row(client_id)
+        if cells and len(cells) > 6:
+            if (cells[1] == client.first_name + ' ' + client.last_name and
+                    cells[2] == client.email and
+                    cells[6] == client.repId):
+                return True
         return False
 
-    def get_row(self, client_id: str):
+    @measured('get_row')
+    def get_row(self, client_id: str) -> WebElement:
         """
         Get the row in the clients table corresponding to the given client ID.
 
+        The row is located through the grid snapshot, searching or paging the
+        grid when it is not rendered, so only the matching row element is
+        fetched from the browser.
+
         :param client_id: The ID of the client whose row is to be retrieved.
         :type client_id: str
-        :return: The web element representing the row for the client, or None if not found.
-        :rtype: Optional[WebElement]
+        :return: The web element representing the row for the client.
+        :rtype: WebElement
         """
-        rows = self._get_all_rows()
-        row = next(
-            (single_row for single_row in rows if single_row.find_elements(By.TAG_NAME, "td")[0].text == client_id),
-            None)
-        assert row, f'Row should not be None for client_id {client_id}'
-        return row
+        self.find_client_row(client_id)
+        position = self.grid_snapshot().position(client_id)
+        assert position is not None, f'Row should not be None for client_id {client_id}'
+        return self.driver.find_element(By.CSS_SELECTOR,
+                                        f'{self.clients_table[1]} > tr:nth-child({position + 1})')
 
     def fin(self, client_id: str = None) -> None:
         """
@@ -102,4 +289,5 @@ class AdvisorClientsPage(BasePage):
         """
         if client_id:
             self.get_row(client_id).click()
+            self.invalidate_snapshot()
             self.single_client_page.fin()
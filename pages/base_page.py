@@ -1,4 +1,4 @@
-from typing import Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver import ActionChains, Chrome, Edge, Firefox, Keys
@@ -7,11 +7,47 @@ from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.support.expected_conditions import StaleElementReferenceException
 from selenium.webdriver.support.wait import WebDriverWait
 
+from pages.cdp_transport import CdpTransport, cdp_transport
+from pages.waits import AdaptiveWait
+
+# Sets the value of every field through the native value setter, so framework
+# bindings see the change, and fires the events a user's typing would fire.
+# Returns the indexes of the fields that could not be found.
+FILL_FORM_SCRIPT = """
+var missing = [];
+arguments[0].forEach(function (field, index) {
+    var how = field[0], what = field[1], el = null;
+    if (how === 'id') { el = document.getElementById(what); }
+    else if (how === 'name') { el = document.getElementsByName(what)[0]; }
+    else if (how === 'css selector') { el = document.querySelector(what); }
+    else if (how === 'xpath') {
+        el = document.evaluate(what, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    if (!el) { missing.push(index); return; }
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    el.focus();
+    setter.call(el, field[2]);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.dispatchEvent(new Event('blur'));
+});
+return missing;
+"""
+
+
 class BasePage:
     """
     Base class for all page objects, providing common methods and utilities
     for interacting with web elements.
 
+    When the DevTools transport is enabled for the driver (see
+    :mod:`pages.cdp_transport`), the element primitives run over it instead
+    of the classic WebDriver commands. Locators whose strategy the page script
+    does not support (link text, partial link text) still use the classic
+    path; a supported locator that matches nothing times out as on the
+    classic path.
+
     :param driver: The WebDriver instance to use for interacting with the page.
     """
 
@@ -24,6 +60,67 @@ class BasePage:
         self.driver = driver
         self.wait = WebDriverWait(self.driver, 20)
         self.new_client_button: Tuple[str, str] = (By.CSS_SELECTOR, '#addNewClientBtnId')
+        self.waits = AdaptiveWait(self.driver, timeout=20)
+        self.last_metrics: Optional[dict] = None
+        self._element_cache: Dict[Tuple[str, str], WebElement] = {}
+        self.element_cache_stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'stale': 0}
+        self.transport: Optional[CdpTransport] = cdp_transport(driver)
+
+    def _fast_path(self, locator: Tuple[str, str]) -> Optional[CdpTransport]:
+        """
+        Get the DevTools transport if it can handle the locator, None for the classic path.
+        """
+        return self.transport if self.transport is not None and self.transport.supports(locator) else None
+
+    def _resolve(self, locator: Tuple[str, str], visible_only: bool = False) -> WebElement:
+        """
+        Wait for the element identified by the locator, reusing a cached handle when it is still usable.
+
+        A cached handle is checked once against the same condition instead of
+        being looked up again; a handle that is stale, or attached but hidden
+        or disabled, is dropped and the locator is resolved from scratch, so a
+        replaced element is not waited on until the timeout.
+
+        :param locator: A tuple containing the By strategy and the locator of the element.
+        :param visible_only: Wait for visibility instead of clickability.
+        :return: The web element.
+        """
+        el = self._element_cache.get(locator)
+        if el is not None:
+            condition = expected_conditions.visibility_of(el) if visible_only \
+                else expected_conditions.element_to_be_clickable(el)
+            try:
+                if condition(self.driver):
+                    self.element_cache_stats['hits'] += 1
+                    return el
+            except StaleElementReferenceException:
+                self.element_cache_stats['stale'] += 1
+            del self._element_cache[locator]
+        self.element_cache_stats['misses'] += 1
+        condition = expected_conditions.visibility_of_element_located(locator) if visible_only \
+            else expected_conditions.element_to_be_clickable(locator)
+        el = self.wait.until(condition)
+        self._element_cache[locator] = el
+        return el
+
+    def _act(self, locator: Tuple[str, str], action: Callable[[WebElement], Any], visible_only: bool = False) -> Any:
+        """
+        Run an action on the element identified by the locator, retrying once
+        with a fresh handle if the element went stale in between.
+        """
+        el = self._resolve(locator, visible_only)
+        try:
+            return action(el)
+        except StaleElementReferenceException:
+            self.element_cache_stats['stale'] += 1
+            self._element_cache.pop(locator, None)
+            return action(self._resolve(locator, visible_only))
+
+    def clear_element_cache(self) -> None:
+        """
+        Forget every cached element handle, for example after a navigation.
+        """
+        self._element_cache.clear()
 
     def click(self, locator: Tuple[str, str]) -> None:
         """
@@ -31,10 +128,9 @@ class BasePage:
 
         :param locator: A tuple containing the By strategy and the locator of the element.
         """
-        el: WebElement = self.wait.until(
-            expected_conditions.element_to_be_clickable(locator)
-        )
-        el.click()
+        if self._fast_path(locator):
+            return self.transport.click(locator)
+        self._act(locator, lambda el: el.click())
 
     def fill_text(self, locator: Tuple[str, str], txt: str) -> None:
         """
@@ -43,12 +139,39 @@ class BasePage:
         :param locator: A tuple containing the By strategy and the locator of the element.
         :param txt: The text to be filled into the element.
         """
-        el: WebElement = self.wait.until(
-            expected_conditions.element_to_be_clickable(locator)
-        )
-        el.click()
-        el.clear()
-        el.send_keys(txt)
+        if self._fast_path(locator):
+            return self.transport.fill_text(locator, txt)
+
+        def type_text(el: WebElement) -> None:
+            el.click()
+            el.clear()
+            el.send_keys(txt)
+
+        self._act(locator, type_text)
+
+    def fill_form(self, values: Dict[Tuple[str, str], str],
+                  keystroke_locators: Tuple[Tuple[str, str], ...] = ()) -> None:
+        """
+        Fill several text fields with a single script execution.
+
+        Each field receives input and change events as if it had been typed in.
+        Fields in ``keystroke_locators``, and fields the script cannot resolve,
+        are filled with real keystrokes through :meth:`fill_text`.
+
+        :param values: Mapping of field locators to the text to fill in.
+        :param keystroke_locators: Locators of fields that need real keystrokes.
+        """
+        scripted: List[Tuple[Tuple[str, str], str]] = [(locator, txt) for locator, txt in values.items()
+                                                        if locator not in keystroke_locators]
+        if scripted:
+            self.wait_for(scripted[0][0])
+            missing = self.driver.execute_script(FILL_FORM_SCRIPT,
+                                                 [[how, what, txt] for (how, what), txt in scripted])
+            for index in missing:
+                self.fill_text(*scripted[index])
+        for locator in keystroke_locators:
+            if locator in values:
+                self.fill_text(locator, values[locator])
 
     def wait_for(self, locator: Tuple[str, str]) -> WebElement:
         """
@@ -57,11 +180,33 @@ class BasePage:
         :param locator: A tuple containing the By strategy and the locator of the element.
         :return: The web element that is clickable.
         """
+        if self._fast_path(locator):
+            self.transport.wait_for(locator)
+            return self.driver.find_element(*locator)
+        return self._resolve(locator)
+
+    def wait_for_presence(self, locator: Tuple[str, str]) -> WebElement:
+        """
+        Wait for a web element to be present in the DOM and return it.
+
+        :param locator: A tuple containing the By strategy and the locator of the element.
+        :return: The web element that is present.
+        """
         el: WebElement = self.wait.until(
-            expected_conditions.element_to_be_clickable(locator)
+            expected_conditions.presence_of_element_located(locator)
         )
         return el
 
+    def wait_until(self, condition: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Wait for a condition from :mod:`pages.waits` using adaptive polling.
+
+        :param condition: The condition to wait for.
+        :param timeout: Timeout in seconds for this wait, defaults to 20 seconds.
+        :return: The truthy value returned by the condition.
+        """
+        return self.waits.until(condition, timeout=timeout)
+
     def select_option(self, locator: Tuple[str, str], txt: str) -> None:
         """
         Select an option from a dropdown or list identified by the locator.
@@ -69,6 +214,9 @@ class BasePage:
         :param locator: A tuple containing the By strategy and the locator of the options list.
         :param txt: The text of the option to be selected.
         """
+        if self._fast_path(locator):
+            assert self.transport.select_option(locator, txt), f'Option {txt} was not visible'
+            return
         self.wait.until(
             expected_conditions.presence_of_element_located(locator)
         )
@@ -83,10 +231,9 @@ class BasePage:
 
         :param locator: A tuple containing the By strategy and the locator of the element.
         """
-        el: WebElement = self.wait.until(
-            expected_conditions.element_to_be_clickable(locator)
-        )
-        el.clear()
+        if self._fast_path(locator):
+            return self.transport.clear_text(locator)
+        self._act(locator, lambda el: el.clear())
 
     def get_text(self, locator: Tuple[str, str]) -> str:
         """
@@ -95,10 +242,9 @@ class BasePage:
         :param locator: A tuple containing the By strategy and the locator of the element.
         :return: The text of the web element.
         """
-        el: WebElement = self.wait.until(
-            expected_conditions.visibility_of_element_located(locator)
-        )
-        return el.text
+        if self._fast_path(locator):
+            return self.transport.get_text(locator)
+        return self._act(locator, lambda el: el.text, visible_only=True)
 
     def move_to_element(self, webelement: WebElement) -> None:
         """
@@ -117,18 +263,41 @@ class BasePage:
         :param locator: A tuple containing the By strategy and the locator of the element.
         :return: True if the element is displayed, False otherwise.
         """
+        if self._fast_path(locator):
+            return self.transport.is_elem_displayed(locator)
         try:
-            self.wait.until(
-                expected_conditions.element_to_be_clickable(locator)
-            )
+            self._resolve(locator)
             return True
         except StaleElementReferenceException:
             return False
         except NoSuchElementException:
             return False
 
+    def switch_to_window(self, handle: str) -> None:
+        """
+        Switch the driver to another window or tab.
+
+        :param handle: The handle of the window to switch to.
+        """
+        self.driver.switch_to.window(handle)
+        self.clear_element_cache()
+        if self.transport is not None:
+            self.transport.window_changed()
+
+    def close_window(self) -> None:
+        """
+        Close the current window and switch to the first remaining one, if any.
+        """
+        self.driver.close()
+        handles = self.driver.window_handles
+        if handles:
+            self.switch_to_window(handles[0])
+        elif self.transport is not None:
+            self.transport.window_changed()
+
     def go_back(self) -> None:
         """
         Navigate back in the browser history.
         """
         self.driver.execute_script("window.history.go(-2)")
+        self.clear_element_cache()
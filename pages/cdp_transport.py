@@ -0,0 +1,353 @@
+import itertools
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
+from selenium.webdriver.common.by import By
+
+# Locator strategies the in-page finder understands; other locators use the classic path
+SUPPORTED_STRATEGIES = (By.ID, By.NAME, By.CSS_SELECTOR, By.XPATH, By.CLASS_NAME, By.TAG_NAME)
+
+# Waits for the element located by (how, what) to reach a state, re-checking on
+# every DOM mutation instead of polling from the client. Style changes that do
+# not mutate the DOM (stylesheets, animations) are caught by a slow in-page
+# re-check. Runs the action on the element once it is ready and resolves with
+# its result, or with null on timeout.
+WAIT_SCRIPT = """
+(function (how, what, state, timeoutMs, action, arg) {
+    function find() {
+        if (how === 'id') { return document.getElementById(what); }
+        if (how === 'name') { return document.getElementsByName(what)[0] || null; }
+        if (how === 'css selector') { return document.querySelector(what); }
+        if (how === 'class name') { return document.getElementsByClassName(what)[0] || null; }
+        if (how === 'tag name') { return document.getElementsByTagName(what)[0] || null; }
+        return document.evaluate(what, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    function visible(el) {
+        var style = getComputedStyle(el);
+        return el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    }
+    function ready(el) {
+        if (state === 'present') { return true; }
+        if (!visible(el)) { return false; }
+        return state === 'visible' || !el.disabled;
+    }
+    function center(el) {
+        el.scrollIntoView({block: 'center', inline: 'center'});
+        var rect = el.getBoundingClientRect();
+        var x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+        var hit = document.elementFromPoint(x, y);
+        return hit && (hit === el || el.contains(hit)) ? {x: x, y: y} : null;
+    }
+    var actions = {
+        none: function () { return true; },
+        text: function (el) { return el.innerText; },
+        point: center,
+        clear: function (el) {
+            var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            el.focus();
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, '');
+            el.dispatchEvent(new Event('input', {bubbles: true}));
+            return true;
+        },
+        option: function () {
+            var options = document.querySelectorAll(what);
+            for (var i = 0; i < options.length; i++) {
+                var point = options[i].innerText.indexOf(arg) !== -1 && visible(options[i]) ? center(options[i]) : null;
+                if (point) { return point; }
+            }
+            return null;
+        }
+    };
+    return new Promise(function (resolve) {
+        var observer, interval, deadline;
+        function check() {
+            var el = find(), result = el && ready(el) ? actions[action](el) : null;
+            if (result === null || result === undefined) { return; }
+            observer.disconnect(); clearInterval(interval); clearTimeout(deadline);
+            resolve(result);
+        }
+        observer = new MutationObserver(check);
+        observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+        interval = setInterval(check, 100);
+        deadline = setTimeout(function () {
+            observer.disconnect(); clearInterval(interval); resolve(null);
+        }, timeoutMs);
+        check();
+    });
+})
+"""
+
+# Errors raised while the document that ran a script is being replaced; the command is retried
+_NAVIGATION_ERRORS = ('Execution context was destroyed', 'Cannot find context', 'Inspected target navigated')
+
+_transports: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_transports_lock = threading.Lock()
+
+
+def debugger_address(driver) -> Optional[str]:
+    """
+    Get the DevTools address of a local Chrome or Edge driver, None for any other driver.
+    """
+    if not isinstance(driver, ChromiumDriver):
+        return None
+    capabilities = driver.capabilities
+    options = capabilities.get('goog:chromeOptions') or capabilities.get('ms:edgeOptions') or {}
+    return options.get('debuggerAddress')
+
+
+class CdpError(WebDriverException):
+    """
+    Raised when the browser answers a DevTools command with an error.
+    """
+
+
+class CdpConnection:
+    """
+    Persistent Chrome DevTools connection to one page.
+
+    Commands are written to the websocket as soon as they are sent and the
+    answers are matched to them by a reader thread, so several commands can
+    be in flight at once. Chrome runs the commands of a connection in the
+    order they were sent.
+
+    :param url: The page's DevTools websocket URL.
+    :param timeout: Timeout for opening the connection, in seconds.
+    """
+
+    def __init__(self, url: str, timeout: float = 10):
+        import websocket
+
+        self.url = url
+        self._ws = websocket.create_connection(url, timeout=timeout, suppress_origin=True,
+                                               enable_multithread=True)
+        self._ws.settimeout(None)
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+        self._reader = threading.Thread(target=self._read, name='cdp-reader', daemon=True)
+        self._reader.start()
+
+    def send(self, method: str, params: Optional[dict] = None) -> Future:
+        """
+        Send a command without waiting for its answer.
+
+        :return: A future resolved with the command's result.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self.closed:
+                raise CdpError(f'DevTools connection {self.url} is closed')
+            command_id = next(self._ids)
+            self._pending[command_id] = future
+            self._ws.send(json.dumps({'id': command_id, 'method': method, 'params': params or {}}))
+        return future
+
+    def call(self, method: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+        return self._result(method, self.send(method, params), timeout)
+
+    def pipeline(self, *commands: Tuple[str, dict], timeout: Optional[float] = None) -> List[dict]:
+        """
+        Send every command at once and wait for all the answers.
+
+        :param commands: (method, params) pairs, run by the browser in this order.
+        :return: The results, in the order of the commands.
+        """
+        futures = [(method, self.send(method, params)) for method, params in commands]
+        return [self._result(method, future, timeout) for method, future in futures]
+
+    @staticmethod
+    def _result(method: str, future: Future, timeout: Optional[float]) -> dict:
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # Same exception as a timed-out WebDriver command
+            raise TimeoutException(f'DevTools command {method} got no answer after {timeout} s') from None
+
+    def _read(self) -> None:
+        try:
+            while True:
+                message = json.loads(self._ws.recv())
+                future = self._pending.pop(message.get('id'), None)
+                if future is None:
+                    continue
+                if 'error' in message:
+                    future.set_exception(CdpError(message['error'].get('message', str(message['error']))))
+                else:
+                    future.set_result(message.get('result', {}))
+        except Exception as error:
+            with self._lock:
+                self.closed = True
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(CdpError(f'DevTools connection closed: {error}'))
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+        self._ws.close()
+
+
+class CdpTransport:
+    """
+    Runs the BasePage primitives of one Chrome driver over DevTools connections.
+
+    Every primitive is a single in-page script that waits for its element on
+    DOM mutations and acts on it, followed for clicks and typing by trusted
+    input events sent together. One connection is kept per window. The
+    current window handle is read from the driver once and cached; call
+    :meth:`window_changed` after switching or closing a window so primitives
+    follow the driver's current window.
+
+    :param driver: A local Chrome driver.
+    :param address: The driver's DevTools address, see :func:`debugger_address`.
+    :param timeout: Default wait timeout, in seconds.
+    """
+
+    def __init__(self, driver, address: str, timeout: float = 20):
+        self._driver = weakref.ref(driver)
+        self.timeout = timeout
+        self._address = address
+        self._connections: Dict[str, CdpConnection] = {}
+        self._handle: Optional[str] = None
+        self.stats: Dict[str, int] = {'commands': 0, 'retries': 0}
+
+    @staticmethod
+    def supports(locator: Tuple[str, str]) -> bool:
+        return locator[0] in SUPPORTED_STRATEGIES
+
+    def window_changed(self) -> None:
+        """
+        Forget the cached window handle after the driver switched to or closed a window.
+        """
+        self._handle = None
+
+    def connection(self) -> CdpConnection:
+        """
+        Get the connection to the driver's current window, opening it on first use.
+
+        The window handle costs a WebDriver call, so it is only read again
+        after :meth:`window_changed` or when the cached window's connection
+        was closed, for instance because the window was.
+        """
+        connection = self._connections.get(self._handle) if self._handle is not None else None
+        if connection is None or connection.closed:
+            self._handle = handle = self._driver().current_window_handle
+            connection = self._connections.get(handle)
+            if connection is None or connection.closed:
+                connection = self._connections[handle] = CdpConnection(f'ws://{self._address}/devtools/page/{handle}')
+        return connection
+
+    def _wait(self, locator: Tuple[str, str], state: str, action: str, arg: Any = None,
+              timeout: Optional[float] = None) -> Any:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(deadline - time.monotonic(), 0)
+            expression = f'{WAIT_SCRIPT}({json.dumps(locator[0])}, {json.dumps(locator[1])}, ' \
+                         f'{json.dumps(state)}, {int(remaining * 1000)}, {json.dumps(action)}, {json.dumps(arg)})'
+            self.stats['commands'] += 1
+            try:
+                response = self.connection().call('Runtime.evaluate', {
+                    'expression': expression, 'awaitPromise': True, 'returnByValue': True}, timeout=remaining + 5)
+            except CdpError as error:
+                if not any(message in str(error) for message in _NAVIGATION_ERRORS) or time.monotonic() >= deadline:
+                    raise
+                self.stats['retries'] += 1
+                continue
+            if 'exceptionDetails' in response:
+                details = response['exceptionDetails']
+                if any(message in json.dumps(details) for message in _NAVIGATION_ERRORS) \
+                        and time.monotonic() < deadline:
+                    self.stats['retries'] += 1
+                    continue
+                raise WebDriverException(f"Script error while waiting for {locator}: {details.get('text')}")
+            value = response['result'].get('value')
+            if value is None:
+                raise TimeoutException(f'{locator} was not {state} after {timeout} s')
+            return value
+
+    def _click_at(self, point: dict) -> None:
+        mouse = {'x': point['x'], 'y': point['y'], 'button': 'left', 'clickCount': 1}
+        self.stats['commands'] += 2
+        self.connection().pipeline(('Input.dispatchMouseEvent', dict(mouse, type='mousePressed')),
+                                   ('Input.dispatchMouseEvent', dict(mouse, type='mouseReleased')),
+                                   timeout=self.timeout)
+
+    def wait_for(self, locator: Tuple[str, str], state: str = 'clickable', timeout: Optional[float] = None) -> None:
+        self._wait(locator, state, 'none', timeout=timeout)
+
+    def click(self, locator: Tuple[str, str]) -> None:
+        self._click_at(self._wait(locator, 'clickable', 'point'))
+
+    def fill_text(self, locator: Tuple[str, str], txt: str) -> None:
+        self._wait(locator, 'clickable', 'clear')
+        self.stats['commands'] += 1
+        self.connection().call('Input.insertText', {'text': txt}, timeout=self.timeout)
+
+    def clear_text(self, locator: Tuple[str, str]) -> None:
+        self._wait(locator, 'clickable', 'clear')
+
+    def get_text(self, locator: Tuple[str, str]) -> str:
+        return self._wait(locator, 'visible', 'text')
+
+    def select_option(self, locator: Tuple[str, str], txt: str) -> bool:
+        """
+        Click the first visible option of the list whose text contains ``txt``.
+
+        :return: False if no such option became clickable.
+        """
+        try:
+            point = self._wait(locator, 'present', 'option', txt)
+        except TimeoutException:
+            return False
+        self._click_at(point)
+        return True
+
+    def is_elem_displayed(self, locator: Tuple[str, str]) -> bool:
+        self.wait_for(locator)
+        return True
+
+    def close(self) -> None:
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+        self._handle = None
+
+
+def enable_cdp_transport(driver, timeout: float = 20) -> Optional[CdpTransport]:
+    """
+    Make the page objects created for this driver run their primitives over DevTools.
+
+    :return: The transport, or None when the driver exposes no DevTools address (a remote or
+        non-Chromium driver), whose page objects keep the classic WebDriver path.
+    """
+    address = debugger_address(driver)
+    if address is None:
+        return None
+    with _transports_lock:
+        transport = _transports.get(driver)
+        if transport is None:
+            transport = _transports[driver] = CdpTransport(driver, address, timeout)
+        return transport
+
+
+def disable_cdp_transport(driver) -> None:
+    with _transports_lock:
+        transport = _transports.pop(driver, None)
+    if transport is not None:
+        transport.close()
+
+
+def cdp_transport(driver) -> Optional[CdpTransport]:
+    """
+    Get the DevTools transport enabled for this driver, or None for the classic WebDriver path.
+    """
+    with _transports_lock:
+        return _transports.get(driver)
@@ -1,6 +1,30 @@
-from typing import Tuple
+import json
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from pages.base_page import BasePage
+from pages.waits import list_populated
+from support.page_metrics import measured
+from support.session_cache import SessionCache
+
+CAPTURE_STORAGE_SCRIPT = """
+var dump = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+    return items;
+};
+return [dump(window.localStorage), dump(window.sessionStorage)];
+"""
+
+RESTORE_STORAGE_SCRIPT = """
+var restore = function (storage, items) {
+    Object.keys(items).forEach(function (key) { storage.setItem(key, items[key]); });
+};
+restore(window.localStorage, %s);
+restore(window.sessionStorage, %s);
+"""
 
 
 class LoginPage(BasePage):
@@ -11,6 +35,10 @@ class LoginPage(BasePage):
     the login page, including performing the login action.
     """
 
+    signin_url: str = 'https://advisor-test.pontera.com/business/auth/signin.html'
+    user_name: str = 'Maayan+Tester1@feex.com'
+    password: str = 'Advisor0103Buckley'
+
     def __init__(self, driver):
         """
         Initialize the LoginPage.
@@ -24,22 +52,51 @@ class LoginPage(BasePage):
         self.firm_field: Tuple[str, str] = (By.ID, 'orgId')
         self.firm_options: Tuple[str, str] = (By.CSS_SELECTOR, '#orgId option')
 
-    def login(self) -> None:
+    @measured('login')
+    def login(self, session_cache: Optional[SessionCache] = None) -> None:
+        """
+        Log in to the application.
+
+        When a session cache is given, a saved session is injected into the
+        driver and checked with a single page load; the full sign-in flow runs
+        only when there is no saved session or it has expired. Concurrent
+        processes sharing the cache perform the full sign-in only once.
+
+        :param session_cache: Optional cache of the authenticated session.
+        """
+        if session_cache is None:
+            self._sign_in()
+            return
+
+        session = session_cache.load()
+        if session and self.restore_session(session):
+            return
+        with session_cache.lock:
+            # Another process may have signed in while we waited for the lock
+            fresh = session_cache.load()
+            if fresh and fresh != session and self.restore_session(fresh):
+                return
+            session_cache.clear()
+            self._sign_in()
+            session_cache.save(self.capture_session())
+
+    def _sign_in(self) -> None:
         """
         Perform the login action by filling in the username and password,
         selecting the firm, and clicking the login button.
         """
         try:
             # Navigate to the login page
-            self.driver.get('https://advisor-test.pontera.com/business/auth/signin.html')
+            self.driver.get(self.signin_url)
+            self.clear_element_cache()
             self.wait_for(self.user_name_field)
             print("Page has finished loading")
         except Exception as e:
             print(f"Error while loading page: {e}")
 
         # Fill in the username and password
-        self.fill_text(self.user_name_field, 'Maayan+Tester1@feex.com')
-        self.fill_text(self.password_field, 'Advisor0103Buckley')
+        self.fill_text(self.user_name_field, self.user_name)
+        self.fill_text(self.password_field, self.password)
 
         # Click the login button
         self.click(self.login_button)
@@ -52,3 +109,75 @@ class LoginPage(BasePage):
         # Click the login button again
         self.click(self.login_button)
         self.wait_for(self.new_client_button)
+
+    def capture_session(self) -> dict:
+        """
+        Capture the cookies and web storage of the logged-in browser.
+
+        :return: A dict that can be stored in a SessionCache.
+        """
+        local_storage, session_storage = self.driver.execute_script(CAPTURE_STORAGE_SCRIPT)
+        return {
+            'url': self.driver.current_url,
+            'cookies': self.driver.get_cookies(),
+            'local_storage': local_storage,
+            'session_storage': session_storage,
+        }
+
+    def restore_session(self, session: dict, timeout: float = 10) -> bool:
+        """
+        Inject a saved session into the driver and check that it is still valid.
+
+        On Chrome the cookies and storage are installed through the DevTools
+        protocol before the landing page loads, so the check costs one page
+        load. Other browsers first load the site origin to be allowed to set
+        cookies.
+
+        :param session: A session previously returned by :meth:`capture_session`.
+        :param timeout: Seconds to wait for the logged-in page or the sign-in form.
+        :return: True if the browser is logged in, False if the session has expired.
+        """
+        self.clear_element_cache()
+        storage_script = RESTORE_STORAGE_SCRIPT % (json.dumps(session['local_storage']),
+                                                   json.dumps(session['session_storage']))
+        try:
+            if hasattr(self.driver, 'execute_cdp_cmd'):
+                self._restore_with_cdp(session, storage_script)
+            else:
+                parts = urlsplit(session['url'])
+                self.driver.get(f'{parts.scheme}://{parts.netloc}/favicon.ico')
+                for cookie in session['cookies']:
+                    self.driver.add_cookie(cookie)
+                self.driver.execute_script(storage_script)
+                self.driver.get(session['url'])
+            logged_in = list_populated(self.new_client_button)
+            # An expired session redirects to the sign-in form, which ends the wait early
+            self.wait_until(logged_in | list_populated(self.user_name_field), timeout=timeout)
+            if logged_in(self.driver):
+                return True
+        except (TimeoutException, WebDriverException):
+            pass
+        self.driver.delete_all_cookies()
+        return False
+
+    def _restore_with_cdp(self, session: dict, storage_script: str) -> None:
+        cookies = []
+        for cookie in session['cookies']:
+            cdp_cookie = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly',
+                                                       'sameSite') if key in cookie}
+            if 'expiry' in cookie:
+                cdp_cookie['expires'] = cookie['expiry']
+            cookies.append(cdp_cookie)
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        origin = '{0.scheme}://{0.netloc}'.format(urlsplit(session['url']))
+        script = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': f'if (window === window.top && location.origin === {json.dumps(origin)}) {{'
+                      f'(function () {{ {storage_script} }})(); }}'
+        })
+        try:
+            self.driver.get(session['url'])
+        finally:
+            self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                        {'identifier': script['identifier']})
+
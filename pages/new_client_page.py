@@ -1,8 +1,9 @@
-import time
-from typing import Tuple
+from typing import Callable, Dict, Optional, Tuple
 from selenium.webdriver.common.by import By
 from models.client_model import Client
 from pages.base_page import BasePage
+from pages.waits import count_stable, option_present
+from support.page_metrics import measured
 
 
 class NewClientPage(BasePage):
@@ -13,13 +14,18 @@ class NewClientPage(BasePage):
     the new client page, including adding a new client.
     """
 
-    def __init__(self, driver):
+    # Client fields typed into text inputs; each has a locator attribute of the same name
+    text_fields: Tuple[str, ...] = ('first_name', 'last_name', 'ssn_tin', 'email', 'contactPhone', 'city')
+
+    def __init__(self, driver, on_client_created: Optional[Callable[[str], None]] = None):
         """
         Initialize the NewClientPage.
 
         :param driver: The WebDriver instance to use for interacting with the page.
+        :param on_client_created: Optional callback receiving the ID of every client added.
         """
         super().__init__(driver)
+        self.on_client_created = on_client_created
         self.first_name: Tuple[str, str] = (By.ID, "first_name")
         self.last_name: Tuple[str, str] = (By.ID, "last_name")
         self.ssn_tin: Tuple[str, str] = (By.ID, "ssn")
@@ -34,24 +40,34 @@ class NewClientPage(BasePage):
         self.client_id_label: Tuple[str, str] = (By.CSS_SELECTOR, '.field-name')
         self.client_id_value: Tuple[str, str] = (By.XPATH, '//*[@id ="client-identification"]/div[1]/div[1]/span[2]')
 
-    def add_client(self, client: Client) -> str:
+    def client_form_values(self, client: Client) -> Dict[Tuple[str, str], str]:
+        """
+        Map the text fields of a client onto the locators of the form.
+
+        :param client: A Client object containing the client's details.
+        :return: Mapping of field locators to values.
+        """
+        return {getattr(self, name): getattr(client, name) for name in self.text_fields}
+
+    @measured('add_client')
+    def add_client(self, client: Client, keystroke_fields: Tuple[str, ...] = ()) -> str:
         """
         Add a new client using the provided client data.
 
+        The text fields are filled in one script execution; fields named in
+        ``keystroke_fields`` are typed with real keystrokes instead.
+
         :param client: A Client object containing the client's details.
+        :param keystroke_fields: Names of the client fields that need real keystrokes.
         :return: The client ID of the newly added client.
         """
-        self.fill_text(self.first_name, client.first_name)
-        self.fill_text(self.last_name, client.last_name)
-        self.fill_text(self.ssn_tin, client.ssn_tin)
-        self.fill_text(self.email, client.email)
-        self.fill_text(self.contactPhone, client.contactPhone)
-        self.fill_text(self.city, client.city)
+        self.fill_form(self.client_form_values(client),
+                       keystroke_locators=tuple(getattr(self, name) for name in keystroke_fields))
         self.click(self.state)
         self.select_option(self.state_options, client.state)
         self.click(self.repId)
-        self.wait_for(self.repId_options)
-        time.sleep(3)
+        # The advisor list is loaded asynchronously, wait until it holds the advisor and stops growing
+        self.wait_until(option_present(self.repId_options, client.repId) & count_stable(self.repId_options, 300))
         self.select_option(self.repId_options, client.repId)
         self.click(self.add_client_button)
 
@@ -62,6 +78,9 @@ class NewClientPage(BasePage):
         # Retrieve and return the client ID
         client_id = self.get_text(self.client_id_value)
 
+        if self.on_client_created:
+            self.on_client_created(client_id)
+
         # Go back to clients list page
         self.go_back()
         return client_id
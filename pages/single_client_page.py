@@ -2,6 +2,7 @@ from typing import Tuple
 from selenium.webdriver.common.by import By
 from models.client_model import Client
 from pages.base_page import BasePage
+from support.page_metrics import measured
 
 
 class SingleClientPage(BasePage):
@@ -25,6 +26,7 @@ class SingleClientPage(BasePage):
                                                                 " > label")
         self.submit_reason_delete: Tuple[str, str] = (By.CSS_SELECTOR, 'div.modal-footer > div > button')
 
+    @measured('delete_client')
     def fin(self) ->None:
         """
         Delete the client.
@@ -0,0 +1,226 @@
+import time
+from typing import Any, Callable, Iterable, Optional, Tuple, Type
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+
+# Wraps XMLHttpRequest and fetch once per document so pending requests and the
+# time of the last network activity can be read back in a single script call.
+XHR_TRACKER_SCRIPT = """
+if (!window.__xhrTracker) {
+    var tracker = window.__xhrTracker = {pending: 0, last: performance.now()};
+    var done = function () { tracker.pending--; tracker.last = performance.now(); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        tracker.pending++; tracker.last = performance.now();
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            tracker.pending++; tracker.last = performance.now();
+            return fetch.apply(this, arguments).finally(done);
+        };
+    }
+}
+var last = window.__xhrTracker.last;
+performance.getEntriesByType('resource').forEach(function (entry) {
+    if (entry.initiatorType === 'xmlhttprequest' || entry.initiatorType === 'fetch') {
+        last = Math.max(last, entry.responseEnd);
+    }
+});
+return [window.__xhrTracker.pending, performance.now() - last];
+"""
+
+OPTION_TEXTS_SCRIPT = """
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]),
+                                function (el) { return el.innerText; });
+"""
+
+
+class Condition:
+    """
+    A named, composable wait condition.
+
+    A condition is called with the driver and returns a truthy value once it
+    is satisfied. Conditions combine with ``&`` and ``|``.
+
+    :param predicate: Callable taking the driver and returning a truthy value when satisfied.
+    :param description: Human readable description used in timeout messages.
+    """
+
+    def __init__(self, predicate: Callable[[Any], Any], description: str):
+        self.predicate = predicate
+        self.description = description
+
+    def __call__(self, driver) -> Any:
+        return self.predicate(driver)
+
+    def reset(self) -> None:
+        """
+        Clear any state kept between polls. Called at the start of every wait.
+        """
+
+    def __and__(self, other: 'Condition') -> 'Condition':
+        return all_of(self, other)
+
+    def __or__(self, other: 'Condition') -> 'Condition':
+        return any_of(self, other)
+
+    def __repr__(self) -> str:
+        return self.description
+
+
+class _Composite(Condition):
+
+    def __init__(self, conditions: Iterable[Condition], combine: Callable, joiner: str):
+        self.conditions = tuple(conditions)
+        super().__init__(lambda driver: combine(condition(driver) for condition in self.conditions),
+                         '(' + joiner.join(c.description for c in self.conditions) + ')')
+
+    def reset(self) -> None:
+        for condition in self.conditions:
+            condition.reset()
+
+
+def all_of(*conditions: Condition) -> Condition:
+    """
+    Build a condition satisfied when every given condition is satisfied.
+    Conditions are evaluated in order and stop at the first unsatisfied one.
+    """
+    return _Composite(conditions, all, ' and ')
+
+
+def any_of(*conditions: Condition) -> Condition:
+    """
+    Build a condition satisfied when any of the given conditions is satisfied.
+    """
+    return _Composite(conditions, any, ' or ')
+
+
+class _StableCount(Condition):
+
+    def __init__(self, locator: Tuple[str, str], stable_ms: int):
+        super().__init__(self._check, f'count of {locator} stable for {stable_ms} ms')
+        self.locator = locator
+        self.stable_ms = stable_ms
+        self._count: Optional[int] = None
+        self._since = 0.0
+
+    def reset(self) -> None:
+        self._count = None
+
+    def _check(self, driver) -> bool:
+        count = len(driver.find_elements(*self.locator))
+        now = time.monotonic()
+        if count != self._count:
+            self._count, self._since = count, now
+            return False
+        return count > 0 and (now - self._since) * 1000 >= self.stable_ms
+
+
+def list_populated(locator: Tuple[str, str], min_count: int = 1) -> Condition:
+    """
+    Condition satisfied when at least ``min_count`` elements match the locator.
+
+    :param locator: A tuple containing the By strategy and the locator of the list items.
+    :param min_count: The minimum number of items expected.
+    """
+    return Condition(lambda driver: len(driver.find_elements(*locator)) >= min_count,
+                     f'at least {min_count} of {locator}')
+
+
+def count_stable(locator: Tuple[str, str], stable_ms: int = 300) -> Condition:
+    """
+    Condition satisfied when the number of elements matching the locator has
+    not changed for ``stable_ms`` milliseconds.
+
+    :param locator: A tuple containing the By strategy and the locator of the list items.
+    :param stable_ms: How long the count must stay unchanged, in milliseconds.
+    """
+    return _StableCount(locator, stable_ms)
+
+
+def option_present(locator: Tuple[str, str], txt: str) -> Condition:
+    """
+    Condition satisfied when one of the elements matching the locator contains the text.
+    CSS locators are checked in a single script call.
+
+    :param locator: A tuple containing the By strategy and the locator of the options list.
+    :param txt: The text expected in one of the options.
+    """
+    def check(driver) -> bool:
+        if locator[0] == By.CSS_SELECTOR:
+            texts = driver.execute_script(OPTION_TEXTS_SCRIPT, locator[1])
+        else:
+            texts = [el.text for el in driver.find_elements(*locator)]
+        return any(txt in text for text in texts)
+
+    return Condition(check, f'option {txt!r} in {locator}')
+
+
+def xhr_quiet(quiet_ms: int = 500) -> Condition:
+    """
+    Condition satisfied when no XHR or fetch request is in flight and none has
+    finished during the last ``quiet_ms`` milliseconds.
+
+    :param quiet_ms: The required quiet period, in milliseconds.
+    """
+    def check(driver) -> bool:
+        pending, idle_ms = driver.execute_script(XHR_TRACKER_SCRIPT)
+        return pending == 0 and idle_ms >= quiet_ms
+
+    return Condition(check, f'no XHR for {quiet_ms} ms')
+
+
+class AdaptiveWait:
+    """
+    Wait for conditions with a polling interval that starts short and backs off.
+
+    Fast pages are detected within tens of milliseconds while slow ones are
+    not hammered with WebDriver calls.
+
+    :param driver: The WebDriver instance passed to the conditions.
+    :param timeout: Default timeout in seconds.
+    :param initial_poll: First polling interval in seconds.
+    :param max_poll: Upper bound for the polling interval in seconds.
+    :param backoff: Factor the interval grows by after each unsatisfied poll.
+    """
+
+    ignored_exceptions: Tuple[Type[Exception], ...] = (NoSuchElementException, StaleElementReferenceException)
+
+    def __init__(self, driver, timeout: float = 20, initial_poll: float = 0.05, max_poll: float = 0.5,
+                 backoff: float = 1.5):
+        self.driver = driver
+        self.timeout = timeout
+        self.initial_poll = initial_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+
+    def until(self, condition: Callable[[Any], Any], timeout: Optional[float] = None, message: str = '') -> Any:
+        """
+        Poll the condition until it returns a truthy value.
+
+        :param condition: A Condition or any callable taking the driver.
+        :param timeout: Timeout in seconds for this wait, defaults to the instance timeout.
+        :param message: Extra text for the timeout message.
+        :return: The truthy value returned by the condition.
+        :raises TimeoutException: If the condition is not satisfied in time.
+        """
+        if isinstance(condition, Condition):
+            condition.reset()
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        interval = self.initial_poll
+        while True:
+            try:
+                value = condition(self.driver)
+                if value:
+                    return value
+            except self.ignored_exceptions:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message or f'Timed out waiting for {condition!r}')
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_poll)
@@ -1,15 +1,112 @@
-from selenium import webdriver
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from support.startup_phases import phase
+
+BROWSER_PROFILE_ENV = 'BROWSER_PROFILE'
+
+# URL patterns the lean profile never downloads: images, fonts, analytics, trackers and chat widgets
+LEAN_BLOCKED_URLS: Tuple[str, ...] = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico', '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*hotjar.com*',
+    '*segment.io*', '*segment.com*', '*fullstory.com*', '*intercom.io*', '*intercomcdn.com*',
+    '*zendesk.com*', '*zdassets.com*', '*drift.com*', '*facebook.net*', '*clarity.ms*',
+)
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """
+    Chrome settings used to start a SeleniumInterface.
+
+    :param name: Name used to select the profile.
+    :param arguments: Extra Chrome command line arguments.
+    :param blocked_urls: URL patterns blocked through the DevTools protocol.
+    """
+
+    name: str
+    arguments: Tuple[str, ...] = field(default=())
+    blocked_urls: Tuple[str, ...] = field(default=())
+
+
+PROFILES: Dict[str, BrowserProfile] = {
+    'default': BrowserProfile('default'),
+    'lean': BrowserProfile(
+        'lean',
+        arguments=(
+            '--headless=new',
+            '--window-size=1280,800',
+            '--disable-extensions',
+            '--disable-background-networking',
+            '--disable-component-update',
+            '--disable-default-apps',
+            '--disable-sync',
+            '--no-first-run',
+            '--mute-audio',
+            '--blink-settings=imagesEnabled=false',
+        ),
+        blocked_urls=LEAN_BLOCKED_URLS,
+    ),
+}
+
+
+# chromedriver and Chrome binaries found by Selenium Manager, resolved once per process
+_binary_paths: Dict[str, str] = {}
+
+
+def _resolve_binaries(service, options) -> Dict[str, str]:
+    """
+    Find chromedriver and Chrome the first time a browser is launched and reuse them afterwards,
+    so later launches do not run Selenium Manager again.
+    """
+    if not _binary_paths:
+        from selenium.webdriver.common.driver_finder import DriverFinder
+
+        with phase('driver resolution'):
+            finder = DriverFinder(service, options)
+            _binary_paths.update(driver=service.env_path() or finder.get_driver_path(),
+                                 browser=finder.get_browser_path())
+    return _binary_paths
 
 
 class SeleniumInterface:
-    def __init__(self):
+    """
+    Chrome started with the given browser profile.
+
+    Selenium is imported on the first launch, so sessions that never need a
+    browser do not pay for it.
+
+    :param profile: Name of the browser profile, defaults to BROWSER_PROFILE or 'default'.
+    """
+
+    def __init__(self, profile: Optional[str] = None):
         self.driver = None
-        options = webdriver.ChromeOptions()
+        self.profile = PROFILES[profile or os.environ.get(BROWSER_PROFILE_ENV, 'default')]
+        started = time.perf_counter()
+        with phase('selenium import'):
+            from selenium.webdriver import Chrome, ChromeOptions
+            from selenium.webdriver.chrome.service import Service
+        options = ChromeOptions()
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         # options.add_argument("--start-maximized")
-        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-        self.driver = webdriver.Chrome(options=options)
+        for argument in self.profile.arguments:
+            options.add_argument(argument)
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL', 'browser': 'ALL'})
+        service = Service()
+        binaries = _resolve_binaries(service, options)
+        if binaries['browser']:
+            options.binary_location = binaries['browser']
+        service.path = binaries['driver']
+        with phase('browser launch'):
+            self.driver = Chrome(options=options, service=service)
+        if self.profile.blocked_urls:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(self.profile.blocked_urls)})
+        # Time to start chromedriver and Chrome, in seconds
+        self.startup_s = round(time.perf_counter() - started, 3)
 
     # Close the driver
     def _quit(self):
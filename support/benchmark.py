@@ -0,0 +1,151 @@
+import json
+import math
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    :param sorted_values: Values in ascending order.
+    :param fraction: Requested percentile between 0 and 1.
+    :return: The percentile, 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Latency and throughput of one operation under load. Latencies are in milliseconds.
+    """
+
+    name: str
+    concurrency: int
+    duration_s: float
+    requests: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    error_samples: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def run_load(name: str, operation: Callable[[int], None], concurrency: int = 4, duration: float = 5.0,
+             setup: Optional[Callable[[int], None]] = None) -> BenchmarkResult:
+    """
+    Call an operation from several threads for a fixed duration and measure it.
+
+    The operation receives the worker index and must raise on failure.
+
+    :param name: Name of the operation in the report.
+    :param operation: The callable to measure.
+    :param concurrency: Number of threads calling the operation.
+    :param duration: How long to run, in seconds.
+    :param setup: Optional callable run once per worker before the clock starts.
+    :return: The measured BenchmarkResult.
+    :raises Exception: The first error raised by ``setup``, once every worker has stopped.
+    """
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors: List[List[str]] = [[] for _ in range(concurrency)]
+    ready = threading.Barrier(concurrency + 1)
+    go = threading.Event()
+    deadline = [0.0]
+    setup_errors: List[BaseException] = []
+
+    def worker(index: int) -> None:
+        try:
+            if setup is not None:
+                setup(index)
+            ready.wait()
+        except threading.BrokenBarrierError:
+            return
+        except BaseException as e:
+            # Release the other workers and the caller instead of leaving them at the barrier
+            setup_errors.append(e)
+            ready.abort()
+            return
+        go.wait()
+        while time.perf_counter() < deadline[0]:
+            start = time.perf_counter()
+            try:
+                operation(index)
+            except Exception as e:
+                errors[index].append(f'{type(e).__name__}: {e}')
+                continue
+            latencies[index].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        ready.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise setup_errors[0]
+    started = time.perf_counter()
+    deadline[0] = started + duration
+    go.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = sorted(value for values in latencies for value in values)
+    all_errors = [error for values in errors for error in values]
+    return BenchmarkResult(
+        name=name, concurrency=concurrency, duration_s=round(elapsed, 3),
+        requests=len(all_latencies) + len(all_errors), errors=len(all_errors),
+        throughput_rps=round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+        p50_ms=round(percentile(all_latencies, 0.50), 3), p95_ms=round(percentile(all_latencies, 0.95), 3),
+        p99_ms=round(percentile(all_latencies, 0.99), 3),
+        max_ms=round(all_latencies[-1], 3) if all_latencies else 0.0,
+        error_samples=all_errors[:5])
+
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    """
+    Read a baseline written by :func:`write_results`.
+
+    :return: Results keyed by operation name.
+    :raises FileNotFoundError: If the baseline does not exist; a baseline that was asked for is never skipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        return {result['name']: result for result in json.load(f)['results']}
+
+
+def write_results(path: str, results: List[BenchmarkResult], **metadata) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'metadata': metadata, 'results': [result.to_dict() for result in results]}, f, indent=2)
+
+
+def find_regressions(result: BenchmarkResult, baseline: Optional[dict], threshold: float = 0.2) -> List[str]:
+    """
+    Compare a result with its baseline.
+
+    Latency percentiles may not grow, and throughput may not drop, by more than
+    ``threshold`` (a fraction of the baseline value).
+
+    :return: A description of every regression, empty if there is none.
+    """
+    if not baseline:
+        return []
+    regressions = []
+    for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+        if baseline[metric] and getattr(result, metric) > baseline[metric] * (1 + threshold):
+            regressions.append(f'{result.name} {metric} {getattr(result, metric)} > baseline {baseline[metric]}')
+    if baseline['throughput_rps'] and result.throughput_rps < baseline['throughput_rps'] * (1 - threshold):
+        regressions.append(f'{result.name} throughput {result.throughput_rps} rps < baseline '
+                           f'{baseline["throughput_rps"]} rps')
+    return regressions
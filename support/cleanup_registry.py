@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from support.file_lock import FileLock
+
+
+class CleanupRegistry:
+    """
+    Session-level record of the clients created by the tests, deleted in one batch at the end.
+
+    Clients that could not be deleted are kept in a leftovers file and retried
+    by the next run, so test data does not pile up in the clients grid. The
+    file is only rewritten by :meth:`save_leftovers`, once the deletions are
+    done, so a run that crashes before then leaves the leftovers in place.
+
+    :param leftovers_path: JSON file holding the IDs left over by previous runs.
+    :param retry_leftovers: Whether this registry deletes the leftovers of previous runs; only one
+        worker of a parallel run should.
+    """
+
+    def __init__(self, leftovers_path: str, retry_leftovers: bool = True):
+        self.leftovers_path = leftovers_path
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(leftovers_path + '.lock')
+        self._pending: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.deleted: List[str] = []
+        if retry_leftovers:
+            with self._file_lock:
+                for client_id in self._read_leftovers():
+                    self.register(client_id)
+
+    def _read_leftovers(self) -> List[str]:
+        try:
+            with open(self.leftovers_path, encoding='utf-8') as f:
+                return list(json.load(f))
+        except (OSError, ValueError):
+            return []
+
+    def _write_leftovers(self, client_ids: List[str]) -> None:
+        with open(self.leftovers_path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(set(client_ids)), f)
+
+    def register(self, client_id: Optional[str]) -> None:
+        """
+        Record a created client for deletion at the end of the session.
+        """
+        if client_id:
+            with self._lock:
+                if client_id not in self._pending:
+                    self._pending.append(client_id)
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return list(self._pending)
+
+    def flush(self, delete_one: Callable[[str], None], delete_many: Optional[Callable[[str], None]] = None,
+              can_delete_many: Callable[[], bool] = lambda: False, concurrency: int = 8) -> Dict[str, str]:
+        """
+        Delete every registered client.
+
+        Clients are deleted one by one with ``delete_one`` until
+        ``can_delete_many`` reports that the faster ``delete_many`` path is
+        available; the rest are then deleted concurrently with it.
+
+        :param delete_one: Deletes a client; used while no faster path is available.
+        :param delete_many: Thread-safe deletion used concurrently once available.
+        :param can_delete_many: Tells whether ``delete_many`` can be used yet.
+        :param concurrency: Number of concurrent ``delete_many`` calls.
+        :return: The clients that could not be deleted, with the error.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        remaining = list(pending)
+        while remaining and not (delete_many and can_delete_many()):
+            client_id = remaining.pop(0)
+            self._delete(delete_one, client_id)
+        if remaining:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='client-cleanup') as executor:
+                list(executor.map(lambda client_id: self._delete(delete_many, client_id), remaining))
+        self.save_leftovers()
+        return dict(self.failed)
+
+    def save_leftovers(self) -> None:
+        """
+        Update the leftovers file: drop the clients deleted so far and add the ones that failed.
+
+        Entries written by other workers are kept, so the file can be shared by a parallel run.
+        """
+        with self._lock:
+            deleted, failed = set(self.deleted), list(self.failed)
+        with self._file_lock:
+            self._write_leftovers([client_id for client_id in self._read_leftovers() if client_id not in deleted]
+                                  + failed)
+
+    def _delete(self, delete: Callable[[str], None], client_id: str) -> None:
+        try:
+            delete(client_id)
+        except Exception as e:
+            with self._lock:
+                self.failed[client_id] = f'{type(e).__name__}: {e}'
+        else:
+            with self._lock:
+                self.failed.pop(client_id, None)
+                self.deleted.append(client_id)
@@ -0,0 +1,358 @@
+import json
+import os
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from models.client_model import Client
+from support.file_lock import FileLock
+from support.performance_log import performance_log
+from support.session_cache import DEFAULT_CACHE_DIR
+
+# Client fields the form sends as typed text, so they can be found in the request body.
+TEXT_FIELDS: Tuple[str, ...] = ('first_name', 'last_name', 'ssn_tin', 'email', 'contactPhone', 'city')
+# Fields picked from dropdowns; the backend receives codes, so learned values are replayed as-is.
+FIXED_FIELDS: Tuple[str, ...] = ('state', 'repId')
+
+Path = List[Any]
+
+
+def _find_paths(node: Any, wanted: Dict[str, str], path: Path, found: Dict[str, Path]) -> None:
+    """
+    Record the path of every leaf in a JSON document whose value is one of the wanted values.
+    """
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = enumerate(node)
+    else:
+        for name, value in wanted.items():
+            if name not in found and str(node) == value:
+                found[name] = path
+        return
+    for key, child in items:
+        _find_paths(child, wanted, path + [key], found)
+
+
+def _get_path(node: Any, path: Path) -> Any:
+    for key in path:
+        node = node[key]
+    return node
+
+
+def _set_path(node: Any, path: Path, value: Any) -> None:
+    for key in path[:-1]:
+        node = node[key]
+    node[path[-1]] = value
+
+
+class CreateClientRecipe:
+    """
+    The create-client backend call learned from the browser's performance log.
+
+    :param url: URL of the create-client request.
+    :param method: HTTP method of the request.
+    :param headers: Request headers to replay, without cookies.
+    :param body_format: ``json`` or ``form``.
+    :param body: The request body as sent for the learning client.
+    :param field_paths: Path in the body of every text field of the client.
+    :param fixed_values: Values of the dropdown fields of the learning client.
+    :param id_path: Path of the client ID in the JSON response.
+    :param cookie_headers: Headers whose value is a copy of a cookie, mapped to the cookie name.
+    """
+
+    def __init__(self, url: str, method: str, headers: Dict[str, str], body_format: str, body: Any,
+                 field_paths: Dict[str, Path], fixed_values: Dict[str, str], id_path: Path,
+                 cookie_headers: Dict[str, str]):
+        self.url = url
+        self.method = method
+        self.headers = headers
+        self.body_format = body_format
+        self.body = body
+        self.field_paths = field_paths
+        self.fixed_values = fixed_values
+        self.id_path = id_path
+        self.cookie_headers = cookie_headers
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CreateClientRecipe':
+        return cls(**data)
+
+    def supports(self, client: Client) -> bool:
+        """
+        Check whether the client can be created by replaying this recipe.
+
+        :param client: The client to create.
+        :return: True if the client's dropdown values match the learned ones.
+        """
+        return all(getattr(client, name) == value for name, value in self.fixed_values.items())
+
+    def build_body(self, client: Client) -> Any:
+        body = json.loads(json.dumps(self.body))
+        for name, path in self.field_paths.items():
+            _set_path(body, path, getattr(client, name))
+        return body
+
+
+def learn_recipe(driver, events: List[dict], client: Client, client_id: str) -> CreateClientRecipe:
+    """
+    Find the create-client request in the performance log and build a recipe from it.
+
+    The request is the POST/PUT whose body carries the client's SSN/TIN; the
+    client ID is located in its response body through the DevTools protocol.
+
+    :param driver: The Chrome driver the client was created with.
+    :param events: Performance log events recorded while the client was created.
+    :param client: The client that was submitted through the form.
+    :param client_id: The client ID shown by the application.
+    :return: The learned recipe.
+    :raises LookupError: If the request, one of the text fields or the client ID could not be found.
+    """
+    request = next((event['params'] for event in events
+                    if event['method'] == 'Network.requestWillBeSent'
+                    and event['params']['request'].get('method') in ('POST', 'PUT')
+                    and client.ssn_tin in (event['params']['request'].get('postData') or '')), None)
+    if request is None:
+        raise LookupError('The create-client request was not found in the performance log')
+
+    raw_body = request['request']['postData']
+    try:
+        body, body_format = json.loads(raw_body), 'json'
+    except ValueError:
+        body, body_format = dict(parse_qsl(raw_body, keep_blank_values=True)), 'form'
+    field_paths: Dict[str, Path] = {}
+    _find_paths(body, {name: getattr(client, name) for name in TEXT_FIELDS}, [], field_paths)
+    missing = [name for name in TEXT_FIELDS if name not in field_paths]
+    if missing:
+        # A field sent reformatted (a masked SSN or phone) would be replayed with the learning client's value
+        raise LookupError(f'Fields {", ".join(missing)} were not found as typed in the create-client request')
+
+    response = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request['requestId']})
+    id_paths: Dict[str, Path] = {}
+    _find_paths(json.loads(response['body']), {'id': client_id}, [], id_paths)
+    if 'id' not in id_paths:
+        raise LookupError(f'Client ID {client_id} was not found in the create-client response')
+
+    cookies = {cookie['value']: cookie['name'] for cookie in driver.get_cookies()}
+    headers = {name: value for name, value in request['request']['headers'].items()
+               if name.lower() not in ('cookie', 'content-length')}
+    cookie_headers = {name: cookies[value] for name, value in headers.items() if value in cookies}
+    return CreateClientRecipe(
+        url=request['request']['url'], method=request['request']['method'], headers=headers,
+        body_format=body_format, body=body, field_paths=field_paths,
+        fixed_values={name: getattr(client, name) for name in FIXED_FIELDS},
+        id_path=id_paths['id'], cookie_headers=cookie_headers)
+
+
+class DeleteClientRecipe:
+    """
+    The delete-client backend call learned from the performance log.
+
+    The client ID in the URL and body is replaced by a ``{client_id}`` placeholder.
+
+    :param url: URL template of the request.
+    :param method: HTTP method of the request.
+    :param headers: Request headers to replay, without cookies.
+    :param body: Body template, or None for a request without body.
+    :param cookie_headers: Headers whose value is a copy of a cookie, mapped to the cookie name.
+    """
+
+    def __init__(self, url: str, method: str, headers: Dict[str, str], body: Optional[str],
+                 cookie_headers: Dict[str, str]):
+        self.url = url
+        self.method = method
+        self.headers = headers
+        self.body = body
+        self.cookie_headers = cookie_headers
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DeleteClientRecipe':
+        return cls(**data)
+
+
+def _replay_headers(headers: Dict[str, str], cookie_headers: Dict[str, str], cookies: Dict[str, str]) -> dict:
+    headers = dict(headers)
+    for header, cookie_name in cookie_headers.items():
+        if cookie_name in cookies:
+            headers[header] = cookies[cookie_name]
+    return headers
+
+
+def learn_delete_recipe(driver, events: List[dict], client_id: str) -> DeleteClientRecipe:
+    """
+    Find the delete-client request in the performance log and build a recipe from it.
+
+    The request is the last non-GET request carrying the client ID in its URL or body.
+
+    :raises LookupError: If no such request was recorded.
+    """
+    request = next((event['params']['request'] for event in reversed(events)
+                    if event['method'] == 'Network.requestWillBeSent'
+                    and event['params']['request'].get('method') in ('DELETE', 'POST', 'PUT', 'PATCH')
+                    and (client_id in event['params']['request']['url']
+                         or client_id in (event['params']['request'].get('postData') or ''))), None)
+    if request is None:
+        raise LookupError(f'The delete request of client {client_id} was not found in the performance log')
+    cookies = {cookie['value']: cookie['name'] for cookie in driver.get_cookies()}
+    headers = {name: value for name, value in request['headers'].items()
+               if name.lower() not in ('cookie', 'content-length')}
+    body = request.get('postData')
+    return DeleteClientRecipe(
+        url=request['url'].replace('{', '{{').replace('}', '}}').replace(client_id, '{client_id}'),
+        method=request['method'], headers=headers,
+        body=body.replace('{', '{{').replace('}', '}}').replace(client_id, '{client_id}') if body else None,
+        cookie_headers={name: cookies[value] for name, value in headers.items() if value in cookies})
+
+
+class ClientSeeder:
+    """
+    Create clients by replaying the application's create-client backend call.
+
+    The call is learned once from the performance log of a client created
+    through the UI form, saved next to the session cache and shared by all
+    workers. Replays go through a pooled HTTP session that carries the
+    browser's cookies. The delete-client call is learned and replayed the
+    same way.
+
+    :param cache_dir: Directory where the learned recipe is stored.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'create_client_recipe.json')
+        self.lock = FileLock(self.path + '.lock')
+        self.recipe: Optional[CreateClientRecipe] = self._load()
+        self.delete_path = os.path.join(cache_dir, 'delete_client_recipe.json')
+        self.delete_recipe: Optional[DeleteClientRecipe] = self._load_delete()
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self.http.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+    def _load(self) -> Optional[CreateClientRecipe]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return CreateClientRecipe.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _load_delete(self) -> Optional[DeleteClientRecipe]:
+        try:
+            with open(self.delete_path, encoding='utf-8') as f:
+                return DeleteClientRecipe.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _save(self, recipe, path: Optional[str] = None) -> None:
+        path = path or self.path
+        with self.lock:
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(recipe.to_dict(), f)
+            os.replace(tmp_path, path)
+
+    def forget(self) -> None:
+        """
+        Drop the learned recipes, for example after the backend calls changed.
+        """
+        self.recipe = None
+        self.delete_recipe = None
+        for path in (self.path, self.delete_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def can_seed(self, client: Client) -> bool:
+        """
+        Check whether the client can be created without the UI.
+        """
+        return self.recipe is not None and self.recipe.supports(client)
+
+    def create_through_ui(self, driver, clients_page, new_clients_page, client: Client) -> str:
+        """
+        Create a client through the form and learn the backend call from it.
+
+        :param driver: The Chrome driver with performance logging enabled.
+        :param clients_page: The AdvisorClientsPage of the driver.
+        :param new_clients_page: The NewClientPage of the driver.
+        :param client: The client to create.
+        :return: The ID of the new client.
+        """
+        log = performance_log(driver)
+        mark = log.mark()
+        clients_page.add_client_button()
+        client_id = new_clients_page.add_client(client)
+        try:
+            self.recipe = learn_recipe(driver, log.since(mark), client, client_id)
+            self._save(self.recipe)
+        except (LookupError, ValueError, KeyError) as e:
+            warnings.warn(f'Could not learn the create-client request, clients are added through the form: {e}')
+        return client_id
+
+    def create(self, driver, client: Client, timeout: float = 10) -> str:
+        """
+        Create a client by replaying the learned backend call.
+
+        :param driver: The logged-in driver whose cookies authorize the call.
+        :param client: The client to create.
+        :param timeout: Request timeout in seconds.
+        :return: The ID of the new client.
+        """
+        assert self.can_seed(client), f'The learned create-client call cannot create {client}'
+        recipe = self.recipe
+        cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+        headers = _replay_headers(recipe.headers, recipe.cookie_headers, cookies)
+        body = recipe.build_body(client)
+        data = json.dumps(body) if recipe.body_format == 'json' else urlencode(body)
+        response = self.http.request(recipe.method, recipe.url, headers=headers, cookies=cookies, data=data,
+                                     timeout=timeout)
+        assert response.ok, f"Failed to create client: {response.status_code} - {response.text}"
+        return str(_get_path(response.json(), recipe.id_path))
+
+    def delete_through_ui(self, driver, clients_page, client_id: str) -> None:
+        """
+        Delete a client through its page and learn the backend call from it.
+
+        :param driver: The Chrome driver with performance logging enabled.
+        :param clients_page: The AdvisorClientsPage of the driver, showing the clients grid.
+        :param client_id: The ID of the client to delete.
+        """
+        if not clients_page.verify_client_exists_at_grid(client_id):
+            return  # already deleted, for example by an earlier run
+        log = performance_log(driver)
+        mark = log.mark()
+        clients_page.fin(client_id)
+        if self.delete_recipe is None:
+            try:
+                self.delete_recipe = learn_delete_recipe(driver, log.since(mark), client_id)
+                self._save(self.delete_recipe, self.delete_path)
+            except (LookupError, KeyError) as e:
+                warnings.warn(f'Could not learn the delete-client request, clients are deleted through the UI: {e}')
+
+    def delete(self, cookies: Dict[str, str], client_id: str, timeout: float = 10) -> None:
+        """
+        Delete a client by replaying the learned backend call. Safe to call from several threads.
+        A client the backend no longer knows counts as deleted.
+
+        :param cookies: Cookies of a logged-in browser, by name.
+        :param client_id: The ID of the client to delete.
+        :param timeout: Request timeout in seconds.
+        """
+        recipe = self.delete_recipe
+        assert recipe is not None, 'The delete-client call has not been learned yet'
+        response = self.http.request(recipe.method, recipe.url.format(client_id=client_id),
+                                     headers=_replay_headers(recipe.headers, recipe.cookie_headers, cookies),
+                                     cookies=cookies, timeout=timeout,
+                                     data=recipe.body.format(client_id=client_id) if recipe.body else None)
+        if response.status_code in (404, 410):
+            return
+        assert response.ok, f"Failed to delete client {client_id}: {response.status_code} - {response.text}"
@@ -0,0 +1,219 @@
+import itertools
+import math
+import random
+from datetime import date, timedelta
+from typing import Iterator, Optional, Sequence, Tuple
+
+from models.booking_model import Booking
+from models.client_model import Client
+
+# Every US state with its capital, used as the client's city
+US_STATES: Tuple[Tuple[str, str], ...] = (
+    ('Alabama', 'Montgomery'), ('Alaska', 'Juneau'), ('Arizona', 'Phoenix'), ('Arkansas', 'Little Rock'),
+    ('California', 'Sacramento'), ('Colorado', 'Denver'), ('Connecticut', 'Hartford'), ('Delaware', 'Dover'),
+    ('Florida', 'Tallahassee'), ('Georgia', 'Atlanta'), ('Hawaii', 'Honolulu'), ('Idaho', 'Boise'),
+    ('Illinois', 'Springfield'), ('Indiana', 'Indianapolis'), ('Iowa', 'Des Moines'), ('Kansas', 'Topeka'),
+    ('Kentucky', 'Frankfort'), ('Louisiana', 'Baton Rouge'), ('Maine', 'Augusta'), ('Maryland', 'Annapolis'),
+    ('Massachusetts', 'Boston'), ('Michigan', 'Lansing'), ('Minnesota', 'Saint Paul'), ('Mississippi', 'Jackson'),
+    ('Missouri', 'Jefferson City'), ('Montana', 'Helena'), ('Nebraska', 'Lincoln'), ('Nevada', 'Carson City'),
+    ('New Hampshire', 'Concord'), ('New Jersey', 'Trenton'), ('New Mexico', 'Santa Fe'), ('New York', 'Albany'),
+    ('North Carolina', 'Raleigh'), ('North Dakota', 'Bismarck'), ('Ohio', 'Columbus'), ('Oklahoma', 'Oklahoma City'),
+    ('Oregon', 'Salem'), ('Pennsylvania', 'Harrisburg'), ('Rhode Island', 'Providence'), ('South Carolina', 'Columbia'),
+    ('South Dakota', 'Pierre'), ('Tennessee', 'Nashville'), ('Texas', 'Austin'), ('Utah', 'Salt Lake City'),
+    ('Vermont', 'Montpelier'), ('Virginia', 'Richmond'), ('Washington', 'Olympia'), ('West Virginia', 'Charleston'),
+    ('Wisconsin', 'Madison'), ('Wyoming', 'Cheyenne'),
+)
+
+FIRST_NAMES: Tuple[str, ...] = (
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen',
+    'Daniel', 'Lisa', 'Matthew', 'Nancy', 'Anthony', 'Betty', 'Mark', 'Sandra', 'Steven', 'Ashley',
+    'Paul', 'Emily', 'Andrew', 'Donna', 'Joshua', 'Michelle', 'Kevin', 'Carol', 'Brian', 'Amanda',
+)
+
+LAST_NAMES: Tuple[str, ...] = (
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson',
+    'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres', 'Nguyen', 'Hill', 'Flores',
+)
+
+EMAIL_DOMAINS: Tuple[str, ...] = ('yahoo.com', 'gmail.com', 'outlook.com', 'example.com')
+
+ADDITIONAL_NEEDS: Tuple[str, ...] = ('Breakfast', 'Lunch', 'Dinner', 'Late checkout', 'Parking', 'None')
+
+# Default check-in horizons start on a day of 2030 picked by the seed, never on a date relative to today
+FIRST_CHECKIN_BASE = date(2030, 1, 1)
+
+# SSN areas 001-899 without 666, groups 01-99 and serials 0001-9999
+_SSN_AREAS = tuple(area for area in range(1, 900) if area != 666)
+_SSN_SPACE = len(_SSN_AREAS) * 99 * 9999
+
+# NANP area codes and exchanges NXX (N = 2-9) without the N11 service codes, any four-digit line
+_NXX = tuple(code for code in range(200, 1000) if code % 100 != 11)
+_PHONE_SPACE = len(_NXX) * len(_NXX) * 10000
+
+# Odd 64-bit constant of Fibonacci hashing; the high bits of index * _SPREAD pick the non-unique fields
+_SPREAD = 0x9E3779B97F4A7C15
+_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class _Permutation:
+    """
+    Seeded bijection of range(size) onto itself, ``(a * i + b) % size``.
+
+    Distinct indexes always map to distinct values, so unique values come
+    from unique indexes without remembering the values handed out.
+    """
+
+    def __init__(self, size: int, rng: random.Random):
+        self.size = size
+        self.a = rng.randrange(size // 3, size)
+        while math.gcd(self.a, size) != 1:
+            self.a += 1
+        self.b = rng.randrange(size)
+
+    def __call__(self, index: int) -> int:
+        return (self.a * index + self.b) % self.size
+
+
+class ClientFactory:
+    """
+    Seeded, lazy generator of valid and unique clients.
+
+    A record is a pure function of the seed and its index: the same seed
+    always gives the same clients, in the same order, and any record can be
+    rebuilt from its index alone. SSN/TIN values follow the SSA rules (no
+    area 000, 666 or 9xx, no group 00, no serial 0000), phone numbers are
+    10-digit NANP numbers, and states are US states with their capital as
+    the city. SSN/TIN values, emails and phone numbers never repeat within
+    a seed; streams with the same seed and step but different starts are
+    disjoint, which splits a seed between xdist workers. The clients the
+    tests create in the application get their SSN/TIN, email and phone
+    number from :class:`~support.data_namespace.DataNamespace` instead,
+    which takes the other fields from a factory.
+
+    :param seed: Seed of the data set.
+    :param rep_ids: Representatives the clients are assigned to, in turn.
+    """
+
+    def __init__(self, seed: int = 0, rep_ids: Sequence[str] = ('Maayan Tester1',)):
+        self.seed = seed
+        self.rep_ids = tuple(rep_ids)
+        rng = random.Random(f'clients-{seed}')
+        self._ssn = _Permutation(_SSN_SPACE, rng)
+        self._phone = _Permutation(_PHONE_SPACE, rng)
+        self._mix = rng.getrandbits(64)
+
+    def client(self, index: int) -> Client:
+        """
+        Build the client at an index of the data set.
+        """
+        if not 0 <= index < _SSN_SPACE:
+            raise IndexError(f'Client index {index} is outside of the {_SSN_SPACE} unique SSN/TIN values')
+        ssn, serial = divmod(self._ssn(index), 9999)
+        area, group = divmod(ssn, 99)
+        phone, line = divmod(self._phone(index), 10000)
+        area_code, exchange = divmod(phone, len(_NXX))
+        spread = ((index + self._mix) * _SPREAD) & _MASK
+        first_name = FIRST_NAMES[(spread >> 32) % len(FIRST_NAMES)]
+        last_name = LAST_NAMES[(spread >> 40) % len(LAST_NAMES)]
+        state, city = US_STATES[(spread >> 48) % len(US_STATES)]
+        return Client(
+            first_name=first_name,
+            last_name=last_name,
+            ssn_tin=f'{_SSN_AREAS[area]:03d}{group + 1:02d}{serial + 1:04d}',
+            email=f'{first_name.lower()}.{last_name.lower()}.{index:x}@{EMAIL_DOMAINS[spread >> 62]}',
+            contactPhone=f'{_NXX[area_code]}{_NXX[exchange]}{line:04d}',
+            city=city,
+            state=state,
+            repId=self.rep_ids[index % len(self.rep_ids)],
+        )
+
+    def stream(self, count: Optional[int] = None, start: int = 0, step: int = 1) -> Iterator[Client]:
+        """
+        Generate clients lazily.
+
+        :param count: Number of clients, unlimited when omitted.
+        :param start: Index of the first client.
+        :param step: Distance between the indexes of consecutive clients.
+        """
+        return itertools.islice(map(self.client, itertools.count(start, step)), count)
+
+    def __iter__(self) -> Iterator[Client]:
+        return self.stream()
+
+
+class BookingFactory:
+    """
+    Seeded, lazy generator of valid bookings.
+
+    Like :class:`ClientFactory`, a booking is a pure function of the seed
+    and its index. Check-in dates fall within ``horizon_days`` after
+    ``first_checkin`` and stays last 1 to ``max_nights`` nights. Field
+    values are strings, as in :class:`~models.booking_model.Booking`;
+    :meth:`payload` gives the request body of the booking API.
+
+    :param seed: Seed of the data set.
+    :param first_checkin: Earliest check-in date, defaults to a day of 2030 derived from the seed,
+        so a seed gives the same bookings whatever the day it runs.
+    :param horizon_days: Number of days over which check-ins are spread.
+    :param max_nights: Longest stay.
+    """
+
+    def __init__(self, seed: int = 0, first_checkin: Optional[date] = None, horizon_days: int = 365,
+                 max_nights: int = 14):
+        self.seed = seed
+        self.max_nights = max_nights
+        self._mix = random.Random(f'bookings-{seed}').getrandbits(64)
+        first_checkin = first_checkin or FIRST_CHECKIN_BASE + timedelta(days=self._mix % 365)
+        # ISO dates of every day a booking can start or end, formatted once
+        self._days = tuple((first_checkin + timedelta(days=day)).isoformat()
+                           for day in range(horizon_days + max_nights))
+        self._horizon = horizon_days
+
+    def booking(self, index: int) -> Booking:
+        """
+        Build the booking at an index of the data set.
+        """
+        spread = ((index + self._mix) * _SPREAD) & _MASK
+        checkin = (spread >> 32) % self._horizon
+        return Booking(
+            firstname=FIRST_NAMES[(spread >> 16) % len(FIRST_NAMES)],
+            lastname=LAST_NAMES[(spread >> 24) % len(LAST_NAMES)],
+            totalprice=str(50 + (spread >> 44) % 1951),
+            depositpaid=str(bool(spread >> 63)),
+            bookingdates_checking=self._days[checkin],
+            bookingdates_checkout=self._days[checkin + 1 + (spread >> 56) % self.max_nights],
+            additionalneeds=ADDITIONAL_NEEDS[(spread >> 58) % len(ADDITIONAL_NEEDS)],
+        )
+
+    def stream(self, count: Optional[int] = None, start: int = 0, step: int = 1) -> Iterator[Booking]:
+        """
+        Generate bookings lazily.
+
+        :param count: Number of bookings, unlimited when omitted.
+        :param start: Index of the first booking.
+        :param step: Distance between the indexes of consecutive bookings.
+        """
+        return itertools.islice(map(self.booking, itertools.count(start, step)), count)
+
+    def __iter__(self) -> Iterator[Booking]:
+        return self.stream()
+
+    @staticmethod
+    def payload(booking: Booking) -> dict:
+        """
+        Turn a booking into the request body of the booking API.
+        """
+        return {
+            'firstname': booking.firstname,
+            'lastname': booking.lastname,
+            'totalprice': int(booking.totalprice),
+            'depositpaid': booking.depositpaid == 'True',
+            'bookingdates': {
+                'checkin': booking.bookingdates_checking,
+                'checkout': booking.bookingdates_checkout,
+            },
+            'additionalneeds': booking.additionalneeds,
+        }
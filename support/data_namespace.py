@@ -0,0 +1,116 @@
+import itertools
+import os
+import secrets
+import threading
+import zlib
+from dataclasses import replace
+from typing import Optional
+
+from models.client_model import Client
+from support.data_factory import ClientFactory
+
+# The 9 digits of an SSN/TIN (and of a phone number after its leading 1): a five-digit run prefix and a
+# four-digit slot; the slots of a prefix are dealt to the workers of the run in turn
+RUN_DIGITS = 5
+RUN_PREFIXES = 90000
+SLOTS = 9999
+
+
+def worker_index(worker_id: str = None) -> int:
+    """
+    Get the numeric index of the current pytest-xdist worker.
+
+    :param worker_id: The xdist worker id (``gw0``, ``gw1``...); read from the environment when omitted.
+    :return: The worker index, 0 when running without xdist.
+    """
+    worker_id = worker_id or os.environ.get('PYTEST_XDIST_WORKER', 'gw0')
+    digits = ''.join(ch for ch in worker_id if ch.isdigit())
+    return int(digits) if digits else 0
+
+
+class DataNamespace:
+    """
+    Generator of client data that is unique per test run and per worker.
+
+    Every value carries a five-digit run prefix shared by all workers of a
+    run and a four-digit slot. Worker ``w`` of ``n`` takes the slots
+    ``w + 1``, ``w + 1 + n``, ``w + 1 + 2n``... so the workers of a run never
+    create colliding clients. A worker that used up its slots moves on to
+    the next prefix, where the same split applies, so a run is not limited
+    in clients. Run ids from :meth:`new_run_id` are random, and two runs
+    collide with a probability of 1/90000 per prefix they use. Other run
+    ids, such as a reused CLIENT_TESTS_RUN_ID, are hashed to five digits.
+
+    With a :class:`~support.data_factory.ClientFactory`, clients built
+    without a template take their names, city, state and representative
+    from the factory's share of this worker; the SSN/TIN, email and phone
+    number always come from the namespace.
+
+    :param run_id: Identifier shared by all workers of one run.
+    :param worker: Index of the current worker.
+    :param workers: Number of workers of the run.
+    :param factory: Optional seeded factory of the non-unique client fields.
+    :raises ValueError: If the worker index is not below the number of workers, or there are more workers than slots.
+    """
+
+    def __init__(self, run_id: str, worker: int = 0, workers: int = 1, factory: Optional[ClientFactory] = None):
+        if not 0 <= worker < workers <= SLOTS:
+            raise ValueError(f'Worker {worker} of {workers} is outside of the {SLOTS} slots of a run prefix')
+        self.run_id = run_id
+        self.prefix = self.run_prefix(run_id)
+        self.worker = worker
+        self.workers = workers
+        self.factory = factory
+        self._slots_per_prefix = SLOTS // workers
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """
+        Create a random five-digit run identifier.
+        """
+        return str(secrets.randbelow(RUN_PREFIXES) + 10000)
+
+    @staticmethod
+    def run_prefix(run_id: str) -> str:
+        """
+        Get the five digits a run id contributes to the client data, hashing ids of another form.
+        """
+        if run_id.isdigit() and len(run_id) == RUN_DIGITS and run_id[0] != '0':
+            return run_id
+        return str(zlib.crc32(run_id.encode('utf-8')) % RUN_PREFIXES + 10000)
+
+    def next_serial(self) -> int:
+        """
+        Get the next value of the per-worker counter.
+        """
+        with self._lock:
+            return next(self._counter)
+
+    def client(self, template: Client = None, **overrides) -> Client:
+        """
+        Build a Client with a unique SSN/TIN, email and phone number.
+
+        :param template: Optional client to copy the non-unique fields from,
+            defaults to the factory's next client.
+        :param overrides: Field values to set on the generated client.
+        :return: A new Client instance.
+        """
+        index = self.next_serial() - 1
+        rollover, serial = divmod(index, self._slots_per_prefix)
+        prefix = (int(self.prefix) - 10000 + rollover) % RUN_PREFIXES + 10000
+        unique = f'{prefix}{serial * self.workers + self.worker + 1:04d}'
+        if template is None and self.factory is not None:
+            # The same split as the slots: worker w of n takes the factory's clients w, w + n, w + 2n...
+            template = self.factory.client(index * self.workers + self.worker)
+        template = template or Client(
+            first_name='first', last_name='last', ssn_tin='', email='', contactPhone='',
+            city='mycity', state='Alaska', repId='Maayan Tester1'
+        )
+        client = replace(template,
+                         ssn_tin=unique,
+                         email=f'client+{unique}@yahoo.com',
+                         contactPhone=f'1{unique}',
+                         clientId=None)
+        return replace(client, **overrides)
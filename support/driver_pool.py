@@ -0,0 +1,198 @@
+import queue
+import threading
+import time
+import warnings
+from typing import Callable, Dict, List, Set
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from support.performance_log import performance_log
+
+
+class DriverPool:
+    """
+    Pool of pre-started browsers that are recycled instead of relaunched.
+
+    Browsers are launched in a background thread ahead of demand. A released
+    browser has its cookies, cache and extra windows reset, as well as the
+    storage of every origin it loaded a document from, and goes back to the
+    pool; it is retired instead after ``max_uses`` uses or when it no longer
+    answers.
+
+    :param factory: Callable starting a new SeleniumInterface.
+    :param size: Number of idle browsers kept ready.
+    :param max_uses: Number of uses after which a browser is retired.
+    """
+
+    def __init__(self, factory: Callable, size: int = 1, max_uses: int = 20):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self._idle: 'queue.Queue' = queue.Queue()
+        self._uses: Dict[int, int] = {}
+        # Performance log position of every browser's last reset
+        self._marks: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._all: List = []
+        # Every interface the pool started, kept for reporting
+        self.launched: List = []
+        self._closed = False
+        self._warming = 0
+        self.stats: Dict[str, float] = {'launched': 0, 'reused': 0, 'retired': 0,
+                                        'launch_s': 0.0, 'reset_s': 0.0, 'waited_s': 0.0}
+        self._prewarm()
+
+    def _launch(self):
+        started = time.perf_counter()
+        interface = self.factory()
+        with self._lock:
+            self.stats['launched'] += 1
+            self.stats['launch_s'] += time.perf_counter() - started
+            self._uses[id(interface)] = 0
+            self._all.append(interface)
+            self.launched.append(interface)
+        return interface
+
+    def _warm_one(self) -> None:
+        try:
+            if not self._closed:
+                interface = self._launch()
+                if self._closed:
+                    self._retire(interface)
+                else:
+                    self._idle.put(interface)
+        except Exception as e:
+            # acquire() launches the browser itself when nothing is warming, so a lasting failure surfaces there
+            warnings.warn(f'Could not pre-start a browser: {e}')
+        finally:
+            with self._lock:
+                self._warming -= 1
+
+    def _prewarm(self) -> None:
+        with self._lock:
+            missing = self.size - self._idle.qsize() - self._warming
+            self._warming += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            threading.Thread(target=self._warm_one, name='driver-pool-warmup', daemon=True).start()
+
+    def acquire(self):
+        """
+        Get a ready browser, launching one if none is ready or being started.
+
+        :return: A SeleniumInterface with a clean browser.
+        """
+        started = time.perf_counter()
+        interface = None
+        while interface is None:
+            try:
+                interface = self._idle.get(timeout=0.2)
+            except queue.Empty:
+                # Nothing ready and nothing being started: launch one here
+                with self._lock:
+                    warming = self._warming
+                if not warming:
+                    interface = self._launch()
+        with self._lock:
+            if self._uses[id(interface)]:
+                self.stats['reused'] += 1
+            self.stats['waited_s'] += time.perf_counter() - started
+            self._uses[id(interface)] += 1
+        self._prewarm()
+        return interface
+
+    def release(self, interface) -> None:
+        """
+        Return a browser to the pool after resetting its state, or retire it.
+
+        :param interface: A SeleniumInterface obtained from :meth:`acquire`.
+        """
+        if self._closed or self._uses.get(id(interface), 0) >= self.max_uses or not self._reset(interface):
+            self._retire(interface)
+            self._prewarm()
+            return
+        self._idle.put(interface)
+
+    def _visited_origins(self, interface) -> Set[str]:
+        """
+        Get the origins of the documents, frames included, that sent requests since the browser's last reset.
+        """
+        origins = set()
+        for event in performance_log(interface.driver).since(self._marks.get(id(interface), 0)):
+            if event.get('method') == 'Network.requestWillBeSent':
+                parts = urlsplit(event['params'].get('documentURL', ''))
+                if parts.scheme in ('http', 'https'):
+                    origins.add(f'{parts.scheme}://{parts.netloc}')
+        return origins
+
+    def _reset(self, interface) -> bool:
+        """
+        Clear cookies, cache and extra windows of a browser, and the storage of every origin it visited.
+
+        The visited origins are read from the performance log; an origin
+        whose events were dropped from the log buffer and that is not the
+        current page's keeps its storage.
+
+        :return: False if the browser did not respond.
+        """
+        started = time.perf_counter()
+        driver = interface.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            origins = self._visited_origins(interface)
+            origin = driver.execute_script('return window.location.origin')
+            if origin and origin != 'null':
+                origins.add(origin)
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            driver.get('about:blank')
+            mark = performance_log(driver).mark()
+            with self._lock:
+                self._marks[id(interface)] = mark
+            return True
+        except WebDriverException:
+            return False
+        finally:
+            with self._lock:
+                self.stats['reset_s'] += time.perf_counter() - started
+
+    def _retire(self, interface) -> None:
+        with self._lock:
+            self.stats['retired'] += 1
+            self._uses.pop(id(interface), None)
+            self._marks.pop(id(interface), None)
+            if interface in self._all:
+                self._all.remove(interface)
+        try:
+            interface.driver.quit()
+        except WebDriverException:
+            pass
+
+    def report(self) -> Dict[str, float]:
+        """
+        Run-level statistics, including the launch time saved by reusing browsers.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        mean_launch = stats['launch_s'] / stats['launched'] if stats['launched'] else 0.0
+        stats['saved_s'] = round(stats['reused'] * mean_launch - stats['reset_s'], 2)
+        stats['launch_s'] = round(stats['launch_s'], 2)
+        stats['reset_s'] = round(stats['reset_s'], 2)
+        stats['waited_s'] = round(stats['waited_s'], 2)
+        return stats
+
+    def close(self) -> None:
+        """
+        Quit every browser of the pool.
+        """
+        self._closed = True
+        with self._lock:
+            interfaces = list(self._all)
+        for interface in interfaces:
+            self._retire(interface)
@@ -0,0 +1,204 @@
+import base64
+import hashlib
+import os
+import queue
+import re
+import threading
+import time
+from typing import Dict, Optional
+from uuid import uuid4
+
+import allure_commons
+from allure_commons.model2 import ATTACHMENT_PATTERN, Attachment, ExecutableItem
+from allure_commons.types import AttachmentType
+from selenium.common.exceptions import WebDriverException
+
+_SCRIPT_OR_STYLE = re.compile(r'(<(script|style)\b[^>]*>).*?(</\2\s*>)', re.S | re.I)
+_BETWEEN_TAGS = re.compile(r'>\s+<')
+
+
+def shrink_dom(html: str) -> bytes:
+    """
+    Drop the bodies of script and style elements and the whitespace between
+    tags, keeping a page source that still renders as HTML in the report.
+    """
+    html = _SCRIPT_OR_STYLE.sub(r'\1\3', html)
+    return _BETWEEN_TAGS.sub('><', html).encode('utf-8')
+
+
+def format_browser_log(entries: list) -> bytes:
+    """
+    Render browser console entries as one ``LEVEL message`` line each.
+    """
+    return '\n'.join(f"{entry.get('level', '')} {entry.get('message', '')}" for entry in entries).encode('utf-8')
+
+
+# Attachment kinds: how the worker turns the raw data into the file body, and the Allure type
+_KINDS = {
+    'screenshot': (base64.b64decode, AttachmentType.PNG),
+    'dom': (shrink_dom, AttachmentType.HTML),
+    'browser log': (format_browser_log, AttachmentType.TEXT),
+}
+
+
+def _allure_reporter():
+    """
+    Get the reporter of the Allure pytest plugin, or None when Allure is not collecting results.
+    """
+    for plugin in allure_commons.plugin_manager.get_plugins():
+        reporter = getattr(plugin, 'allure_logger', None)
+        if reporter is not None:
+            return reporter
+    return None
+
+
+class FailureArtifacts:
+    """
+    Screenshot, page source and browser log of the watched driver for every failed step and test.
+
+    The test thread only fetches the raw data from the browser and reserves
+    the attachments on the current Allure step or test; a background worker
+    decodes and shrinks the data, writes it and stores identical artifacts
+    once (as hard links). Artifacts that would take a test over
+    ``max_bytes_per_test`` are dropped and replaced by a short note.
+
+    Register the instance with ``allure_commons.plugin_manager`` so that it sees
+    failing ``allure.step`` blocks; an exception is captured once, on the
+    innermost step it fails, and not again by the steps and test around it.
+
+    :param results_dir: The Allure results directory, used to link duplicate artifacts.
+    :param max_bytes_per_test: Size cap of the artifacts of one test, in bytes.
+    """
+
+    def __init__(self, results_dir: Optional[str] = None, max_bytes_per_test: int = 5 * 1024 * 1024):
+        self.results_dir = results_dir
+        self.max_bytes_per_test = max_bytes_per_test
+        self.driver = None
+        self.stats: Dict[str, float] = {'captures': 0, 'written': 0, 'deduplicated': 0, 'dropped': 0,
+                                        'written_kb': 0.0, 'capture_s': 0.0, 'process_s': 0.0}
+        self._test_id: Optional[str] = None
+        self._used: Dict[str, int] = {}
+        self._captured: Optional[BaseException] = None
+        self._files_by_hash: Dict[str, str] = {}
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def watch(self, driver) -> None:
+        """
+        Capture artifacts from this driver until :meth:`unwatch` is called.
+        """
+        self.driver = driver
+
+    def unwatch(self) -> None:
+        self.driver = None
+
+    def start_test(self, test_id: str) -> None:
+        """
+        Start a new size budget for the artifacts of a test.
+        """
+        self._test_id = test_id
+        self._captured = None
+
+    def already_captured(self, error: Optional[BaseException]) -> bool:
+        return error is not None and error is self._captured
+
+    def capture(self, label: str, error: Optional[BaseException] = None) -> None:
+        """
+        Grab the raw artifacts of the watched driver and attach them to the current Allure step or test.
+
+        :param label: Prefix of the attachment names.
+        :param error: The exception being reported; it is not captured a second time.
+        """
+        reporter = _allure_reporter()
+        if self.driver is None or reporter is None or self.already_captured(error):
+            return
+        item = reporter.get_last_item(ExecutableItem)
+        if item is None:
+            return
+        self._captured = error
+        started = time.perf_counter()
+        raw = {}
+        try:
+            raw['screenshot'] = self.driver.get_screenshot_as_base64()
+            raw['dom'] = self.driver.page_source
+        except WebDriverException:
+            pass
+        try:
+            raw['browser log'] = self.driver.get_log('browser')
+        except (WebDriverException, AttributeError, ValueError):
+            pass
+        for kind, data in raw.items():
+            # Raw sizes bound the written sizes: base64 shrinks by a quarter, the DOM and log only shrink
+            size = len(data) * 3 // 4 if kind == 'screenshot' else len(data) if kind == 'dom' else \
+                sum(len(entry.get('message', '')) for entry in data)
+            used = self._used.get(self._test_id, 0)
+            if used + size > self.max_bytes_per_test:
+                self.stats['dropped'] += 1
+                kind, data = 'note', f'{kind} dropped: the artifacts of this test are capped at ' \
+                                     f'{self.max_bytes_per_test // 1024} KB'
+            else:
+                self._used[self._test_id] = used + size
+            self._reserve(item, f'{label} {kind}', kind, data)
+        self.stats['captures'] += 1
+        self.stats['capture_s'] += time.perf_counter() - started
+
+    def _reserve(self, item: ExecutableItem, name: str, kind: str, data) -> None:
+        attachment_type = _KINDS[kind][1] if kind in _KINDS else AttachmentType.TEXT
+        file_name = ATTACHMENT_PATTERN.format(prefix=uuid4(), ext=attachment_type.extension)
+        item.attachments.append(Attachment(name=name, source=file_name, type=attachment_type.mime_type))
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='failure-artifacts', daemon=True)
+            self._worker.start()
+        self._queue.put((file_name, kind, data))
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._write(*job)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, file_name: str, kind: str, data) -> None:
+        started = time.perf_counter()
+        body = _KINDS[kind][0](data) if kind in _KINDS else data.encode('utf-8')
+        digest = hashlib.sha1(body).hexdigest()
+        original = self._files_by_hash.get(digest)
+        linked = False
+        if original is not None and self.results_dir:
+            try:
+                os.link(os.path.join(self.results_dir, original), os.path.join(self.results_dir, file_name))
+                linked = True
+            except OSError:
+                pass
+        if linked:
+            self.stats['deduplicated'] += 1
+        else:
+            allure_commons.plugin_manager.hook.report_attached_data(body=body, file_name=file_name)
+            self._files_by_hash.setdefault(digest, file_name)
+            self.stats['written'] += 1
+            self.stats['written_kb'] += len(body) / 1024
+        self.stats['process_s'] += time.perf_counter() - started
+
+    def flush(self) -> None:
+        """
+        Wait until every reserved artifact has been written.
+        """
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    @allure_commons.hookimpl(tryfirst=True)
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        """
+        Capture the artifacts of a failing ``allure.step`` while it is still the current step.
+        """
+        if exc_val is not None and isinstance(exc_val, Exception):
+            self.capture('step failure', exc_val)
@@ -0,0 +1,57 @@
+import os
+import time
+
+
+class FileLock:
+    """
+    Cross-process lock backed by the exclusive creation of a lock file.
+
+    Works the same way on every platform and for every pytest-xdist worker
+    sharing a file system. A lock file older than ``stale_after`` seconds is
+    considered abandoned by a crashed process and is removed.
+
+    :param path: Path of the lock file.
+    :param timeout: Seconds to wait for the lock before raising TimeoutError.
+    :param stale_after: Age in seconds after which an existing lock file is broken.
+    """
+
+    def __init__(self, path: str, timeout: float = 120, stale_after: float = 300):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def acquire(self) -> None:
+        deadline = time.monotonic() + self.timeout
+        interval = 0.05
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return
+            except FileExistsError:
+                self._break_if_stale()
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f'Could not acquire lock {self.path} in {self.timeout} seconds')
+            time.sleep(interval)
+            interval = min(interval * 2, 1.0)
+
+    def release(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _break_if_stale(self) -> None:
+        try:
+            if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
@@ -0,0 +1,194 @@
+import contextlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from support.performance_log import performance_log
+
+
+def _phase(timing: dict, start: str, end: str) -> float:
+    if timing.get(start, -1) < 0 or timing.get(end, -1) < 0:
+        return -1
+    return round(timing[end] - timing[start], 3)
+
+
+def build_har(events: List[dict], page_title: str = '') -> dict:
+    """
+    Build a HAR 1.2 document from DevTools Network events.
+
+    Request and response sizes come from ``postData`` and the encoded length
+    reported by ``Network.loadingFinished``; timing phases come from the
+    response's resource timing. Responses served from the memory or disk cache
+    or a service worker are flagged with ``_fromCache``.
+
+    :param events: Performance log events, oldest first.
+    :param page_title: Title of the page entry of the HAR.
+    :return: The HAR document as a dict.
+    """
+    requests: Dict[str, dict] = {}
+    order: List[str] = []
+    for event in events:
+        method, params = event.get('method', ''), event.get('params', {})
+        request_id = params.get('requestId')
+        if method == 'Network.requestWillBeSent':
+            if request_id in requests:
+                # A redirect reuses the request id; keep the final hop only
+                order.remove(request_id)
+            requests[request_id] = {'sent': params, 'from_cache': False}
+            order.append(request_id)
+            continue
+        entry = requests.get(request_id)
+        if entry is None:
+            continue
+        if method == 'Network.responseReceived':
+            entry['response'] = params['response']
+            entry['type'] = params.get('type')
+            if params['response'].get('fromDiskCache') or params['response'].get('fromServiceWorker'):
+                entry['from_cache'] = True
+        elif method == 'Network.requestServedFromCache':
+            entry['from_cache'] = True
+        elif method == 'Network.loadingFinished':
+            entry['finished'] = params
+        elif method == 'Network.loadingFailed':
+            entry['failed'] = params
+
+    entries = []
+    for request_id in order:
+        entry = requests[request_id]
+        sent, response = entry['sent'], entry.get('response', {})
+        end = entry.get('finished') or entry.get('failed')
+        timing = response.get('timing') or {}
+        transfer_size = entry['finished'].get('encodedDataLength', 0) if 'finished' in entry else 0
+        post_data = sent['request'].get('postData') or ''
+        entries.append({
+            'startedDateTime': datetime.fromtimestamp(sent.get('wallTime', 0), timezone.utc).isoformat(),
+            'time': round((end['timestamp'] - sent['timestamp']) * 1000, 3) if end else -1,
+            'request': {
+                'method': sent['request'].get('method'),
+                'url': sent['request'].get('url'),
+                'headers': [{'name': k, 'value': v} for k, v in sent['request'].get('headers', {}).items()],
+                'bodySize': len(post_data.encode()),
+            },
+            'response': {
+                'status': response.get('status', 0),
+                'statusText': response.get('statusText', ''),
+                'content': {'size': transfer_size, 'mimeType': response.get('mimeType', '')},
+                'bodySize': transfer_size,
+                '_transferSize': transfer_size,
+                '_error': entry['failed'].get('errorText') if 'failed' in entry else None,
+            },
+            'cache': {},
+            'timings': {
+                'blocked': max(timing.get('dnsStart', -1), -1),
+                'dns': _phase(timing, 'dnsStart', 'dnsEnd'),
+                'connect': _phase(timing, 'connectStart', 'connectEnd'),
+                'ssl': _phase(timing, 'sslStart', 'sslEnd'),
+                'send': _phase(timing, 'sendStart', 'sendEnd'),
+                'wait': _phase(timing, 'sendEnd', 'receiveHeadersEnd'),
+                'receive': round((end['timestamp'] - timing['requestTime']) * 1000 - timing['receiveHeadersEnd'], 3)
+                if end and 'requestTime' in timing and timing.get('receiveHeadersEnd', -1) >= 0 else -1,
+            },
+            '_resourceType': entry.get('type') or sent.get('type'),
+            '_fromCache': entry['from_cache'],
+        })
+    return {'log': {
+        'version': '1.2',
+        'creator': {'name': 'clientPytest network recorder', 'version': '1.0'},
+        'pages': [{'id': 'page_1', 'title': page_title}],
+        'entries': entries,
+    }}
+
+
+@dataclass
+class NetworkSummary:
+    """
+    Totals of a recorded segment of network traffic.
+    """
+
+    name: str
+    requests: int
+    xhr: int
+    transfer_kb: float
+    cache_hits: int
+    failed: int
+
+    def assert_within(self, max_requests: Optional[int] = None, max_kb: Optional[float] = None,
+                      max_xhr: Optional[int] = None) -> None:
+        """
+        Fail when the segment issued more requests or transferred more data than allowed.
+        """
+        problems = []
+        if max_requests is not None and self.requests > max_requests:
+            problems.append(f'{self.requests} requests > {max_requests}')
+        if max_xhr is not None and self.xhr > max_xhr:
+            problems.append(f'{self.xhr} XHR/fetch requests > {max_xhr}')
+        if max_kb is not None and self.transfer_kb > max_kb:
+            problems.append(f'{self.transfer_kb} KB > {max_kb} KB')
+        assert not problems, f'{self.name} exceeded its network budget: ' + ', '.join(problems)
+
+
+def summarize(name: str, har: dict) -> NetworkSummary:
+    entries = har['log']['entries']
+    return NetworkSummary(
+        name=name,
+        requests=len(entries),
+        xhr=sum(1 for entry in entries if entry['_resourceType'] in ('XHR', 'Fetch')),
+        transfer_kb=round(sum(entry['response']['_transferSize'] for entry in entries) / 1024, 1),
+        cache_hits=sum(1 for entry in entries if entry['_fromCache']),
+        failed=sum(1 for entry in entries if entry['response']['_error']),
+    )
+
+
+class NetworkRecorder:
+    """
+    Records the network traffic of a test from the driver's performance log.
+
+    :param driver: A Chrome driver started with performance logging.
+    :param name: Name of the recording, usually the test name.
+    """
+
+    def __init__(self, driver, name: str = ''):
+        self.name = name
+        self._log = performance_log(driver)
+        self._mark = self._log.mark()
+
+    def har(self) -> dict:
+        """
+        Get the HAR document of everything recorded since the recorder was created.
+        """
+        return build_har(self._log.since(self._mark), self.name)
+
+    def summary(self) -> NetworkSummary:
+        return summarize(self.name, self.har())
+
+    @contextlib.contextmanager
+    def segment(self, name: str) -> Iterator['_Segment']:
+        """
+        Record the traffic of a block of code.
+
+        The yielded object exposes the segment's :class:`NetworkSummary`
+        (``summary``) and HAR (``har``) once the block is done.
+
+        :param name: Name of the segment, used in budget messages.
+        """
+        segment = _Segment(name)
+        mark = self._log.mark()
+        yield segment
+        segment.har = build_har(self._log.since(mark), name)
+        segment.summary = summarize(name, segment.har)
+
+    def to_json(self) -> str:
+        return json.dumps(self.har(), indent=2)
+
+
+class _Segment:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.har: Optional[dict] = None
+        self.summary: Optional[NetworkSummary] = None
+
+    def assert_within(self, **budget) -> None:
+        assert self.summary is not None, f'Segment {self.name} is still recording'
+        self.summary.assert_within(**budget)
@@ -0,0 +1,175 @@
+import functools
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+import allure
+from selenium.common.exceptions import WebDriverException
+
+from support.performance_log import performance_log
+
+# Registers a long-task observer once per document and returns the page's timing data.
+TIMING_SCRIPT = """
+if (!window.__perfLongTasks) {
+    window.__perfLongTasks = [];
+    try {
+        new PerformanceObserver(function (list) {
+            list.getEntries().forEach(function (e) { window.__perfLongTasks.push([e.startTime, e.duration]); });
+        }).observe({type: 'longtask', buffered: true});
+    } catch (e) {}
+}
+var nav = performance.getEntriesByType('navigation')[0];
+return {
+    timeOrigin: performance.timeOrigin,
+    url: location.href,
+    navigation: nav ? nav.toJSON() : null,
+    longTasks: window.__perfLongTasks.slice(),
+    paint: performance.getEntriesByType('paint').map(function (e) { return [e.name, e.startTime]; })
+};
+"""
+
+# Every metrics record produced in this process, in call order
+RECORDS: List[dict] = []
+
+# Budgets per action name, e.g. {"login": {"duration_ms": 15000, "long_task_total_ms": 1000}}
+BUDGETS: Dict[str, Dict[str, float]] = {}
+
+
+class PerformanceBudgetExceeded(AssertionError):
+    """
+    Raised when a page-object action is slower than its budget.
+    """
+
+
+def load_budgets(path: str) -> None:
+    """
+    Replace the budgets with the ones stored in a JSON file.
+    """
+    with open(path, encoding='utf-8') as f:
+        BUDGETS.clear()
+        BUDGETS.update(json.load(f))
+
+
+def _read_timing(driver) -> Optional[dict]:
+    try:
+        return driver.execute_script(TIMING_SCRIPT)
+    except WebDriverException:
+        return None
+
+
+def build_record(action: str, started_ms: float, duration_ms: float, before: Optional[dict],
+                 after: Optional[dict], events: list) -> dict:
+    """
+    Turn the page timing read before and after an action into a metrics record.
+
+    Times are in milliseconds. Navigation metrics are only present when the
+    action loaded a new document. ``tti_ms`` approximates time-to-interactive
+    as the end of the last long task (or of DOMContentLoaded) after the action
+    started, relative to its start.
+
+    :param action: Name of the page-object action.
+    :param started_ms: Wall-clock start of the action, in epoch milliseconds.
+    :param duration_ms: Wall-clock duration of the action.
+    :param before: Result of the timing script before the action.
+    :param after: Result of the timing script after the action.
+    :param events: Performance log events recorded during the action.
+    """
+    record = {
+        'action': action,
+        'duration_ms': round(duration_ms, 1),
+        'requests': sum(1 for event in events if event['method'] == 'Network.requestWillBeSent'),
+        'page_loads': sum(1 for event in events if event['method'] == 'Page.loadEventFired'),
+    }
+    if not after:
+        return record
+    origin = after['timeOrigin']
+    record['url'] = after['url']
+    record['navigated'] = not before or before['timeOrigin'] != origin
+    interactive_at = started_ms
+    navigation = after.get('navigation')
+    if record['navigated'] and navigation:
+        record.update({
+            'ttfb_ms': round(navigation['responseStart'] - navigation['requestStart'], 1),
+            'dom_content_loaded_ms': round(navigation['domContentLoadedEventEnd'], 1),
+            'load_event_ms': round(navigation['loadEventEnd'], 1),
+            'transfer_kb': round(navigation.get('transferSize', 0) / 1024, 1),
+        })
+        paint = dict(after.get('paint') or [])
+        if 'first-contentful-paint' in paint:
+            record['first_contentful_paint_ms'] = round(paint['first-contentful-paint'], 1)
+        interactive_at = max(interactive_at, origin + navigation['domContentLoadedEventEnd'])
+    long_tasks = [(start, length) for start, length in after.get('longTasks') or [] if origin + start >= started_ms]
+    record['long_tasks'] = len(long_tasks)
+    record['long_task_total_ms'] = round(sum(length for _, length in long_tasks), 1)
+    record['long_task_max_ms'] = round(max((length for _, length in long_tasks), default=0), 1)
+    if long_tasks:
+        interactive_at = max(interactive_at, max(origin + start + length for start, length in long_tasks))
+    record['tti_ms'] = round(interactive_at - started_ms, 1)
+    return record
+
+
+def check_budget(record: dict) -> None:
+    """
+    Raise PerformanceBudgetExceeded if any metric of the record is above its budget.
+    """
+    budget = BUDGETS.get(record['action'], {})
+    exceeded = [f'{metric}={record[metric]} > {limit}' for metric, limit in budget.items()
+                if metric in record and record[metric] > limit]
+    if exceeded:
+        raise PerformanceBudgetExceeded(f"{record['action']} exceeded its performance budget: " + ', '.join(exceeded))
+
+
+def measured(action: str) -> Callable:
+    """
+    Decorator for page-object methods that records browser timing for the call.
+
+    The call runs inside an Allure step; its metrics record is attached to the
+    step as JSON, and the call fails if the record is over the action's budget.
+
+    :param action: Name of the action, used for the step, the record and the budget lookup.
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with allure.step(f'{action} ({type(self).__name__}.{method.__name__})'):
+                log = performance_log(self.driver)
+                mark = log.mark()
+                before = _read_timing(self.driver)
+                started_ms = time.time() * 1000
+                started = time.perf_counter()
+                result = method(self, *args, **kwargs)
+                duration_ms = (time.perf_counter() - started) * 1000
+                record = build_record(action, started_ms, duration_ms, before, _read_timing(self.driver),
+                                      log.since(mark))
+                allure.attach(json.dumps(record, indent=2), name=f'{action} metrics',
+                              attachment_type=allure.attachment_type.JSON)
+                self.last_metrics = record
+                RECORDS.append(record)
+                check_budget(record)
+            return result
+        return wrapper
+    return decorator
+
+
+def summarize_page_loads(records: List[dict]) -> Dict[str, dict]:
+    """
+    Average the page-load cost of every action over the given records.
+
+    :return: Per action, the number of calls and the mean duration, load event and transfer size.
+    """
+    summary: Dict[str, dict] = {}
+    for record in records:
+        entry = summary.setdefault(record['action'], {'calls': 0, 'duration_ms': 0.0, 'load_event_ms': 0.0,
+                                                      'transfer_kb': 0.0, 'page_loads': 0})
+        entry['calls'] += 1
+        entry['duration_ms'] += record['duration_ms']
+        if 'load_event_ms' in record:
+            entry['page_loads'] += 1
+            entry['load_event_ms'] += record['load_event_ms']
+            entry['transfer_kb'] += record['transfer_kb']
+    for entry in summary.values():
+        entry['duration_ms'] = round(entry['duration_ms'] / entry['calls'], 1)
+        if entry['page_loads']:
+            entry['load_event_ms'] = round(entry['load_event_ms'] / entry['page_loads'], 1)
+            entry['transfer_kb'] = round(entry['transfer_kb'] / entry['page_loads'], 1)
+    return summary
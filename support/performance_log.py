@@ -0,0 +1,74 @@
+import json
+import threading
+import weakref
+from typing import List
+
+from selenium.common.exceptions import WebDriverException
+
+_buffers: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_buffers_lock = threading.Lock()
+
+
+class PerformanceLogBuffer:
+    """
+    Shared reader of a driver's ``performance`` log.
+
+    ``driver.get_log('performance')`` drains the browser-side buffer, so every
+    consumer (client seeding, page metrics, network capture) reads through this
+    buffer instead. Consumers take a :meth:`mark` and later ask for the events
+    recorded :meth:`since` that mark.
+
+    :param driver: A Chrome driver started with ``goog:loggingPrefs`` performance logging.
+    :param max_events: Number of events kept; older events are dropped.
+    """
+
+    def __init__(self, driver, max_events: int = 100000):
+        self._driver = weakref.ref(driver)
+        self._events: List[dict] = []
+        self._dropped = 0
+        self._max_events = max_events
+        self._lock = threading.Lock()
+
+    def _drain(self) -> None:
+        driver = self._driver()
+        if driver is None:
+            return
+        try:
+            entries = driver.get_log('performance')
+        except (WebDriverException, AttributeError, ValueError):
+            return
+        self._events.extend(json.loads(entry['message'])['message'] for entry in entries)
+        overflow = len(self._events) - self._max_events
+        if overflow > 0:
+            del self._events[:overflow]
+            self._dropped += overflow
+
+    def mark(self) -> int:
+        """
+        Get a position in the log; events recorded afterwards are returned by :meth:`since`.
+        """
+        with self._lock:
+            self._drain()
+            return self._dropped + len(self._events)
+
+    def since(self, mark: int) -> List[dict]:
+        """
+        Get the events recorded after the given mark, oldest first.
+
+        :param mark: A value returned by :meth:`mark`.
+        :return: DevTools events as dicts with ``method`` and ``params``.
+        """
+        with self._lock:
+            self._drain()
+            return self._events[max(mark - self._dropped, 0):]
+
+
+def performance_log(driver) -> PerformanceLogBuffer:
+    """
+    Get the shared performance log buffer of a driver.
+    """
+    with _buffers_lock:
+        buffer = _buffers.get(driver)
+        if buffer is None:
+            buffer = _buffers[driver] = PerformanceLogBuffer(driver)
+        return buffer
@@ -0,0 +1,69 @@
+import json
+import os
+import time
+from typing import Optional
+
+from support.file_lock import FileLock
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.session_cache')
+
+
+class SessionCache:
+    """
+    File cache of an authenticated browser session shared by all test processes.
+
+    A session is the cookies plus local and session storage captured after a
+    successful login, together with the URL the login landed on. Cookies that
+    have already expired, or a session older than ``max_age`` seconds, are
+    never returned.
+
+    :param name: Name of the cached session, usually derived from the user name.
+    :param cache_dir: Directory holding the cache and lock files.
+    :param max_age: Maximum age of a session in seconds before a new login is forced.
+    """
+
+    def __init__(self, name: str, cache_dir: str = DEFAULT_CACHE_DIR, max_age: float = 8 * 3600):
+        os.makedirs(cache_dir, exist_ok=True)
+        safe_name = ''.join(ch if ch.isalnum() else '_' for ch in name)
+        self.path = os.path.join(cache_dir, f'{safe_name}.json')
+        self.max_age = max_age
+        self.lock = FileLock(self.path + '.lock')
+
+    def load(self) -> Optional[dict]:
+        """
+        Read the cached session.
+
+        :return: The session dict, or None if there is no usable session.
+        """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        if now - session.get('saved_at', 0) > self.max_age:
+            return None
+        if any(cookie.get('expiry', now + 1) <= now for cookie in session.get('cookies', [])):
+            return None
+        return session
+
+    def save(self, session: dict) -> None:
+        """
+        Write the session atomically so concurrent readers never see a partial file.
+
+        :param session: Dict with ``cookies``, ``local_storage``, ``session_storage`` and ``url``.
+        """
+        session = dict(session, saved_at=time.time())
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """
+        Remove the cached session.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
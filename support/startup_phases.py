@@ -0,0 +1,31 @@
+import contextlib
+import threading
+import time
+from typing import Dict, Iterator
+
+# When this module was imported; conftest imports it first to time its own imports
+IMPORTED_AT = time.perf_counter()
+
+# Seconds spent in each startup phase of this process (imports, collection, driver resolution, browser launch)
+PHASES: Dict[str, float] = {}
+# Number of times each phase ran
+COUNTS: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def record(name: str, seconds: float) -> None:
+    with _lock:
+        PHASES[name] = PHASES.get(name, 0.0) + seconds
+        COUNTS[name] = COUNTS.get(name, 0) + 1
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to the named startup phase.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
@@ -0,0 +1,259 @@
+import json
+import os
+import statistics
+import time
+from typing import Dict, Iterable, List, Optional
+
+import pytest
+from xdist.scheduler import LoadFileScheduling, LoadScopeScheduling
+
+from support.file_lock import FileLock
+
+# Fixture scopes whose setup is paid once per module (or class) rather than once per test
+SHARED_SCOPES = ('package', 'module', 'class')
+
+
+class TimingDatabase:
+    """
+    Durations of every test and fixture, kept across runs in a JSON file.
+
+    Tests are stored with their own cost in seconds (setup, call and teardown
+    minus the setup of the module-level fixtures they triggered) and the
+    names of the fixtures they use; fixtures with their scope and setup time.
+    New observations are blended into the stored values with an exponential
+    moving average, so the estimates follow the suite as it changes.
+
+    :param path: JSON file of the database.
+    :param smoothing: Weight of a new observation in the moving average.
+    """
+
+    def __init__(self, path: str, smoothing: float = 0.5):
+        self.path = path
+        self.smoothing = smoothing
+        self.tests: Dict[str, dict] = {}
+        self.fixtures: Dict[str, dict] = {}
+
+    def load(self) -> 'TimingDatabase':
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.tests, self.fixtures = data.get('tests', {}), data.get('fixtures', {})
+        except (OSError, ValueError):
+            self.tests, self.fixtures = {}, {}
+        return self
+
+    def to_json(self) -> dict:
+        return {'tests': self.tests, 'fixtures': self.fixtures}
+
+    def _blend(self, old: Optional[float], new: float) -> float:
+        return new if old is None else round(old + self.smoothing * (new - old), 4)
+
+    def merge(self, tests: Dict[str, dict], fixtures: Dict[str, dict]) -> None:
+        """
+        Blend the observations of a run into the file, under a lock shared with the other xdist workers.
+
+        :param tests: Per test node id, ``{'duration': seconds, 'fixtures': [names]}``.
+        :param fixtures: Per fixture name, ``{'scope': scope, 'setup': seconds}``.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with FileLock(self.path + '.lock'):
+            self.load()
+            for nodeid, observed in tests.items():
+                stored = self.tests.setdefault(nodeid, {})
+                stored['duration'] = self._blend(stored.get('duration'), observed['duration'])
+                stored['fixtures'] = observed['fixtures']
+            for name, observed in fixtures.items():
+                stored = self.fixtures.setdefault(name, {})
+                stored['scope'] = observed['scope']
+                stored['setup'] = self._blend(stored.get('setup'), observed['setup'])
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_json(), f, indent=1, sort_keys=True)
+
+    def default_duration(self) -> float:
+        """
+        Cost assumed for a test that has never run: the median of the known tests, or one second.
+        """
+        durations = [entry['duration'] for entry in self.tests.values()]
+        return statistics.median(durations) if durations else 1.0
+
+    def estimate(self, nodeids: Iterable[str]) -> float:
+        """
+        Estimated run time of a group of tests executed one after the other on the same worker.
+
+        Each test contributes its own cost; each module- or class-scoped
+        fixture the group uses contributes its setup time once.
+        """
+        default = self.default_duration()
+        total = 0.0
+        shared = set()
+        for nodeid in nodeids:
+            entry = self.tests.get(nodeid)
+            if entry is None:
+                total += default
+                continue
+            total += entry['duration']
+            shared.update(name for name in entry['fixtures']
+                          if self.fixtures.get(name, {}).get('scope') in SHARED_SCOPES)
+        return total + sum(self.fixtures[name]['setup'] for name in shared)
+
+
+def module_of(nodeid: str) -> str:
+    return nodeid.split('::', 1)[0]
+
+
+def order_longest_first(items: List[pytest.Item], database: TimingDatabase) -> None:
+    """
+    Reorder the items module by module, the costliest module first.
+
+    Tests of a module stay together and in their order, so module-scoped
+    fixtures are still set up once.
+    """
+    modules: Dict[str, List[pytest.Item]] = {}
+    for item in items:
+        modules.setdefault(module_of(item.nodeid), []).append(item)
+    ordered = sorted(modules.values(), key=lambda group: -database.estimate(item.nodeid for item in group))
+    items[:] = [item for group in ordered for item in group]
+
+
+class _LongestFirstMixin:
+    """
+    Hands out the xdist work unit with the largest estimated cost to every worker that asks for work.
+
+    Giving the longest remaining unit to the first idle worker is the
+    longest-processing-time-first rule, which keeps the run within 4/3 of the
+    shortest possible schedule.
+    """
+
+    database: TimingDatabase
+
+    def _assign_work_unit(self, node) -> None:
+        costs = {scope: self.database.estimate(nodeids) for scope, nodeids in self.workqueue.items()}
+        for scope in sorted(costs, key=costs.get, reverse=True):
+            self.workqueue.move_to_end(scope)
+        super()._assign_work_unit(node)
+
+
+class LongestFirstFileScheduling(_LongestFirstMixin, LoadFileScheduling):
+    pass
+
+
+class LongestFirstScopeScheduling(_LongestFirstMixin, LoadScopeScheduling):
+    pass
+
+
+class TimingScheduler:
+    """
+    Pytest plugin recording test and fixture durations and scheduling the run longest-first.
+
+    Every process that runs tests records them and merges them into the
+    timing database at the end of the session. Modules are ordered by their
+    estimated cost; with ``--dist loadfile`` or ``--dist loadscope`` the
+    xdist controller hands out the costliest remaining module to each idle
+    worker. xdist workers use the database snapshot of the controller, so they
+    all collect the tests in the same order.
+
+    :param config: The pytest config.
+    :param database: The timing database.
+    """
+
+    def __init__(self, config: pytest.Config, database: TimingDatabase):
+        self.config = config
+        self.database = database
+        workerinput = getattr(config, 'workerinput', None)
+        if workerinput is not None and 'test_timings' in workerinput:
+            database.tests = workerinput['test_timings']['tests']
+            database.fixtures = workerinput['test_timings']['fixtures']
+        else:
+            database.load()
+        self.workers = 1
+        self.started = time.perf_counter()
+        self.estimate: Optional[float] = None
+        self.lower_bound: Optional[float] = None
+        self._current: Optional[str] = None
+        self._phases: Dict[str, Dict[str, float]] = {}
+        self._fixtures_of: Dict[str, List[str]] = {}
+        self._shared_setup: Dict[str, float] = {}
+        self._fixture_setups: Dict[str, dict] = {}
+
+    def _is_controller(self) -> bool:
+        return self.config.pluginmanager.getplugin('dsession') is not None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node) -> None:
+        node.workerinput['test_timings'] = self.database.to_json()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        scheduling = {'loadfile': LongestFirstFileScheduling,
+                      'loadscope': LongestFirstScopeScheduling}.get(config.getvalue('dist'))
+        if scheduling is None:
+            return None
+        scheduler = scheduling(config, log)
+        scheduler.database = self.database
+        return scheduler
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items: List[pytest.Item]) -> None:
+        order_longest_first(items, self.database)
+        if getattr(self.config, 'workerinput', None) is None:
+            self._plan([[item.nodeid for item in items]])
+
+    def _plan(self, units: List[List[str]]) -> None:
+        costs = [self.database.estimate(unit) for unit in units]
+        self.estimate = sum(costs)
+        self.lower_bound = max(max(costs, default=0.0), self.estimate / self.workers)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids: List[str]) -> None:
+        dsession = self.config.pluginmanager.getplugin('dsession')
+        self.workers = len(dsession.nodemanager.specs) if dsession is not None else 1
+        units: Dict[str, List[str]] = {}
+        for nodeid in ids:
+            units.setdefault(module_of(nodeid), []).append(nodeid)
+        self._plan(list(units.values()))
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        self._current = nodeid
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: pytest.Item) -> None:
+        self._fixtures_of[item.nodeid] = list(item.fixturenames)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        started = time.perf_counter()
+        yield
+        duration = time.perf_counter() - started
+        self._fixture_setups[fixturedef.argname] = {'scope': fixturedef.scope, 'setup': round(duration, 4)}
+        if fixturedef.scope in SHARED_SCOPES and self._current is not None:
+            self._shared_setup[self._current] = self._shared_setup.get(self._current, 0.0) + duration
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if self._is_controller():
+            return
+        self._phases.setdefault(report.nodeid, {})[report.when] = report.duration
+        if report.skipped:
+            self._phases[report.nodeid]['skipped'] = True
+
+    def pytest_sessionfinish(self) -> None:
+        if self._is_controller():
+            return
+        tests = {}
+        for nodeid, phases in self._phases.items():
+            if phases.get('skipped') or 'call' not in phases:
+                continue
+            own = sum(phases.get(when, 0.0) for when in ('setup', 'call', 'teardown'))
+            tests[nodeid] = {'duration': round(max(own - self._shared_setup.get(nodeid, 0.0), 0.0), 4),
+                             'fixtures': self._fixtures_of.get(nodeid, [])}
+        if tests or self._fixture_setups:
+            self.database.merge(tests, self._fixture_setups)
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if self.estimate is None or getattr(self.config, 'workerinput', None) is not None:
+            return
+        terminalreporter.write_sep('-', 'longest-first schedule')
+        terminalreporter.write_line(f'estimated work {self.estimate:.1f} s on {self.workers} worker(s), '
+                                    f'lower bound {self.lower_bound:.1f} s, '
+                                    f'wall time {time.perf_counter() - self.started:.1f} s')
@@ -1,44 +1,34 @@
-import json
 from datetime import datetime, timedelta
 
 import pytest
-import requests
 
+from api.booking_client import BookingClient
+from api.booking_index import BookingIndex
+from api.token_provider import TokenProvider
 from models.booking_model import Booking
+from support.data_factory import BookingFactory
 
-BASE_BOOKING_URL: str = 'https://restful-booker.herokuapp.com/booking'
-HEADERS = {
-    'Content-Type': 'application/json',
-    'Accept': 'application/json'
-}
+
+@pytest.fixture(scope='session')
+def booking_client(booking_base_url, pytestconfig):
+    with BookingClient(booking_base_url) as client:
+        client.token_provider = TokenProvider(client)
+        yield client
+        pytestconfig.booking_latency = client.latency_report()
+
+
+@pytest.fixture(scope='session')
+def booking_index(booking_client):
+    return BookingIndex(booking_client)
 
 
 @pytest.fixture(scope='session')
-def auth_token():
-    url = 'https://restful-booker.herokuapp.com/auth'
-    payload = {
-        "username": "admin",
-        "password": "password123"
-    }
-    headers = {
-        'Content-Type': 'application/json'
-    }
-    response = requests.post(url, headers=headers, data=json.dumps(payload))
-    if response.status_code == 200:
-        return response.json().get('token')
-    else:
-        raise Exception(f"Failed to get auth token. Status code: {response.status_code}, Response: {response.text}")
-
-
-def datetime_serializer(obj):
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Type {type(obj)} not serializable")
-
-
-def create_booking(booking_payload: dict):
-    response = requests.post(BASE_BOOKING_URL, headers=HEADERS,
-                             data=json.dumps(booking_payload, default=datetime_serializer))
+def auth_token(booking_client):
+    return booking_client.token_provider.token()
+
+
+def create_booking(booking_payload: dict, client: BookingClient):
+    response = client.create_booking(booking_payload)
 
     assert response.status_code == 200, f"Failed to create booking: {response.status_code} - {response.text}"
 
@@ -46,18 +36,16 @@ def create_booking(booking_payload: dict):
     return new_booking
 
 
-def get_booking_by_id(new_booking_id):
-    response = requests.get(BASE_BOOKING_URL + '/' + str(new_booking_id), headers=HEADERS)
+def get_booking_by_id(new_booking_id, client: BookingClient):
+    response = client.get_booking(new_booking_id)
 
     assert response.status_code == 200, f"Failed to get booking: {response.status_code} - {response.text}"
 
     return response.json()
 
 
-def update_booking(booking: Booking, token):
-    HEADERS['Cookie'] = f'token= {token}'
-    response = requests.put(BASE_BOOKING_URL + '/' + str(booking['bookingid']), headers=HEADERS,
-                            data=json.dumps(booking['booking'], default=datetime_serializer))
+def update_booking(booking: Booking, token, client: BookingClient):
+    response = client.update_booking(booking['bookingid'], booking['booking'], token)
 
     assert response.status_code == 200, f"Failed to update booking: {response.status_code} - {response.text}"
 
@@ -65,52 +53,30 @@ def update_booking(booking: Booking, token):
 
 
 #When a user creates a new booking via API then the booking appears in all booking results.
-def test_new_booking_in_all_bookings():
-    checkin_date = datetime.now() + timedelta(days=7)
-    checkout_date = checkin_date + timedelta(days=2)
-
-    booking_payload = {
-        "firstname": "Jim",
-        "lastname": "Brown",
-        "totalprice": 111,
-        "depositpaid": True,
-        "bookingdates": {
-            "checkin": checkin_date,
-            "checkout": checkout_date
-        },
-        "additionalneeds": "Breakfast"
-    }
-
-    new_booking_id = create_booking(booking_payload)['bookingid']
-    assert get_booking_by_id(
-        new_booking_id=new_booking_id), f"The new booking id {new_booking_id} does not appear in the booking results."
+def test_new_booking_in_all_bookings(booking_client, booking_index, booking_stream):
+    booking_payload = BookingFactory.payload(next(booking_stream))
+
+    new_booking_id = create_booking(booking_payload, booking_client)['bookingid']
+    booking_index.track(new_booking_id, booking_payload)
+    assert new_booking_id in booking_index, \
+        f"The new booking id {new_booking_id} is not listed in all booking results."
+    assert get_booking_by_id(new_booking_id=new_booking_id, client=booking_client), \
+        f"The new booking id {new_booking_id} does not appear in the booking results."
 
 
 #When a user updates an existing booking - the booking updated successfully.
-def test_update_booking(auth_token):
-    checkin_date = datetime.now() + timedelta(days=7)
-    checkout_date = checkin_date + timedelta(days=4)
-    booking_dict = {
-        "firstname": "Jim",
-        "lastname": "Brown",
-        "totalprice": 111,
-        "depositpaid": True,
-        "bookingdates": {
-            "checkin": checkin_date,
-            "checkout": checkout_date
-        },
-        "additionalneeds": "Breakfast"
-    }
-
-    org_booking = create_booking(booking_dict)
+def test_update_booking(auth_token, booking_client, booking_stream):
+    booking_dict = BookingFactory.payload(next(booking_stream))
+
+    org_booking = create_booking(booking_dict, booking_client)
 
     org_booking['booking']['bookingdates']['checkout'] = (
             datetime.strptime(org_booking['booking']['bookingdates']['checkin'], '%Y-%m-%d') + timedelta(
         days=5)).strftime('%Y-%m-%d')
 
-    update_booking(org_booking, auth_token)
+    update_booking(org_booking, auth_token, booking_client)
 
-    updated_booking = get_booking_by_id(new_booking_id=org_booking['bookingid'])
+    updated_booking = get_booking_by_id(new_booking_id=org_booking['bookingid'], client=booking_client)
 
     org_booking_obj = Booking(
         firstname=org_booking.get('booking').get('firstname'),
@@ -0,0 +1,103 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import pytest
+
+from api.async_booking_client import AsyncBookingClient
+from api.fake_booker import FakeBooker
+
+BOOKING = {
+    "firstname": "Jim",
+    "lastname": "Brown",
+    "totalprice": 111,
+    "depositpaid": True,
+    "bookingdates": {
+        "checkin": "2030-01-01",
+        "checkout": "2030-01-03"
+    },
+    "additionalneeds": "Breakfast"
+}
+
+
+class UnavailableOnceHandler(BaseHTTPRequestHandler):
+    """
+    Answers 503 to the first request of every method and 200 afterwards.
+    """
+
+    def _answer(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.calls.append(self.command)
+        status = 503 if self.server.calls.count(self.command) == 1 else 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def fake_booker():
+    with FakeBooker() as server:
+        yield server
+
+
+@pytest.fixture
+def unavailable_once():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), UnavailableOnceHandler)
+    server.daemon_threads = True
+    server.calls = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(url, scenario, **options):
+    async def main():
+        async with AsyncBookingClient(url, backoff_factor=0, **options) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+#Bulk calls return one result per item, in order, and create each booking once.
+def test_bulk_create_get_and_update(fake_booker):
+    async def scenario(client):
+        payloads = [dict(BOOKING, firstname=f'Jim{i}') for i in range(25)]
+        created = await client.create_many(payloads, concurrency=5)
+        ids = [result.data['bookingid'] for result in created]
+        fetched = await client.get_many(ids + [10 ** 6], concurrency=5)
+        await client.authenticate()
+        updated = await client.update_many([(i, dict(BOOKING, lastname='Green')) for i in ids[:3]])
+        return created, fetched, updated
+
+    created, fetched, updated = run(fake_booker.url, scenario)
+    assert all(result.ok for result in created) and [result.index for result in created] == list(range(25))
+    assert [result.data['firstname'] for result in fetched[:25]] == [f'Jim{i}' for i in range(25)]
+    assert fetched[25].status == 404 and not fetched[25].ok
+    assert all(result.ok and result.data['lastname'] == 'Green' for result in updated)
+    assert len(fake_booker.store.search(lastname='Brown')) == 22
+
+
+#Idempotent calls are retried on 503; a create is not, so it cannot be created twice.
+def test_only_idempotent_calls_are_retried_on_error_statuses(unavailable_once):
+    url = f'http://127.0.0.1:{unavailable_once.server_port}'
+    assert run(url, lambda client: client.get_booking(1)) == (200, {})
+    assert run(url, lambda client: client.create_booking(BOOKING)) == (503, {})
+    assert unavailable_once.calls == ['GET', 'GET', 'POST']
+
+
+#A connection that could not be established is retried for every method, then raised.
+def test_connection_errors_are_retried_then_raised():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    with pytest.raises(aiohttp.ClientConnectorError):
+        run(f'http://127.0.0.1:{port}', lambda client: client.create_booking(BOOKING), retries=2)
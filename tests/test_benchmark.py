@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from support.benchmark import BenchmarkResult, find_regressions, load_baseline, run_load, write_results
+
+
+#A failing worker setup is raised instead of leaving the other workers and the caller at the barrier.
+def test_setup_error_is_raised():
+    def setup(index):
+        if index == 2:
+            raise RuntimeError('no browser')
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(
+        pytest.raises(RuntimeError, run_load, 'broken', lambda index: None, concurrency=4, duration=0.1, setup=setup)))
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), 'run_load hung after a failing setup'
+    assert 'no browser' in str(result[0].value)
+
+
+#Every call is measured and errors are counted apart from the latencies.
+def test_run_load_measures_calls():
+    def operation(index):
+        if index == 1:
+            raise ValueError('bad')
+
+    result = run_load('op', operation, concurrency=2, duration=0.05)
+    assert result.requests > result.errors > 0 and result.error_samples[0] == 'ValueError: bad'
+
+
+#Regressions are reported against a baseline; a baseline that was asked for must exist.
+def test_baseline_regressions(tmp_path):
+    result = BenchmarkResult('op', 1, 1.0, 100, 0, 100.0, 10.0, 20.0, 30.0, 40.0)
+    path = str(tmp_path / 'baseline.json')
+    write_results(path, [result])
+    baseline = load_baseline(path)['op']
+    assert find_regressions(result, baseline) == []
+    slower = BenchmarkResult('op', 1, 1.0, 50, 0, 50.0, 10.0, 20.0, 60.0, 80.0)
+    assert find_regressions(slower, baseline) == ['op p99_ms 60.0 > baseline 30.0',
+                                                  'op throughput 50.0 rps < baseline 100.0 rps']
+    with pytest.raises(FileNotFoundError):
+        load_baseline(str(tmp_path / 'missing.json'))
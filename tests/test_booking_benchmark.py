@@ -0,0 +1,89 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+import allure
+import pytest
+
+from api.booking_client import BookingClient
+from support.benchmark import find_regressions, load_baseline, run_load, write_results
+
+pytestmark = pytest.mark.benchmark
+
+
+def booking_payload():
+    checkin_date = datetime.now() + timedelta(days=7)
+    return {
+        "firstname": "Bench",
+        "lastname": "Mark",
+        "totalprice": 111,
+        "depositpaid": True,
+        "bookingdates": {
+            "checkin": checkin_date,
+            "checkout": checkin_date + timedelta(days=2)
+        },
+        "additionalneeds": "Breakfast"
+    }
+
+
+@pytest.fixture(scope='module')
+def benchmark_results(request, booking_base_url):
+    """
+    Collect the results of the module and write them as JSON at teardown.
+    """
+    results = []
+    yield results
+    path = request.config.getoption('--benchmark-json')
+    if results and path:
+        write_results(path, results, target=booking_base_url, created=datetime.now().isoformat())
+
+
+@pytest.fixture(scope='module')
+def seeded_booking(booking_base_url):
+    with BookingClient(booking_base_url) as client:
+        token = client.authenticate()
+        booking_id = client.create_booking(booking_payload()).json()['bookingid']
+    return booking_id, token
+
+
+def _check(response):
+    assert response.status_code == 200, f"{response.request.method} failed: {response.status_code} - {response.text}"
+
+
+@pytest.mark.parametrize('operation', ['create_booking', 'get_booking_by_id', 'update_booking'])
+def test_booking_latency(request, operation, booking_base_url, seeded_booking, benchmark_results):
+    """
+    Drive one booking operation under load and compare it with the stored baseline.
+    """
+    concurrency = request.config.getoption('--benchmark-concurrency')
+    duration = request.config.getoption('--benchmark-duration')
+    booking_id, token = seeded_booking
+    payload = booking_payload()
+    clients = {}
+    lock = threading.Lock()
+
+    def setup(index):
+        with lock:
+            clients[index] = BookingClient(booking_base_url)
+
+    calls = {
+        'create_booking': lambda client: _check(client.create_booking(payload)),
+        'get_booking_by_id': lambda client: _check(client.get_booking(booking_id)),
+        'update_booking': lambda client: _check(client.update_booking(booking_id, payload, token)),
+    }
+    call = calls[operation]
+    with allure.step(f"Load {operation} with {concurrency} workers for {duration} s"):
+        result = run_load(operation, lambda index: call(clients[index]), concurrency, duration, setup)
+        for client in clients.values():
+            client.close()
+        benchmark_results.append(result)
+        allure.attach(json.dumps(result.to_dict(), indent=2), name=f'{operation} benchmark',
+                      attachment_type=allure.attachment_type.JSON)
+
+    assert result.requests, f'No {operation} request completed in {duration} s'
+    assert not result.errors, f'{result.errors} of {result.requests} {operation} requests failed: {result.error_samples}'
+    baseline_path = request.config.getoption('--benchmark-baseline')
+    if baseline_path:
+        regressions = find_regressions(result, load_baseline(baseline_path).get(operation),
+                                       request.config.getoption('--benchmark-threshold'))
+        assert not regressions, 'Benchmark regressed: ' + '; '.join(regressions)
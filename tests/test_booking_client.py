@@ -0,0 +1,65 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from api.booking_client import BookingClient
+
+
+class HangingHandler(BaseHTTPRequestHandler):
+    def _hang(self):
+        self.server.calls += 1
+        self.server.release.wait(5)
+
+    do_GET = do_POST = _hang
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hanging_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HangingHandler)
+    server.daemon_threads = True
+    server.calls = 0
+    server.release = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+#Every timed-out attempt of an idempotent call is counted, including the retried ones.
+def test_retried_read_timeouts_are_counted(hanging_server):
+    url = f'http://127.0.0.1:{hanging_server.server_port}'
+    with BookingClient(url, timeout=(1, 0.2), retries=2, backoff_factor=0, hedge=False) as client:
+        with pytest.raises(requests.ConnectionError):
+            client.get_booking(1)
+        assert client.stats['timeouts'] == hanging_server.calls == 3
+        assert client.latency.samples() == {'GET /booking/{id}': [0.2, 0.2, 0.2]}
+
+
+#A non idempotent call is not retried on a read timeout and its timeout is counted once.
+def test_post_read_timeout_is_counted_once(hanging_server):
+    url = f'http://127.0.0.1:{hanging_server.server_port}'
+    with BookingClient(url, timeout=(1, 0.2), retries=2, backoff_factor=0) as client:
+        with pytest.raises(requests.Timeout):
+            client.create_booking({'firstname': 'Jim'})
+        assert client.stats['timeouts'] == hanging_server.calls == 1
+
+
+#Worker reports are merged over their pooled samples, with summed counts and the longest timeout.
+def test_latency_reports_are_merged():
+    first, second = BookingClient('http://127.0.0.1:1'), BookingClient('http://127.0.0.1:1', timeout=(5, 10))
+    for client, samples in ((first, [0.01] * 15), (second, [0.02] * 5 + [0.4])):
+        for seconds in samples:
+            client.latency.record('GET /booking', seconds)
+    first.stats['timeouts'] = 2
+    second.stats['timeouts'] = 1
+    merged = BookingClient.merge_latency_reports([first.latency_report(), second.latency_report()])
+    assert merged['stats'] == {'hedges': 0, 'hedge_wins': 0, 'timeouts': 3}
+    assert merged['GET /booking']['calls'] == 21 and merged['GET /booking']['timeout'] == (5, 30)
+    assert merged['GET /booking']['p50_ms'] == 10.0 and merged['GET /booking']['p99_ms'] == 400.0
@@ -0,0 +1,51 @@
+import pytest
+
+from api.booking_client import BookingClient
+from api.booking_index import BookingIndex
+from api.fake_booker import FakeBooker
+from support.data_factory import BookingFactory
+
+
+@pytest.fixture(scope='module')
+def client():
+    with FakeBooker() as server, BookingClient(server.url) as client:
+        yield client
+
+
+def create(client, booking):
+    return client.create_booking(booking).json()['bookingid']
+
+
+#The full list is downloaded once; later lookups of listed or unknown bookings are local.
+def test_membership_of_listed_bookings(client):
+    payloads = [BookingFactory.payload(booking) for booking in BookingFactory(seed=1).stream(3)]
+    ids = [create(client, payload) for payload in payloads]
+    index = BookingIndex(client)
+    assert all(booking_id in index for booking_id in ids) and len(index) == len(client.list_bookings().json())
+    assert 10 ** 6 not in index
+    assert index.stats == {'full_loads': 1, 'filtered_queries': 0}
+
+
+#Tracked bookings are confirmed with one filtered query per guest name; untracked new ones are not seen.
+def test_tracked_bookings_are_refreshed_by_name(client):
+    index = BookingIndex(client)
+    index.load()
+    guest = BookingFactory.payload(next(iter(BookingFactory(seed=2))))
+    tracked = [create(client, guest) for _ in range(2)]
+    for booking_id in tracked:
+        index.track(booking_id, guest)
+    untracked = create(client, dict(guest, firstname='Other'))
+    assert tracked[0] in index and tracked[1] in index
+    assert untracked not in index
+    assert index.stats == {'full_loads': 1, 'filtered_queries': 1}
+    index.refresh()
+    assert index.stats['filtered_queries'] == 1, 'confirmed bookings are not queried again'
+
+
+#A tracked booking the service does not list stays unconfirmed and is queried again.
+def test_unlisted_tracked_booking(client):
+    index = BookingIndex(client)
+    index.track(10 ** 6, {'firstname': 'Nobody', 'lastname': 'Here'})
+    assert 10 ** 6 not in index
+    assert 10 ** 6 not in index
+    assert index.stats == {'full_loads': 1, 'filtered_queries': 2}
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from support.cleanup_registry import CleanupRegistry
+
+
+@pytest.fixture
+def leftovers(tmp_path):
+    return str(tmp_path / 'undeleted_clients.json')
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def failing_for(*client_ids):
+    def delete(client_id):
+        if client_id in client_ids:
+            raise RuntimeError(f'cannot delete {client_id}')
+    return delete
+
+
+#Clients that fail are kept in the leftovers file and registered again by the next run.
+def test_failed_clients_are_retried_by_the_next_run(leftovers):
+    registry = CleanupRegistry(leftovers)
+    for client_id in ('A', 'B', 'C'):
+        registry.register(client_id)
+    assert set(registry.flush(failing_for('A', 'B'))) == {'A', 'B'}
+    assert read(leftovers) == ['A', 'B']
+    assert CleanupRegistry(leftovers).pending() == ['A', 'B']
+
+
+#A retry within the session that deletes the failures removes them from the leftovers file.
+def test_retry_rewrites_the_leftovers_file(leftovers):
+    registry = CleanupRegistry(leftovers)
+    registry.register('A')
+    registry.register('B')
+    failed = registry.flush(failing_for('A', 'B'), failing_for('A', 'B'), lambda: True)
+    for client_id in failed:
+        registry.failed.pop(client_id)
+        registry.register(client_id)
+    assert registry.flush(failing_for('B')) == {'B': 'RuntimeError: cannot delete B'}
+    assert read(leftovers) == ['B']
+    registry.register('B')
+    assert registry.flush(failing_for()) == {}
+    assert read(leftovers) == []
+
+
+#Leftovers written by another worker of the same run are kept.
+def test_other_workers_leftovers_are_kept(leftovers):
+    first, second = CleanupRegistry(leftovers), CleanupRegistry(leftovers)
+    first.register('A')
+    second.register('B')
+    first.flush(failing_for('A'))
+    second.flush(failing_for())
+    assert read(leftovers) == ['A']
+
+
+#Leftovers stay in the file until they are deleted, so a run that crashes before flushing loses none.
+def test_leftovers_survive_a_crashed_run(leftovers):
+    registry = CleanupRegistry(leftovers)
+    registry.register('A')
+    registry.flush(failing_for('A'))
+    assert CleanupRegistry(leftovers).pending() == ['A']
+    assert read(leftovers) == ['A']
+    assert CleanupRegistry(leftovers, retry_leftovers=False).pending() == []
+    retry = CleanupRegistry(leftovers)
+    retry.flush(failing_for())
+    assert read(leftovers) == []
@@ -0,0 +1,74 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from support.data_factory import BookingFactory, ClientFactory, US_STATES
+
+STATES = {state for state, _ in US_STATES}
+
+
+#Clients never repeat an SSN/TIN, email or phone number and follow the SSA and NANP rules.
+def test_clients_are_unique_and_valid():
+    clients = list(ClientFactory(seed=7).stream(50000))
+    assert len({client.ssn_tin for client in clients}) == len(clients)
+    assert len({client.email for client in clients}) == len(clients)
+    assert len({client.contactPhone for client in clients}) == len(clients)
+    for client in clients:
+        area, group, serial = client.ssn_tin[:3], client.ssn_tin[3:5], client.ssn_tin[5:]
+        assert area not in ('000', '666') and area[0] != '9' and group != '00' and serial != '0000', client
+        assert len(client.contactPhone) == 10 and client.contactPhone[0] not in '01', client
+        assert client.contactPhone[1:3] != '11' and client.contactPhone[4:6] != '11', client
+        assert client.state in STATES, client
+
+
+#The same seed gives the same data; streams of one seed with different starts are disjoint.
+def test_clients_are_reproducible_and_split_between_workers():
+    assert list(ClientFactory(seed=3).stream(100)) == list(ClientFactory(seed=3).stream(100))
+    assert list(ClientFactory(seed=3).stream(100)) != list(ClientFactory(seed=4).stream(100))
+    factory = ClientFactory(seed=3)
+    shares = [{client.ssn_tin for client in factory.stream(1000, start=worker, step=4)} for worker in range(4)]
+    assert len(set().union(*shares)) == 4000
+    assert factory.client(2) == next(iter(factory.stream(1, start=2)))
+
+
+#Bookings are stays of 1 to max_nights nights within the horizon.
+def test_booking_dates_are_valid():
+    first_checkin = date(2030, 1, 1)
+    factory = BookingFactory(seed=1, first_checkin=first_checkin, horizon_days=30, max_nights=5)
+    for booking in factory.stream(5000):
+        checkin = date.fromisoformat(booking.bookingdates_checking)
+        nights = (date.fromisoformat(booking.bookingdates_checkout) - checkin).days
+        assert 0 <= (checkin - first_checkin).days < 30 and 1 <= nights <= 5, booking
+        payload = BookingFactory.payload(booking)
+        assert payload['totalprice'] > 0 and isinstance(payload['depositpaid'], bool)
+    assert list(factory.stream(10)) == list(BookingFactory(seed=1, first_checkin=first_checkin, horizon_days=30,
+                                                            max_nights=5).stream(10))
+
+
+#The factories generate at least 100k records per second.
+@pytest.mark.benchmark
+@pytest.mark.parametrize('factory', [ClientFactory(), BookingFactory()], ids=['clients', 'bookings'])
+def test_factory_throughput(factory):
+    count = 200000
+    started = time.perf_counter()
+    for _ in factory.stream(count):
+        pass
+    rate = count / (time.perf_counter() - started)
+    assert rate >= 100000, f'{type(factory).__name__} generated {rate:.0f} records/s'
+
+
+#Without a first check-in date, the bookings depend on the seed only, not on the day of the run.
+def test_default_dates_do_not_depend_on_today(monkeypatch):
+    from support import data_factory
+
+    bookings = list(BookingFactory(seed=5).stream(20))
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr(data_factory, 'date', Tomorrow)
+    assert list(BookingFactory(seed=5).stream(20)) == bookings
+    assert all(booking.bookingdates_checking.startswith(('2030', '2031')) for booking in bookings)
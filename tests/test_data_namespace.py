@@ -0,0 +1,44 @@
+import pytest
+
+from support.data_factory import ClientFactory
+from support.data_namespace import SLOTS, DataNamespace
+
+
+#Workers of a run get distinct nine-digit SSN/TIN values and ten-digit phone numbers.
+def test_workers_get_distinct_clients():
+    run_id = DataNamespace.new_run_id()
+    assert len(run_id) == 5 and run_id.isdigit() and run_id[0] != '0'
+    namespaces = [DataNamespace(run_id, worker, 3) for worker in range(3)]
+    clients = [namespace.client() for namespace in namespaces for _ in range(5000)]
+    assert len({client.ssn_tin for client in clients}) == len(clients)
+    assert all(len(client.ssn_tin) == 9 and len(client.contactPhone) == 10 for client in clients)
+
+
+#A worker that used up its slots moves on to the next run prefix instead of failing.
+def test_worker_moves_to_the_next_prefix():
+    namespace = DataNamespace('99999', 1, 2)
+    clients = [namespace.client() for _ in range(SLOTS // 2 + 1)]
+    assert clients[0].ssn_tin == '999990002' and clients[-2].ssn_tin == '999999998'
+    assert clients[-1].ssn_tin == '100000002'
+
+
+#Run ids of another form are hashed to five digits; worker indexes outside the run are rejected.
+def test_namespace_limits():
+    assert DataNamespace('nightly-42').prefix == DataNamespace('nightly-42').prefix
+    assert DataNamespace('nightly-42').client().ssn_tin.isdigit()
+    with pytest.raises(ValueError):
+        DataNamespace('12345', worker=2, workers=2)
+    with pytest.raises(ValueError):
+        DataNamespace('12345', workers=SLOTS + 1)
+
+
+#With a factory, the workers share out the seeded clients while the unique fields stay in the namespace.
+def test_factory_fields_with_namespaced_ids():
+    factory = ClientFactory(seed=9)
+    namespaces = [DataNamespace('12345', worker, 2, factory) for worker in range(2)]
+    clients = [namespace.client() for _ in range(3) for namespace in namespaces]
+    for index, client in enumerate(clients):
+        seeded = factory.client(index)
+        assert (client.first_name, client.last_name, client.state) == \
+            (seeded.first_name, seeded.last_name, seeded.state)
+        assert client.ssn_tin == f'12345{index + 1:04d}' and client.ssn_tin != seeded.ssn_tin
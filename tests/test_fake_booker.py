@@ -0,0 +1,48 @@
+import pytest
+
+from api.booking_client import BookingClient
+from api.fake_booker import FakeBooker
+
+BOOKING = {
+    "firstname": "Jim",
+    "lastname": "Brown",
+    "totalprice": 111,
+    "depositpaid": True,
+    "bookingdates": {
+        "checkin": "2030-01-01T10:00:00",
+        "checkout": "2030-01-03"
+    },
+    "additionalneeds": "Breakfast"
+}
+
+
+@pytest.fixture(scope='module')
+def fake_client():
+    with FakeBooker() as server, BookingClient(server.url) as client:
+        yield client
+
+
+#The fake server answers with the same shapes as restful-booker.
+def test_create_and_get_booking(fake_client):
+    created = fake_client.create_booking(BOOKING).json()
+    assert created['booking']['bookingdates'] == {'checkin': '2030-01-01', 'checkout': '2030-01-03'}
+    assert fake_client.get_booking(created['bookingid']).json() == created['booking']
+    assert fake_client.get_booking(10 ** 6).status_code == 404
+
+
+#Updates need a token issued by /auth.
+def test_update_requires_token(fake_client):
+    booking_id = fake_client.create_booking(BOOKING).json()['bookingid']
+    assert fake_client.update_booking(booking_id, BOOKING, token='invalid').status_code == 403
+    token = fake_client.authenticate()
+    assert fake_client.update_booking(booking_id, dict(BOOKING, lastname='Green'), token).json()['lastname'] == 'Green'
+    assert fake_client.request('POST', '/auth', {"username": "admin", "password": "x"}).json() == \
+        {'reason': 'Bad credentials'}
+
+
+#The booking list supports the name and date filters.
+def test_filter_bookings(fake_client):
+    booking_id = fake_client.create_booking(dict(BOOKING, firstname='Filter')).json()['bookingid']
+    listed = fake_client.request('GET', '/booking', params={'firstname': 'Filter', 'lastname': 'Brown'}).json()
+    assert listed == [{'bookingid': booking_id}]
+    assert fake_client.request('GET', '/booking', params={'checkin': '2031-01-01'}).json() == []
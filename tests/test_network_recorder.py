@@ -0,0 +1,82 @@
+import pytest
+
+# support.network_recorder imports Selenium, so it is imported by the fixture and collecting this module stays
+# browser-free
+TIMING = {'requestTime': 100.0, 'dnsStart': 0.5, 'dnsEnd': 5.5, 'connectStart': 5.5, 'connectEnd': 15.5,
+          'sslStart': 8.0, 'sslEnd': 15.5, 'sendStart': 15.5, 'sendEnd': 16.0, 'receiveHeadersEnd': 40.0}
+
+
+@pytest.fixture
+def recorder():
+    from support import network_recorder
+
+    return network_recorder
+
+
+def sent(request_id, url, timestamp, method='GET', post_data=None, resource_type='XHR'):
+    request = {'method': method, 'url': url, 'headers': {'Accept': '*/*'}}
+    if post_data is not None:
+        request['postData'] = post_data
+    return {'method': 'Network.requestWillBeSent',
+            'params': {'requestId': request_id, 'request': request, 'timestamp': timestamp,
+                       'wallTime': 1700000000 + timestamp, 'type': resource_type}}
+
+
+def event(method, request_id, **params):
+    return {'method': method, 'params': dict(params, requestId=request_id)}
+
+
+def response(request_id, resource_type='XHR', timing=None, **flags):
+    return event('Network.responseReceived', request_id, type=resource_type, response=dict(
+        flags, status=200, statusText='OK', mimeType='application/json', timing=timing or {}))
+
+
+#Entries carry the HAR 1.2 fields, sizes and per-phase timings in milliseconds.
+def test_har_shape_and_timings(recorder):
+    events = [
+        sent('1', 'https://app/api/clients', 100.0, 'POST', post_data='{"name": "é"}'),
+        response('1', timing=TIMING),
+        event('Network.loadingFinished', '1', timestamp=100.05, encodedDataLength=2048),
+    ]
+    har = recorder.build_har(events, 'add client')
+    assert har['log']['version'] == '1.2' and har['log']['pages'] == [{'id': 'page_1', 'title': 'add client'}]
+    entry, = har['log']['entries']
+    assert entry['startedDateTime'] == '2023-11-14T22:15:00+00:00'
+    assert entry['time'] == 50.0
+    assert entry['request'] == {'method': 'POST', 'url': 'https://app/api/clients',
+                                'headers': [{'name': 'Accept', 'value': '*/*'}], 'bodySize': 14}
+    assert entry['response']['status'] == 200 and entry['response']['_transferSize'] == 2048
+    assert entry['timings'] == {'blocked': 0.5, 'dns': 5.0, 'connect': 10.0, 'ssl': 7.5, 'send': 0.5,
+                                'wait': 24.0, 'receive': 10.0}
+    assert entry['_resourceType'] == 'XHR' and not entry['_fromCache'] and entry['response']['_error'] is None
+
+
+#A redirect keeps its final hop; cached, failed and unfinished requests are reported as such.
+def test_har_redirects_cache_and_failures(recorder):
+    events = [
+        sent('1', 'http://app/', 1.0, resource_type='Document'),
+        sent('1', 'https://app/', 1.1, resource_type='Document'),
+        response('1', 'Document'),
+        event('Network.loadingFinished', '1', timestamp=1.2, encodedDataLength=100),
+        sent('2', 'https://app/logo.png', 1.3, resource_type='Image'),
+        event('Network.requestServedFromCache', '2'),
+        response('2', 'Image', fromDiskCache=True),
+        event('Network.loadingFinished', '2', timestamp=1.31, encodedDataLength=0),
+        sent('3', 'https://app/api/slow', 1.4),
+        event('Network.loadingFailed', '3', timestamp=1.5, errorText='net::ERR_ABORTED'),
+        sent('4', 'https://app/api/pending', 1.6),
+        event('Network.dataReceived', 'unknown', dataLength=10),
+    ]
+    entries = recorder.build_har(events)['log']['entries']
+    assert [entry['request']['url'] for entry in entries] == \
+        ['https://app/', 'https://app/logo.png', 'https://app/api/slow', 'https://app/api/pending']
+    assert [entry['_fromCache'] for entry in entries] == [False, True, False, False]
+    assert entries[2]['response']['_error'] == 'net::ERR_ABORTED' and entries[2]['time'] == 100.0
+    assert entries[3]['time'] == -1 and entries[3]['timings']['receive'] == -1
+
+    summary = recorder.summarize('page', {'log': {'entries': entries}})
+    assert (summary.requests, summary.xhr, summary.cache_hits, summary.failed) == (4, 2, 1, 1)
+    assert summary.transfer_kb == 0.1
+    summary.assert_within(max_requests=4, max_xhr=2, max_kb=1)
+    with pytest.raises(AssertionError, match='page exceeded its network budget: 4 requests > 3'):
+        summary.assert_within(max_requests=3)
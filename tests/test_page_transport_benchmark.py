@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import datetime
+from urllib.parse import quote
+
+import allure
+import pytest
+
+from support.benchmark import find_regressions, load_baseline, run_load, write_results
+
+pytestmark = pytest.mark.benchmark
+
+# A local page with a form field, a button revealing a label after a short delay, and a label to read
+BENCHMARK_PAGE = 'data:text/html,' + quote("""
+<input id="name"><button id="reveal">Reveal</button><span id="label" style="display:none">Ready</span>
+<script>
+document.getElementById('reveal').addEventListener('click', function () {
+    var label = document.getElementById('label');
+    label.style.display = 'none';
+    setTimeout(function () { label.style.display = 'inline'; }, 20);
+});
+</script>
+""")
+
+# Page objects and Selenium are imported inside the test, so collecting this module stays browser-free
+NAME_FIELD = ('id', 'name')
+REVEAL_BUTTON = ('id', 'reveal')
+LABEL = ('id', 'label')
+
+
+@pytest.fixture(scope='module')
+def transport_results(request):
+    """
+    Collect the results of the module and write them as JSON at teardown, next to the booking benchmarks.
+    """
+    results = []
+    yield results
+    path = request.config.getoption('--benchmark-json')
+    if results and path:
+        root, extension = os.path.splitext(path)
+        write_results(f'{root}-page-transport{extension}', results, created=datetime.now().isoformat())
+
+
+@pytest.mark.parametrize('transport', ['webdriver', 'cdp'])
+@pytest.mark.parametrize('primitive', ['fill_text', 'get_text', 'click_and_wait'])
+def test_page_primitive_latency(request, selenium_interface, transport, primitive, transport_results):
+    """
+    Measure the latency of one BasePage primitive over the classic WebDriver path or the DevTools transport.
+    """
+    from pages.base_page import BasePage
+    from pages.cdp_transport import cdp_transport, disable_cdp_transport, enable_cdp_transport
+
+    driver = selenium_interface.driver
+    driver.get(BENCHMARK_PAGE)
+    # The module's browser may run over DevTools already (--page-transport=cdp); that state is restored below
+    was_enabled = cdp_transport(driver) is not None
+    if transport == 'cdp':
+        if enable_cdp_transport(driver) is None:
+            pytest.skip('The DevTools transport needs a local Chrome or Edge driver')
+    else:
+        disable_cdp_transport(driver)
+    try:
+        page = BasePage(driver)
+        calls = {
+            'fill_text': lambda: page.fill_text(NAME_FIELD, 'benchmark'),
+            'get_text': lambda: page.get_text(REVEAL_BUTTON),
+            'click_and_wait': lambda: (page.click(REVEAL_BUTTON), page.get_text(LABEL)),
+        }
+        name = f'{primitive}[{transport}]'
+        with allure.step(f'Run {primitive} over {transport} for {request.config.getoption("--benchmark-duration")} s'):
+            result = run_load(name, lambda index: calls[primitive](), 1,
+                              request.config.getoption('--benchmark-duration'))
+            transport_results.append(result)
+            allure.attach(json.dumps(result.to_dict(), indent=2), name=f'{name} benchmark',
+                          attachment_type=allure.attachment_type.JSON)
+    finally:
+        if was_enabled:
+            enable_cdp_transport(driver)
+        else:
+            disable_cdp_transport(driver)
+
+    assert result.requests, f'No {name} call completed'
+    assert not result.errors, f'{result.errors} of {result.requests} {name} calls failed: {result.error_samples}'
+    baseline_path = request.config.getoption('--benchmark-baseline')
+    if baseline_path:
+        regressions = find_regressions(result, load_baseline(baseline_path).get(name),
+                                       request.config.getoption('--benchmark-threshold'))
+        assert not regressions, 'Benchmark regressed: ' + '; '.join(regressions)
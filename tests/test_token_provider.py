@@ -0,0 +1,85 @@
+import pytest
+
+from api import token_provider
+from api.booking_client import BookingClient
+from api.fake_booker import FakeBooker
+from api.token_provider import TokenProvider
+
+BOOKING = {
+    "firstname": "Jim",
+    "lastname": "Brown",
+    "totalprice": 111,
+    "depositpaid": True,
+    "bookingdates": {
+        "checkin": "2030-01-01",
+        "checkout": "2030-01-03"
+    },
+    "additionalneeds": "Breakfast"
+}
+
+
+class Clock:
+    """
+    Stand-in for the time module of api.token_provider.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeBooker() as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with BookingClient(server.url) as client:
+        yield client
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(token_provider, 'time', clock)
+    return clock
+
+
+#A token is reused until refresh_margin before its TTL ends, also by other processes sharing the token file.
+def test_ttl_and_refresh_margin(client, clock, tmp_path):
+    provider = TokenProvider(client, ttl=100, refresh_margin=10, cache_dir=str(tmp_path))
+    first = provider.token()
+    clock.now += 89
+    assert provider.token() == first
+    other_worker = TokenProvider(client, ttl=100, refresh_margin=10, cache_dir=str(tmp_path))
+    assert other_worker.token() == first and other_worker.stats == {'logins': 0, 'file_hits': 1}
+    clock.now += 1
+    renewed = provider.token()
+    assert renewed != first and provider.stats['logins'] == 2
+    assert other_worker.token() == renewed and other_worker.stats == {'logins': 0, 'file_hits': 2}
+
+
+#A rejected token is invalidated and the update is retried once with a new token.
+def test_update_renews_a_rejected_token(client, server, clock, tmp_path):
+    client.token_provider = TokenProvider(client, cache_dir=str(tmp_path))
+    booking_id = client.create_booking(BOOKING).json()['bookingid']
+    first = client.token_provider.token()
+    server.store.tokens.discard(first)
+    response = client.update_booking(booking_id, dict(BOOKING, lastname='Green'))
+    assert response.status_code == 200 and response.json()['lastname'] == 'Green'
+    assert client.token_provider.token() != first and client.token_provider.stats['logins'] == 2
+
+
+#Invalidating a token that was already renewed keeps the renewed token.
+def test_invalidate_keeps_a_renewed_token(client, clock, tmp_path):
+    provider = TokenProvider(client, cache_dir=str(tmp_path))
+    first = provider.token()
+    provider.invalidate(first)
+    renewed = provider.token()
+    provider.invalidate(first)
+    assert provider.token() == renewed and provider.stats['logins'] == 2
+    assert TokenProvider(client, cache_dir=str(tmp_path)).token() == renewed
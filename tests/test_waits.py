@@ -0,0 +1,108 @@
+import pytest
+
+# pages.waits imports Selenium, so it is imported by the fixtures and collecting this module stays browser-free
+ITEMS = ('css selector', 'li')
+
+
+class Clock:
+    """
+    Stand-in for the time module, advanced by hand or by sleeping.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ListDriver:
+    def __init__(self, count=0):
+        self.count = count
+
+    def find_elements(self, *locator):
+        return [object()] * self.count
+
+
+@pytest.fixture
+def waits():
+    from pages import waits
+
+    return waits
+
+
+@pytest.fixture
+def clock(monkeypatch, waits):
+    clock = Clock()
+    monkeypatch.setattr(waits, 'time', clock)
+    return clock
+
+
+def recording(waits, name, value, calls):
+    def check(driver):
+        calls.append(name)
+        return value
+    return waits.Condition(check, name)
+
+
+#A count is stable once it has not changed for stable_ms; a change or a reset starts over, and no items never count.
+def test_count_stable(waits, clock):
+    driver, condition = ListDriver(3), waits.count_stable(ITEMS, stable_ms=300)
+    assert not condition(driver)
+    clock.now = 0.2
+    assert not condition(driver)
+    clock.now = 0.3
+    assert condition(driver)
+    driver.count = 4
+    assert not condition(driver)
+    clock.now = 0.5
+    assert not condition(driver)
+    clock.now = 0.6
+    assert condition(driver)
+    condition.reset()
+    assert not condition(driver)
+    driver.count = 0
+    clock.now = 5.0
+    assert not condition(driver) and not condition(driver)
+
+
+#all_of stops at the first unsatisfied condition, any_of at the first satisfied one; & and | build them.
+def test_all_of_and_any_of(waits):
+    calls = []
+    assert not waits.all_of(recording(waits, 'a', True, calls), recording(waits, 'b', 0, calls),
+                            recording(waits, 'c', True, calls))(None)
+    assert calls == ['a', 'b']
+    calls.clear()
+    assert waits.any_of(recording(waits, 'a', None, calls), recording(waits, 'b', 'x', calls),
+                        recording(waits, 'c', True, calls))(None)
+    assert calls == ['a', 'b']
+    combined = recording(waits, 'a', True, []) & recording(waits, 'b', True, []) | recording(waits, 'c', False, [])
+    assert repr(combined) == '((a and b) or c)' and combined(None)
+
+
+#Composite conditions reset their parts at the start of every wait.
+def test_composite_resets_its_conditions(waits, clock):
+    driver, stable = ListDriver(2), waits.count_stable(ITEMS, stable_ms=100)
+    stable(driver)
+    clock.now = 1.0
+    assert waits.AdaptiveWait(driver, timeout=5).until(waits.list_populated(ITEMS, 2) & stable)
+    assert clock.now >= 1.1, 'the stable period restarts with every wait'
+
+
+#A wait backs off its polling, ignores missing elements and times out with the condition's description.
+def test_adaptive_wait_times_out(waits, clock):
+    polls = []
+
+    def missing(driver):
+        polls.append(clock.now)
+        raise waits.NoSuchElementException()
+
+    wait = waits.AdaptiveWait(ListDriver(), timeout=2, initial_poll=0.05, max_poll=0.5)
+    with pytest.raises(waits.TimeoutException, match='Timed out waiting for never'):
+        wait.until(waits.Condition(missing, 'never'))
+    gaps = [round(later - earlier, 4) for earlier, later in zip(polls, polls[1:])]
+    assert gaps[0] == 0.05 and max(gaps) == 0.5
+    assert all(gap <= following for gap, following in zip(gaps[:-2], gaps[1:-1])), 'the last poll is cut short'